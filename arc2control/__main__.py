@@ -1,6 +1,8 @@
 import sys
+import multiprocessing
 from .main import main
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main(sys.argv[1:])
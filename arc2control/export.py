@@ -0,0 +1,399 @@
+"""
+Streaming export of tabular data (numpy arrays, HDF5 datasets or
+datastore timeseries) to delimited text files. Data is read and
+formatted in blocks of rows so that memory use does not depend on the
+size of the source. Complete datastores can be exported with
+:func:`~arc2control.export.export_store` which processes crosspoints in
+parallel.
+"""
+
+import os
+import re
+import time
+import zipfile
+import itertools
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import h5py
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+
+EXPORT_CHUNK_ROWS = 65536
+"""
+Number of rows read and formatted in one go
+"""
+
+_WRITE_BUFFER = 4 * 1024 * 1024
+
+
+def human_bytes(size):
+    """
+    Format a size in bytes using binary prefixes, eg. ``'1.5 MiB'``.
+    """
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if abs(size) < 1024.0:
+            return '%.1f %s' % (size, unit)
+        size /= 1024.0
+    return '%.1f TiB' % size
+
+
+class ExportCancelled(Exception):
+    """
+    Raised when an export is cancelled before completion.
+    """
+    pass
+
+
+def _columns(data):
+    if data.dtype.names is not None:
+        return [data[name] for name in data.dtype.names]
+    elif data.ndim > 1:
+        return [data[:, c] for c in range(data.shape[1])]
+    else:
+        return [data]
+
+
+def _formatColumn(fmt, values):
+    try:
+        return np.char.mod(fmt, values).tolist()
+    except (TypeError, ValueError):
+        # not a type numpy can format; do it one by one
+        return [fmt % v for v in values]
+
+
+def format_rows(data, fmt='%.18e', delimiter=','):
+    """
+    Format a block of rows as delimited text. Every column is formatted in
+    a single operation. Structured arrays have one column per field, 2D
+    arrays one column per array column and vectors a single column.
+
+    :param data: A numpy array
+    :param fmt: A ``%``-style format, either a single one for all columns
+                or a list with one format per column
+    :param str delimiter: The column separator
+
+    :return: The formatted lines, including the trailing newline
+    """
+    columns = _columns(data)
+    if isinstance(fmt, str):
+        fmt = [fmt] * len(columns)
+    elif len(fmt) != len(columns):
+        raise ValueError("Length of formatter does not match columns")
+
+    if len(data) == 0:
+        return ''
+
+    formatted = [_formatColumn(f, col) for (f, col) in zip(fmt, columns)]
+
+    return '\n'.join(map(delimiter.join, zip(*formatted))) + '\n'
+
+
+def export_delimited(source, fname, nrows=None, delimiter=',', fmt='%.18e', \
+    header='', comments='# ', chunk_rows=EXPORT_CHUNK_ROWS, progress=None, \
+    cancelled=None):
+    """
+    Export tabular data to a delimited text file, in the same format as
+    :func:`numpy.savetxt`. Rows are read from ``source`` ``chunk_rows`` at
+    a time. ``source`` is either an array-like object that supports
+    slicing along its first axis (such as a numpy array or an h5py
+    dataset) or a callable ``source(start, stop)`` returning the rows
+    in ``[start, stop)``, in which case ``nrows`` is required.
+
+    If ``cancelled`` returns ``True`` between chunks the export stops,
+    the partially written file is removed and
+    :class:`~arc2control.export.ExportCancelled` is raised.
+
+    :param source: The data to export
+    :param str fname: The file to write
+    :param int nrows: Number of rows to export; ``None`` to export all rows
+    :param str delimiter: The column separator
+    :param fmt: A ``%``-style format for all columns or a list of formats,
+                one per column
+    :param str header: Text written at the top of the file; every line is
+                       prefixed with ``comments``
+    :param str comments: Prefix for header lines
+    :param int chunk_rows: Number of rows to process at once
+    :param progress: Callable ``progress(done, total)`` called after
+                     every chunk
+    :param cancelled: Callable returning ``True`` if the export should
+                      stop
+
+    :return: The number of rows written
+
+    :raise ExportCancelled: If the export was cancelled
+    """
+    if callable(source):
+        if nrows is None:
+            raise ValueError("Number of rows is required for callable sources")
+        read = source
+    else:
+        if nrows is None:
+            nrows = source.shape[0]
+        nrows = min(nrows, source.shape[0])
+        read = lambda start, stop: source[start:stop]
+
+    if chunk_rows < 1:
+        raise ValueError("Chunk size must be positive")
+
+    try:
+        with open(fname, 'w', buffering=_WRITE_BUFFER) as fh:
+            if len(header) > 0:
+                header = header.replace('\n', '\n' + comments)
+                fh.write(comments + header + '\n')
+
+            done = 0
+            while done < nrows:
+                if cancelled is not None and cancelled():
+                    raise ExportCancelled()
+
+                stop = min(done + chunk_rows, nrows)
+                fh.write(format_rows(np.asarray(read(done, stop)), fmt, \
+                    delimiter))
+                done = stop
+
+                if progress is not None:
+                    progress(done, nrows)
+    except BaseException:
+        # do not leave incomplete files behind
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+        raise
+
+    return nrows
+
+
+BULK_FORMATS = ['csv', 'tsv', 'npz'] + (['arrow'] if pyarrow is not None else [])
+"""
+Output formats supported by :func:`~arc2control.export.export_store`;
+``arrow`` is only available if ``pyarrow`` is installed
+"""
+
+_WB_KEY = re.compile(r'W(\d+)B(\d+)')
+
+
+class BulkExportSummary(namedtuple('BulkExportSummary', \
+    ['crosspoints', 'tables', 'rows', 'nbytes', 'elapsed'])):
+    """
+    Result of :func:`~arc2control.export.export_store`: number of
+    crosspoints, tables and rows exported, the amount of data read
+    (in bytes) and the time it took (in seconds).
+    """
+
+    __slots__ = ()
+
+    @property
+    def throughput(self):
+        """
+        Aggregate export throughput in bytes per second
+        """
+        if self.elapsed <= 0:
+            return 0.0
+        return self.nbytes / self.elapsed
+
+
+def _open_readonly(fname):
+    # the file might be open for writing by ArC2Control itself, so
+    # do not let HDF5 file locking get in the way
+    try:
+        return h5py.File(fname, 'r', locking=False)
+    except TypeError:
+        # older h5py
+        return h5py.File(fname, 'r')
+
+
+def _table_rows(dset):
+    # resizable tables track their length with NROWS, for the
+    # rest it's their size
+    if dset.maxshape[0] is None or dset.maxshape[0] > dset.shape[0]:
+        return min(int(dset.attrs.get('NROWS', dset.shape[0])), dset.shape[0])
+    return dset.shape[0]
+
+
+def _crosspoint_tables(h5, key):
+    # (name, dataset, rows) of all tables of a crosspoint
+    device = h5['crosspoints'][key]
+    tables = []
+
+    def _visit(name, obj):
+        if isinstance(obj, h5py.Dataset) and obj.shape is not None \
+            and len(obj.shape) in [1, 2]:
+            tables.append(('experiments/%s' % name, obj, _table_rows(obj)))
+
+    if 'timeseries' in device:
+        dset = device['timeseries']
+        tables.append(('timeseries', dset, _table_rows(dset)))
+
+    if 'experiments' in device:
+        device['experiments'].visititems(_visit)
+
+    return tables
+
+
+def _write_arrow(dset, fname, nrows, chunk_rows):
+    if dset.dtype.names is not None:
+        names = list(dset.dtype.names)
+        columns = lambda data: [data[n] for n in names]
+    else:
+        ncols = dset.shape[1] if len(dset.shape) > 1 else 1
+        names = ['%d' % c for c in range(ncols)]
+        columns = lambda data: _columns(data)
+
+    writer = None
+    try:
+        for start in range(0, max(nrows, 1), chunk_rows):
+            data = dset[start:min(start+chunk_rows, nrows)]
+            batch = pyarrow.RecordBatch.from_arrays(\
+                [pyarrow.array(c) for c in columns(data)], names=names)
+            if writer is None:
+                writer = pyarrow.ipc.new_file(fname, batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _crosspoint_keys(fname):
+    with _open_readonly(fname) as h5:
+        return sorted(k for k in h5['crosspoints'].keys() \
+            if _WB_KEY.fullmatch(k) is not None)
+
+
+def _export_crosspoint(fname, key, target, fmt, chunk_rows):
+    # runs in a worker process; returns the key, number of tables, rows
+    # and bytes exported and, for npz, the arrays to be added to the
+    # archive by the parent process
+    (ntables, nrows, nbytes) = (0, 0, 0)
+    arrays = []
+
+    with _open_readonly(fname) as h5:
+        for (name, dset, rows) in _crosspoint_tables(h5, key):
+            if fmt == 'npz':
+                arrays.append(('%s/%s' % (key, name), dset[:rows]))
+            else:
+                path = os.path.join(target, key, *name.split('/')) + '.' + fmt
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if fmt == 'arrow':
+                    _write_arrow(dset, path, rows, chunk_rows)
+                else:
+                    export_delimited(dset, path, nrows=rows, \
+                        delimiter='\t' if fmt == 'tsv' else ',', \
+                        chunk_rows=chunk_rows)
+
+            ntables += 1
+            nrows += rows
+            nbytes += rows * dset.dtype.itemsize * \
+                int(np.prod(dset.shape[1:], dtype=np.int64))
+
+    return (key, ntables, nrows, nbytes, arrays)
+
+
+def export_store(fname, target, fmt='csv', workers=None, \
+    chunk_rows=EXPORT_CHUNK_ROWS, progress=None, cancelled=None):
+    """
+    Export the timeseries and experiment tables of every crosspoint of a
+    datastore. Crosspoints are distributed across a pool of ``workers``
+    processes, each opening the datastore read-only. For ``csv``, ``tsv``
+    and ``arrow`` (Arrow IPC) ``target`` is a directory that will
+    contain one subdirectory per crosspoint with one file per table
+    (``W00B00/timeseries.csv``, ``W00B00/experiments/RET_….csv`` and so
+    on). For ``npz`` ``target`` is a single archive with one array per
+    table, named after the same path (``W00B00/timeseries``); tables are
+    passed to this process to be added to the archive, so only a couple of
+    crosspoints per worker are held in memory at any time. Resizable
+    tables are trimmed to their actual length.
+
+    If ``cancelled`` returns ``True`` no further crosspoints are
+    processed and :class:`~arc2control.export.ExportCancelled` is raised;
+    an incomplete ``npz`` archive is removed, but files already written
+    to a ``target`` directory are kept.
+
+    :param str fname: The datastore to export; if the datastore is open
+                      in this process, call
+                      :meth:`~arc2control.h5utils.H5DataStore.sync` first
+    :param str target: Output directory or ``npz`` file
+    :param str fmt: One of :data:`~arc2control.export.BULK_FORMATS`
+    :param int workers: Number of worker processes, ``None`` for one per CPU
+    :param int chunk_rows: Number of rows to process at once
+    :param progress: Callable ``progress(done, total)`` called after every
+                     crosspoint
+    :param cancelled: Callable returning ``True`` if the export should stop
+
+    :return: A :class:`~arc2control.export.BulkExportSummary`
+
+    :raise ExportCancelled: If the export was cancelled
+    """
+    if fmt not in BULK_FORMATS:
+        raise ValueError("Unsupported export format: %s" % fmt)
+
+    start = time.perf_counter()
+
+    if fmt == 'npz':
+        archive = zipfile.ZipFile(target, 'w', allowZip64=True)
+    else:
+        archive = None
+        os.makedirs(target, exist_ok=True)
+
+    (ntables, nrows, nbytes) = (0, 0, 0)
+    # do not fork; the parent might be running Qt and HDF5 threads
+    context = multiprocessing.get_context('spawn')
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            # the file is listed from a worker as well; it might be
+            # already open in this process with different settings
+            keys = pool.submit(_crosspoint_keys, fname).result()
+            # only keep a few crosspoints in flight; for npz the results
+            # hold the table data so they are dropped once written
+            window = 2 * (workers or os.cpu_count() or 1)
+            remaining = iter(keys)
+            pending = set()
+            done = 0
+            try:
+                while True:
+                    for key in itertools.islice(remaining, window - len(pending)):
+                        pending.add(pool.submit(_export_crosspoint, fname, \
+                            key, target, fmt, chunk_rows))
+                    if len(pending) == 0:
+                        break
+
+                    (finished, pending) = wait(pending, return_when=FIRST_COMPLETED)
+                    while len(finished) > 0:
+                        (_, t, r, n, arrays) = finished.pop().result()
+
+                        for (name, data) in arrays:
+                            with archive.open(name + '.npy', 'w', force_zip64=True) as fh:
+                                np.lib.format.write_array(fh, data, allow_pickle=False)
+
+                        ntables += t
+                        nrows += r
+                        nbytes += n
+                        done += 1
+
+                        if progress is not None:
+                            progress(done, len(keys))
+
+                        if cancelled is not None and cancelled() and done < len(keys):
+                            raise ExportCancelled()
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+    except BaseException:
+        if archive is not None:
+            archive.close()
+            os.remove(target)
+        raise
+
+    if archive is not None:
+        archive.close()
+
+    return BulkExportSummary(len(keys), ntables, nrows, nbytes, \
+        time.perf_counter() - start)
@@ -2,15 +2,24 @@ import numpy as np
 import h5py
 from pathlib import PurePosixPath
 import os.path
-import types
+import re
 import time
 import math
+import queue
+import threading
+from functools import partial, wraps
+from collections import namedtuple
+from concurrent.futures import Future
 from enum import Enum, IntEnum
+from . import createLogger
+logger = createLogger('H5')
 
 
 _H5DS_VERSION_MAJOR = 0
 _H5DS_VERSION_MINOR = 2
 
+_WB_KEY = re.compile(r'W(\d+)B(\d+)')
+
 
 class H5Mode(Enum):
     """
@@ -43,6 +52,26 @@ class OpType(IntEnum):
     """
 
 
+class CatalogKind(IntEnum):
+    """
+    Type of an entry in the experiment catalog of a datastore.
+    """
+
+    EXPERIMENT = 0
+    """
+    Experiment table or group tied to a single crosspoint
+    """
+    SYNTHETIC  = 1
+    """
+    Synthetic experiment table or group; there is one catalog entry
+    for each crosspoint involved
+    """
+    SEQUENCE   = 2
+    """
+    Sequence of experiments
+    """
+
+
 class H5AccessError(Exception):
     """Thrown when trying to write to a file opened read-only."""
     pass
@@ -55,8 +84,280 @@ class H5FormatError(Exception):
     """The HDF5 file is not compatible with the current file format.."""
     pass
 
+class H5SWMRError(Exception):
+    """SWMR writing is not supported by the HDF5 library in use."""
+    pass
+
+
+SWMR_SUPPORTED = h5py.version.hdf5_version_tuple >= (2, 0, 0)
+"""
+Whether datastores can be written in SWMR mode. This requires HDF5 2.0 or
+newer: a datastore keeps creating objects while it is being written to
+(experiment tables, raster history frames, summaries of long timeseries)
+and earlier versions do not allow that in SWMR mode. Reading files that
+are being written to with :class:`~arc2control.h5utils.H5DataStoreFollower`
+works with any version.
+"""
+
+
+class StorageProfile(namedtuple('StorageProfile', ['chunk_rows', 'shuffle',
+    'compression', 'level'])):
+    """
+    Chunk layout and compression settings for the timeseries and the
+    experiment tables of a datastore. ``chunk_rows`` is the number of rows
+    per chunk (``None`` lets HDF5 decide), ``shuffle`` enables the byte
+    shuffle filter, ``compression`` is either ``None``, ``'gzip'`` or
+    ``'lzf'`` and ``level`` is the gzip compression level (0-9; ignored
+    for lzf). A set of predefined profiles is available in
+    :data:`~arc2control.h5utils.STORAGE_PROFILES`.
+    """
+
+    _ATTRS = ['STORAGE_CHUNK_ROWS', 'STORAGE_SHUFFLE',
+        'STORAGE_COMPRESSION', 'STORAGE_LEVEL']
+
+    def __new__(cls, chunk_rows=None, shuffle=False, compression=None, level=None):
+        if compression not in [None, 'gzip', 'lzf']:
+            raise ValueError('Unsupported compression filter: %s' % compression)
+        if chunk_rows is not None and chunk_rows < 1:
+            raise ValueError('Chunk length must be positive')
+        return super().__new__(cls, chunk_rows, shuffle, compression, level)
+
+    @property
+    def filtered(self):
+        """
+        Whether any filters are applied to the data
+        """
+        return self.shuffle or self.compression is not None
+
+    def dataset_options(self, shape, maxshape=None):
+        """
+        Keyword arguments for ``h5py.Group.create_dataset`` that implement
+        this profile for a dataset of the specified shape. Datasets are only
+        chunked if they are resizable or if chunking is required by the
+        profile.
+
+        :param shape: The initial shape of the dataset
+        :param maxshape: The maximum shape of the dataset or ``None`` if the
+                         dataset is not resizable
+        """
+        if isinstance(shape, int):
+            shape = (shape, )
+        if isinstance(maxshape, int):
+            maxshape = (maxshape, )
+        shape = tuple(shape)
+        resizable = maxshape is not None
+
+        # empty and scalar datasets cannot be chunked
+        if len(shape) == 0 or (0 in shape[1:]) or \
+            (not resizable and 0 in shape):
+            return {'chunks': True} if resizable else {}
+
+        if self.chunk_rows is None:
+            if not (resizable or self.filtered):
+                return {}
+            opts = {'chunks': True}
+        else:
+            rows = self.chunk_rows
+            # chunks cannot be larger than the dataset can ever be
+            if not resizable:
+                rows = min(rows, shape[0])
+            elif maxshape[0] is not None:
+                rows = min(rows, maxshape[0])
+            opts = {'chunks': (max(rows, 1),) + shape[1:]}
+
+        if self.shuffle:
+            opts['shuffle'] = True
+        if self.compression is not None:
+            opts['compression'] = self.compression
+            if self.compression == 'gzip' and self.level is not None:
+                opts['compression_opts'] = self.level
+
+        return opts
+
+    def to_attrs(self, attrs):
+        """
+        Record this profile in a set of HDF5 attributes
+        """
+        values = [0 if self.chunk_rows is None else self.chunk_rows,
+            self.shuffle, '' if self.compression is None else self.compression,
+            -1 if self.level is None else self.level]
+        for (key, value) in zip(StorageProfile._ATTRS, values):
+            attrs[key] = value
+
+    @classmethod
+    def from_attrs(cls, attrs):
+        """
+        Read a profile back from a set of HDF5 attributes. Files created
+        before storage profiles were introduced get the uncompressed
+        default profile.
+        """
+        try:
+            (chunk_rows, shuffle, compression, level) = \
+                [attrs[key] for key in StorageProfile._ATTRS]
+        except KeyError:
+            return STORAGE_PROFILES['default']
+
+        if isinstance(compression, bytes):
+            compression = compression.decode()
+
+        return cls(None if chunk_rows <= 0 else int(chunk_rows), bool(shuffle),
+            None if compression == '' else str(compression),
+            None if level < 0 else int(level))
+
+
+STORAGE_PROFILES = {
+    'default': StorageProfile(),
+    'fast': StorageProfile(chunk_rows=1024, shuffle=True, compression='lzf'),
+    'compact': StorageProfile(chunk_rows=4096, shuffle=True, compression='gzip', level=6)
+}
+"""
+Predefined storage profiles. ``default`` stores data uncompressed (same as
+files without a storage profile), ``fast`` uses the light lzf filter and
+``compact`` trades some CPU time for considerably smaller files using gzip.
+"""
+
+
+WriterMetrics = namedtuple('WriterMetrics', ['queue_depth', 'max_queue_depth',
+    'submitted', 'completed', 'errors', 'flushes', 'last_flush_latency',
+    'max_flush_latency'])
+WriterMetrics.__doc__ = """
+Performance counters of an :class:`~arc2control.h5utils.H5DataStore`
+with a background writer thread. Latencies are in seconds.
+"""
+
+
+def _on_writer(wait):
+    # Run a datastore method on the writer thread if one is active. If
+    # ``wait`` is True the caller blocks until the request is done and
+    # gets its result; since requests are processed in order this means
+    # that reads always see every write submitted before them. Otherwise
+    # the request is queued and the call returns immediately, unless the
+    # queue is full in which case the caller blocks until there's room.
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            writer = self._writer
+            if writer is None or threading.current_thread() is writer:
+                return func(self, *args, **kwargs)
+
+            if wait:
+                future = Future()
+            else:
+                future = None
+                # arrays might be modified by the caller after this
+                # returns, so keep a private copy
+                args = tuple(np.array(a) if isinstance(a, np.ndarray) else a \
+                    for a in args)
+
+            # requests are submitted from any number of threads
+            with self._submit_lock:
+                self._submitted += 1
+            self._queue.put((func, args, kwargs, future))
+            with self._submit_lock:
+                self._max_queue_depth = max(self._max_queue_depth, \
+                    self._queue.qsize())
+
+            if future is not None:
+                return future.result()
+
+        return wrapper
+
+    return decorator
+
+
+class GrowthPolicy(namedtuple('GrowthPolicy', ['kind', 'rows'])):
+    """
+    How resizable datasets grow when they run out of rows. Use one of the
+    constructors instead of instantiating this directly.
+
+    * :meth:`~arc2control.h5utils.GrowthPolicy.doubling`: double the size
+      of the dataset until the new rows fit. This is the fewest number of
+      resizes but up to half of the dataset can be unused.
+    * :meth:`~arc2control.h5utils.GrowthPolicy.fixed`: grow in increments
+      of ``rows`` rows.
+    * :meth:`~arc2control.h5utils.GrowthPolicy.capped`: double the size
+      but never grow by more than ``rows`` rows at a time.
+    """
+
+    DOUBLING = 'doubling'
+    FIXED = 'fixed'
+    CAPPED = 'capped'
+
+    _ATTRS = ['GROWTH_POLICY', 'GROWTH_ROWS']
+
+    def __new__(cls, kind, rows=0):
+        if kind not in [cls.DOUBLING, cls.FIXED, cls.CAPPED]:
+            raise ValueError('Unknown growth policy: %s' % kind)
+        if kind != cls.DOUBLING and rows < 1:
+            raise ValueError('Growth policy %s requires a positive number of rows' % kind)
+        return super().__new__(cls, kind, int(rows))
+
+    @classmethod
+    def doubling(cls):
+        return cls(cls.DOUBLING)
+
+    @classmethod
+    def fixed(cls, rows):
+        return cls(cls.FIXED, rows)
+
+    @classmethod
+    def capped(cls, rows):
+        return cls(cls.CAPPED, rows)
+
+    def new_size(self, current, required):
+        """
+        New length of a dataset that currently has ``current`` rows and
+        needs to hold at least ``required`` rows.
+        """
+        if required <= current:
+            return current
+
+        if self.kind == GrowthPolicy.FIXED:
+            return current + math.ceil((required - current)/self.rows)*self.rows
+
+        size = max(current, 1)
+        while size < required:
+            if self.kind == GrowthPolicy.CAPPED:
+                size += min(size, self.rows)
+            else:
+                size *= 2
+
+        return size
+
+    def to_attrs(self, attrs):
+        """
+        Record this policy in a set of HDF5 attributes
+        """
+        attrs['GROWTH_POLICY'] = self.kind
+        attrs['GROWTH_ROWS'] = self.rows
 
-def _dataset_append(dset, row):
+    @classmethod
+    def from_attrs(cls, attrs):
+        """
+        Read a policy back from a set of HDF5 attributes. Files created
+        before growth policies were introduced always double.
+        """
+        try:
+            (kind, rows) = [attrs[key] for key in GrowthPolicy._ATTRS]
+        except KeyError:
+            return cls.doubling()
+
+        if isinstance(kind, bytes):
+            kind = kind.decode()
+
+        return cls(str(kind), int(rows))
+
+
+def _grow_dataset(dset, required, policy):
+    # resize the first dimension of a dataset so that it can hold at
+    # least `required` rows according to the specified growth policy
+    current = dset.shape[0]
+    if required <= current:
+        return
+    dset.resize((policy.new_size(current, required),) + dset.shape[1:])
+
+
+def _dataset_append(dset, row, policy=GrowthPolicy.doubling()):
     # this is a convenience method for chunked datasets that are created
     # with 'None' as maxshape. H5PY lacks an append function for datasets
     # so this one can be monkey-patched into datasets returned by H5DataStore
@@ -67,12 +368,386 @@ def _dataset_append(dset, row):
     try:
         dset[idx] = row
     except IndexError:
-        dset.resize((2*dset.shape[0], ))
+        _grow_dataset(dset, idx + 1, policy)
         dset[idx] = row
 
     dset.attrs['NROWS'] = idx + 1
 
 
+SUMMARY_FACTOR = 64
+"""
+Number of entries of a timeseries summary level that are reduced into a
+single entry of the next level
+"""
+
+SUMMARY_CHANNELS = ['current', 'abs_current', 'resistance', 'vpulse', 'vread']
+"""
+Quantities tracked by timeseries summaries: the current, the absolute
+current, the resistance (``|read_voltage/current|``), the pulse voltage of
+pulse operations and the read voltage of read operations
+"""
+
+_SUMMARY_DTYPE = [('%s_%s' % (c, m), '<f4') \
+    for c in SUMMARY_CHANNELS for m in ['min', 'max']]
+
+_ENVELOPE_DTYPE = [('index', '<i8')] + _SUMMARY_DTYPE
+
+# timeseries columns needed for summaries
+_SUMMARY_FIELDS = ['current', 'voltage', 'read_voltage', 'op_type']
+
+
+def _summary_channels(data):
+    # (rows × channels) array of the tracked quantities of raw timeseries
+    # rows; operations that are not pulses (or reads) have NaN pulse
+    # (or read) voltages so that they are ignored by the summary
+    values = np.empty(shape=(len(data), len(SUMMARY_CHANNELS)), dtype=np.float32)
+    current = data['current']
+    optype = data['op_type']
+    values[:, 0] = current
+    values[:, 1] = np.abs(current)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values[:, 2] = np.abs(data['read_voltage']/current)
+    values[:, 3] = np.where((optype & OpType.PULSE) == OpType.PULSE, \
+        data['voltage'], np.nan)
+    values[:, 4] = np.where((optype & OpType.READ) == OpType.READ, \
+        data['read_voltage'], np.nan)
+    return values
+
+
+def _summary_reduce(mins, maxs, first, factor):
+    # reduce consecutive entries starting at index ``first`` into buckets
+    # of ``factor`` entries aligned to multiples of ``factor``; returns the
+    # index of the first bucket and the bucket minima and maxima. NaNs are
+    # ignored unless a bucket has nothing but NaNs
+    buckets = (first + np.arange(len(mins))) // factor
+    starts = np.flatnonzero(np.diff(buckets, prepend=-1))
+    return (int(buckets[0]), np.fmin.reduceat(mins, starts, axis=0), \
+        np.fmax.reduceat(maxs, starts, axis=0))
+
+
+def _summary_to_rows(mins, maxs, index=None, channels=SUMMARY_CHANNELS):
+    # pack minima and maxima into a structured array
+    dtype = [('%s_%s' % (c, m), '<f4') for c in channels for m in ['min', 'max']]
+    if index is None:
+        rows = np.empty(shape=(len(mins),), dtype=dtype)
+    else:
+        rows = np.empty(shape=(len(mins),), dtype=[('index', '<i8')] + dtype)
+        rows['index'] = index
+    for (i, c) in enumerate(channels):
+        rows['%s_min' % c] = mins[:, i]
+        rows['%s_max' % c] = maxs[:, i]
+    return rows
+
+
+def _summary_from_rows(rows):
+    # inverse of _summary_to_rows; returns minima and maxima
+    mins = np.stack([rows['%s_min' % c] for c in SUMMARY_CHANNELS], axis=1)
+    maxs = np.stack([rows['%s_max' % c] for c in SUMMARY_CHANNELS], axis=1)
+    return (mins, maxs)
+
+
+def envelope(dset, channels, start=None, stop=None, width=1000, block_rows=65536):
+    """
+    Min/max envelope of an arbitrary table, such as a module dataset,
+    suitable for plotting rows ``[start, stop)`` across ``width`` pixels.
+    Unlike :meth:`~arc2control.h5utils.H5DataStore.timeseries_envelope`
+    there is no precomputed summary, so the rows are read in blocks of
+    ``block_rows`` and reduced on the fly. Memory use does not depend on the
+    size of the table and only about ``width`` entries are returned.
+
+    :param dset: A numpy array or h5py dataset
+    :param dict channels: Quantities to track, as a mapping of names to
+                          functions that compute them from a block of rows,
+                          eg. ``{'voltage': lambda rows: rows['voltage']}``
+    :param int start: First row, or ``None`` to start from the beginning
+    :param int stop: Row to stop at (exclusive), or ``None`` for the end
+    :param int width: Width of the plot in pixels
+    :param int block_rows: Number of rows to read at once
+
+    :return: A tuple with the number of rows per entry (1 for raw rows)
+             and a structured numpy array with fields ``index`` (the first
+             row of every entry), ``<channel>_min`` and ``<channel>_max``
+    """
+    names = list(channels.keys())
+    (start, stop, _) = slice(start, stop).indices(dset.shape[0])
+    stop = max(start, stop)
+    factor = max((stop - start) // max(width, 1), 1)
+    block = max(block_rows // factor, 1) * factor
+
+    parts = []
+    for bstart in range(start, stop, block):
+        rows = dset[bstart:min(bstart+block, stop)]
+        values = np.stack([np.asarray(channels[n](rows), dtype=np.float32) \
+            for n in names], axis=1)
+        (bucket, mins, maxs) = _summary_reduce(values, values, bstart - start, factor)
+        parts.append(_summary_to_rows(mins, maxs, start + factor * \
+            np.arange(bucket, bucket + len(mins), dtype=np.int64), names))
+
+    if len(parts) == 0:
+        return (factor, _summary_to_rows(np.empty((0, len(names))), \
+            np.empty((0, len(names))), np.empty(0, dtype=np.int64), names))
+
+    return (factor, np.concatenate(parts))
+
+
+STATS_METRICS = ['count', 'samples', 'first', 'last', 'drift', 'min', 'max', \
+    'mean', 'variance', 'std', 'reads', 'pulses', 'pulsereads']
+"""
+Per-crosspoint statistics available from
+:meth:`~arc2control.h5utils.H5DataStore.stats` and
+:meth:`~arc2control.h5utils.H5DataStore.stats_array`: the number of
+timeseries entries (``count``), the number of entries with a valid
+resistance (``samples``), the first and last valid resistance and their
+difference (``drift``), the minimum, maximum, mean, variance and standard
+deviation of the resistance and the number of read, pulse and pulse-read
+operations
+"""
+
+# all fields are doubles so that the statistics can be stored as a plain
+# (bits × words × fields) array; compound element writes are much slower
+_STATS_FIELDS = ['count', 'samples', 'first', 'last', 'min', 'max', 'mean', \
+    'm2', 'reads', 'pulses', 'pulsereads']
+_STATS_DTYPE = [(f, '<f8') for f in _STATS_FIELDS]
+
+
+def _stats_empty(shape):
+    stats = np.zeros(shape=shape, dtype=_STATS_DTYPE)
+    for field in ['first', 'last', 'min', 'max']:
+        stats[field] = np.nan
+    return stats
+
+
+def _stats_raw(stats):
+    # (bits × words × fields) float view of the statistics
+    return stats.view(np.float64).reshape(stats.shape + (len(_STATS_FIELDS),))
+
+
+def _stats_add(stats, word, bit, current, read_voltage, optype):
+    # single entry version of _stats_update (Welford's algorithm)
+    rec = stats[bit, word]
+    rec['count'] += 1
+    if optype == OpType.READ:
+        rec['reads'] += 1
+    elif optype == OpType.PULSE:
+        rec['pulses'] += 1
+    elif optype == OpType.PULSEREAD:
+        rec['pulsereads'] += 1
+
+    try:
+        res = abs(float(read_voltage)/float(current))
+    except ZeroDivisionError:
+        return
+    if not math.isfinite(res):
+        return
+
+    n = rec['samples'] + 1
+    delta = res - rec['mean']
+    mean = rec['mean'] + delta/n
+    rec['m2'] += delta * (res - mean)
+    rec['mean'] = mean
+    rec['samples'] = n
+    if n == 1:
+        (rec['first'], rec['min'], rec['max']) = (res, res, res)
+    else:
+        rec['min'] = min(rec['min'], res)
+        rec['max'] = max(rec['max'], res)
+    rec['last'] = res
+
+
+def _stats_update(stats, words, bits, data):
+    # merge a batch of timeseries rows into the running statistics of their
+    # crosspoints; ``stats`` is indexed [bit, word] like the crossbar raster
+    # and the rows of each crosspoint must be in chronological order. The
+    # mean and variance of every crosspoint in the batch are computed first
+    # and then combined with the existing ones (Chan et al.) so there's no
+    # need to revisit older rows
+    flat = np.asarray(bits, dtype=np.int64) * stats.shape[1] + \
+        np.asarray(words, dtype=np.int64)
+    order = np.argsort(flat, kind='stable')
+    flat = flat[order]
+    data = data[order]
+
+    starts = np.flatnonzero(np.diff(flat, prepend=-1))
+    sizes = np.diff(np.append(starts, len(flat)))
+    xpts = flat[starts]
+    view = stats.reshape(-1)
+
+    optype = data['op_type']
+    view['count'][xpts] += sizes
+    for (field, op) in [('reads', OpType.READ), ('pulses', OpType.PULSE), \
+        ('pulsereads', OpType.PULSEREAD)]:
+        view[field][xpts] += np.add.reduceat((optype == op).astype(np.float64), starts)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        res = np.abs(data['read_voltage']/data['current']).astype(np.float64)
+    valid = np.isfinite(res)
+    if not valid.any():
+        return
+
+    n_b = np.add.reduceat(valid.astype(np.float64), starts)
+    clean = np.where(valid, res, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_b = np.add.reduceat(clean, starts) / n_b
+    # group of every row, to spread the batch means back over the rows
+    rowgroup = np.repeat(np.arange(len(starts)), sizes)
+    m2_b = np.add.reduceat(np.where(valid, res - mean_b[rowgroup], 0.0)**2, starts)
+
+    nans = np.where(valid, res, np.nan)
+    min_b = np.fmin.reduceat(nans, starts)
+    max_b = np.fmax.reduceat(nans, starts)
+    positions = np.arange(len(res))
+    first_b = res[np.minimum.reduceat(np.where(valid, positions, len(res)), \
+        starts).clip(max=len(res)-1)]
+    last_b = res[np.maximum.reduceat(np.where(valid, positions, -1), starts)]
+
+    # only crosspoints with at least one valid resistance in this batch
+    has = n_b > 0
+    (xpts, n_b, mean_b, m2_b) = (xpts[has], n_b[has], mean_b[has], m2_b[has])
+    n_a = view['samples'][xpts]
+    mean_a = view['mean'][xpts]
+    n = n_a + n_b
+    delta = mean_b - mean_a
+
+    view['first'][xpts] = np.where(n_a == 0, first_b[has], view['first'][xpts])
+    view['last'][xpts] = last_b[has]
+    view['min'][xpts] = np.fmin(view['min'][xpts], min_b[has])
+    view['max'][xpts] = np.fmax(view['max'][xpts], max_b[has])
+    view['mean'][xpts] = mean_a + delta * n_b / n
+    view['m2'][xpts] = view['m2'][xpts] + m2_b + delta**2 * n_a * n_b / n
+    view['samples'][xpts] = n
+
+
+def _stats_metric(stats, metric):
+    # derive one of STATS_METRICS from the raw statistics
+    if metric not in STATS_METRICS:
+        raise ValueError('Unknown statistic: %s' % metric)
+
+    samples = stats['samples'].astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if metric == 'mean':
+            return np.where(samples > 0, stats['mean'], np.nan)
+        elif metric == 'variance':
+            return np.where(samples > 0, stats['m2']/samples, np.nan)
+        elif metric == 'std':
+            return np.sqrt(np.where(samples > 0, stats['m2']/samples, np.nan))
+        elif metric == 'drift':
+            return stats['last'] - stats['first']
+        return stats[metric].copy()
+
+
+class RasterFrame(namedtuple('RasterFrame', ['index', 'tstamp', 'current', 'voltage'])):
+    """
+    A frame of the crossbar raster history: its index, the time it was
+    recorded (seconds since the epoch) and the current and voltage rasters,
+    indexed by ``[bit, word]`` like
+    :attr:`~arc2control.h5utils.H5DataStore.current`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def resistance(self):
+        """
+        Resistance raster of this frame
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.abs(self.voltage/self.current)
+
+
+# compression used for the raster history if the storage profile of the
+# datastore has no filters; frames are mostly noise but the shuffle filter
+# still helps with the exponents
+_HISTORY_PROFILE = StorageProfile(shuffle=True, compression='gzip', level=4)
+
+
+class _TimeseriesHandle:
+    # An open crosspoint timeseries dataset along with its cached number of
+    # rows and its (word, bit) coordinates. This is used by H5DataStore to
+    # avoid path lookups and attribute reads on every update. ``summary``
+    # and ``covered`` cache the summary group of the timeseries and the
+    # number of rows it includes once it has been looked up.
+
+    __slots__ = ('dset', 'nrows', 'word', 'bit', 'summary', 'covered')
+
+    def __init__(self, dset, nrows, word, bit):
+        self.dset = dset
+        self.nrows = nrows
+        self.word = word
+        self.bit = bit
+        self.summary = None
+        self.covered = 0
+
+
+class _WriterAttributes:
+    # Attributes of a dataset wrapped by _WriterDataset. Item access is
+    # done on the writer thread, everything else is forwarded as is
+
+    def __init__(self, store, attrs):
+        self._store = store
+        self._attrs = attrs
+
+    def __getattr__(self, name):
+        return getattr(self._attrs, name)
+
+    def __getitem__(self, key):
+        return self._store._writer_call(self._attrs.__getitem__, key)
+
+    def __setitem__(self, key, value):
+        self._store._writer_call(self._attrs.__setitem__, key, value)
+
+    def __delitem__(self, key):
+        self._store._writer_call(self._attrs.__delitem__, key)
+
+    def __contains__(self, key):
+        return self._store._writer_call(self._attrs.__contains__, key)
+
+    def __iter__(self):
+        return iter(self._store._writer_call(lambda: list(self._attrs.keys())))
+
+    def __len__(self):
+        return self._store._writer_call(self._attrs.__len__)
+
+
+class _WriterDataset:
+    # A dataset of an H5DataStore with a background writer. Data and
+    # attribute access, appends and resizes are done on the writer thread
+    # so that they are ordered with every other request of the datastore;
+    # everything else (name, shape, dtype, ...) is forwarded to the
+    # underlying h5py dataset
+
+    def __init__(self, store, dset):
+        self._store = store
+        self._dset = dset
+        self.attrs = _WriterAttributes(store, dset.attrs)
+
+    def __getattr__(self, name):
+        return getattr(self._dset, name)
+
+    def __repr__(self):
+        return repr(self._dset)
+
+    def __len__(self):
+        return len(self._dset)
+
+    def __getitem__(self, key):
+        return self._store._writer_call(self._dset.__getitem__, key)
+
+    def __setitem__(self, key, value):
+        self._store._writer_call(self._dset.__setitem__, key, value)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self[()], dtype=dtype)
+
+    def __iter__(self):
+        return iter(self[()])
+
+    def append(self, row):
+        self._store._writer_call(self._dset.append, row)
+
+    def resize(self, size, axis=None):
+        self._store._writer_call(self._dset.resize, size, axis)
+
+
 class H5DataStore:
     """
     This is the toplevel class that interacts with an HDF5 datastore suitable
@@ -90,6 +765,68 @@ class H5DataStore:
     >>> with H5DataStore('/path/to/store', 'dataset') as ds:
     >>>     ds.update_status(0, 0, 10e-6, 1.0, 100e-6, 0.2)
     >>> # file is saved here
+
+    If ``writebehind`` is ``True`` single row updates done with
+    :meth:`~arc2control.h5utils.H5DataStore.update_status` are not written
+    to the file immediately. Instead rows are kept in memory, per crosspoint,
+    and they are written in one go when either ``flush_rows`` rows are
+    pending, ``flush_interval`` seconds have passed since the last flush or
+    when :meth:`~arc2control.h5utils.H5DataStore.flush` or
+    :meth:`~arc2control.h5utils.H5DataStore.close` are called. Pending rows
+    are always visible through :meth:`~arc2control.h5utils.H5DataStore.timeseries`.
+
+    If ``threaded`` is ``True`` a background thread is started that takes
+    over all interaction with the underlying HDF5 file. Row updates are
+    queued and the calling thread returns immediately; if more than
+    ``queue_size`` requests are waiting the caller blocks until the writer
+    catches up. All other methods are executed on the writer thread as well
+    and wait for the result, so they always observe all previously submitted
+    updates. Tables returned by the datastore are wrapped so that access to
+    their data is done by the writer as well; see
+    :meth:`~arc2control.h5utils.H5DataStore.dataset`. With write-behind
+    enabled the writer also flushes pending rows every ``flush_interval``
+    seconds when idle. See
+    :attr:`~arc2control.h5utils.H5DataStore.writer_metrics` for queue and
+    flush statistics.
+
+    If ``swmr`` is ``True`` new files are created for single-writer/multiple-
+    reader access: the timeseries of every crosspoint is created upfront and
+    the file is switched to SWMR mode once its structure is in place. Other
+    processes can then follow the datastore while it's being written to with
+    :class:`~arc2control.h5utils.H5DataStoreFollower`. Timeseries rows are
+    published as soon as they are written to the file (so, with write-behind,
+    when they are flushed); everything else becomes visible on
+    :meth:`~arc2control.h5utils.H5DataStore.flush`. Files created this way
+    are switched back to SWMR mode whenever they are opened for writing,
+    unless ``swmr`` is ``False``. SWMR writing requires HDF5 2.0 or newer,
+    see :data:`~arc2control.h5utils.SWMR_SUPPORTED`; with older versions
+    such files are opened normally.
+
+    :param str fname: The filename of the datastore
+    :param str name: The internal name of the datastore
+    :param mode: The access mode; see :class:`~arc2control.h5utils.H5Mode`
+    :param shape: The crossbar size (only used for new files)
+    :param bool writebehind: Buffer single row updates in memory
+    :param int flush_rows: Number of pending rows that trigger a flush
+    :param float flush_interval: Seconds after which pending rows are flushed
+    :param bool threaded: Do all file access on a background writer thread
+    :param int queue_size: Maximum number of queued requests for the writer
+    :param profile: A :class:`~arc2control.h5utils.StorageProfile` or the
+                    name of one of the predefined
+                    :data:`~arc2control.h5utils.STORAGE_PROFILES` that
+                    determines chunking and compression of the datastore
+                    tables. This is only used for new files; existing files
+                    always use the profile they were created with.
+    :param growth: A :class:`~arc2control.h5utils.GrowthPolicy` that determines
+                   how timeseries and resizable tables grow when full; defaults
+                   to doubling. Like ``profile`` this is recorded in new files
+                   and ignored for existing ones.
+    :param bool swmr: Allow other processes to read the file while it's being
+                      written to; ``None`` to only do so for files that were
+                      created for it. Raises
+                      :class:`~arc2control.h5utils.H5SWMRError` if ``True``
+                      and :data:`~arc2control.h5utils.SWMR_SUPPORTED` is
+                      ``False``
     """
 
     _TSERIES_DTYPE=[
@@ -99,21 +836,208 @@ class H5DataStore:
         ('read_voltage', '<f4'),
         ('op_type', '<u4')]
 
-    _BASE_SIZE = 1000
+    _CATALOG_DTYPE = [
+        ('kind', '<u1'),
+        ('word', '<i4'),
+        ('bit', '<i4'),
+        ('tag', h5py.string_dtype()),
+        ('tstamp', '<i8'),
+        ('path', h5py.string_dtype()),
+        ('nrows', '<i8')]
 
-    def __init__(self, fname, name=None, mode=H5Mode.APPEND, shape=(32, 32)):
+    _BASE_SIZE = 1000
+    _SUMMARY_MIN_ROWS = SUMMARY_FACTOR * SUMMARY_FACTOR
+    _SUMMARY_BLOCK_ROWS = 65536
+    # summary levels created upfront in SWMR mode; this covers timeseries
+    # of up to SUMMARY_FACTOR**3 rows. Every level costs about a second
+    # and half a megabyte for a 32×32 crossbar so further levels are only
+    # created when needed
+    _SWMR_SUMMARY_LEVELS = 2
+    _FLUSH_ROWS = 512
+    _FLUSH_INTERVAL = 1.0
+    _QUEUE_SIZE = 4096
+    _COMPACT_BLOCK_ROWS = 65536
+
+    def __init__(self, fname, name=None, mode=H5Mode.APPEND, shape=(32, 32),
+        writebehind=False, flush_rows=_FLUSH_ROWS, flush_interval=_FLUSH_INTERVAL,
+        threaded=False, queue_size=_QUEUE_SIZE, profile=None, growth=None, swmr=None):
         self._fname = fname
         if name is None:
             name = os.path.basename(fname)
 
-        self._h5 = h5py.File(fname, mode.value)
+        self._writebehind = writebehind
+        self._flush_rows = flush_rows
+        self._flush_interval = flush_interval
+        # pending timeseries rows, keyed by (word, bit)
+        self._pending = {}
+        # pending crossbar raster values, keyed by (word, bit)
+        self._pending_raster = {}
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        # open timeseries handles, keyed by (word, bit)
+        self._handles = {}
+        # open crossbar raster datasets (current, voltage)
+        self._raster = None
+        # in-memory copy of the experiment catalog
+        self._catalog = None
+        # paths of tables appended to since their catalog entries were
+        # last updated
+        self._catalog_stale = set()
+        # crosspoints whose summary does not include their last rows yet
+        self._summary_stale = set()
+        # in-memory copy of the crosspoint statistics and whether
+        # they have been modified since they were last written
+        self._stats = None
+        self._stats_dset = None
+        self._stats_dirty = False
+        self._last_stats_write = time.monotonic()
+        # background writer and its statistics
+        self._writer = None
+        self._queue = None
+        self._submitted = 0
+        self._submit_lock = threading.Lock()
+        self._completed = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._flushes = 0
+        self._last_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+        # published row counts of all timeseries, if in SWMR mode
+        self._nrows = None
+        self._published = None
+
+        if swmr and not SWMR_SUPPORTED:
+            raise H5SWMRError('SWMR mode requires HDF5 2.0 or newer '
+                '(h5py is using HDF5 %s)' % h5py.version.hdf5_version)
+
+        if mode == H5Mode.WRITE and swmr:
+            # SWMR requires the latest file format
+            self._h5 = h5py.File(fname, mode.value, libver='latest')
+        else:
+            self._h5 = h5py.File(fname, mode.value)
 
         # create file structure if it's a new file
         if mode == H5Mode.WRITE and self._h5.mode == H5Mode.READEX.value:
+            if profile is None:
+                profile = STORAGE_PROFILES['default']
+            elif isinstance(profile, str):
+                profile = STORAGE_PROFILES[profile]
+            self._profile = profile
+            if growth is None:
+                growth = GrowthPolicy.doubling()
+            self._growth = growth
             self.__create_structure(shape, name)
+            if swmr:
+                self.__start_swmr()
         # if not (append/read) check if file structure is correct
         else:
             self.__fsck(fname)
+            self._profile = StorageProfile.from_attrs(self._h5.attrs)
+            self._growth = GrowthPolicy.from_attrs(self._h5.attrs)
+            if self._h5.mode != H5Mode.READ.value and swmr is not False and \
+                bool(self._h5.attrs.get('SWMR', False)):
+                if SWMR_SUPPORTED:
+                    self._h5.close()
+                    self._h5 = h5py.File(fname, mode.value, libver='latest')
+                    self.__start_swmr()
+                else:
+                    logger.warning('%s was created for SWMR access but HDF5 %s '
+                        'does not support SWMR writing; opening it normally' % \
+                        (os.path.basename(fname), h5py.version.hdf5_version))
+
+        if threaded:
+            self._queue = queue.Queue(maxsize=queue_size)
+            self._writer = threading.Thread(target=self.__writer_loop, \
+                name='H5Writer-%s' % os.path.basename(fname), daemon=True)
+            self._writer.start()
+
+    def __writer_loop(self):
+        while True:
+            if self._pending_rows > 0:
+                timeout = max(self._flush_interval - \
+                    (time.monotonic() - self._last_flush), 0.0)
+            else:
+                timeout = None
+
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # idle; write out anything that has been pending for too long
+                self.__run_request(H5DataStore.__maybe_flush, (), {}, None)
+                continue
+
+            if item is None:
+                break
+
+            self.__run_request(*item)
+            self._completed += 1
+
+    def __run_request(self, func, args, kwargs, future):
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception as exc:
+            if future is None:
+                self._errors += 1
+                logger.error('Background write to %s failed: %s' % \
+                    (os.path.basename(self._fname), exc))
+            else:
+                future.set_exception(exc)
+        else:
+            if future is not None:
+                future.set_result(result)
+
+    def __stop_writer(self):
+        if self._writer is None:
+            return
+        # the sentinel is processed after every other queued request
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+
+    @property
+    def profile(self):
+        """
+        The :class:`~arc2control.h5utils.StorageProfile` used for new tables
+        in this datastore
+        """
+        return self._profile
+
+    @property
+    def growth(self):
+        """
+        The :class:`~arc2control.h5utils.GrowthPolicy` used when resizing
+        timeseries and tables of this datastore
+        """
+        return self._growth
+
+    @property
+    def threaded(self):
+        """
+        Whether file access is done on a background writer thread
+        """
+        return self._writer is not None
+
+    @property
+    def queue_depth(self):
+        """
+        Number of requests waiting for the background writer (always 0
+        when no writer is running)
+        """
+        if self._queue is None:
+            return 0
+        return self._queue.qsize()
+
+    @property
+    def writer_metrics(self):
+        """
+        A :class:`~arc2control.h5utils.WriterMetrics` snapshot with the
+        current queue depth, the largest queue depth observed, the number of
+        submitted and completed requests, failed background writes and
+        the number, last and maximum latency of flushes.
+        """
+        return WriterMetrics(self.queue_depth, self._max_queue_depth, \
+            self._submitted, self._completed, self._errors, self._flushes, \
+            self._last_flush_latency, self._max_flush_latency)
 
     def __fsck(self, fname):
         attrs = self._h5.attrs
@@ -155,6 +1079,9 @@ class H5DataStore:
         self._h5.attrs['words'] = shape[0]
         self._h5.attrs['bits'] = shape[1]
 
+        self._profile.to_attrs(self._h5.attrs)
+        self._growth.to_attrs(self._h5.attrs)
+
         for grp in ['crossbar', 'crosspoints', 'synthetics', 'sequences']:
             self.__create_top_level_group(grp)
 
@@ -166,6 +1093,78 @@ class H5DataStore:
         self._h5['crossbar'].attrs['words'] = shape[0]
         self._h5['crossbar'].attrs['bits'] = shape[1]
 
+        if 'stats' not in self._h5['crossbar']:
+            self._stats = _stats_empty(shape)
+            self.__write_stats()
+
+        if 'catalog' not in self._h5:
+            self.__create_catalog()
+
+    def __start_swmr(self):
+        # the timeseries of every crosspoint and their summaries are
+        # created before switching to SWMR mode so that readers don't have
+        # to discover new objects for the data they follow. Other objects
+        # (experiment tables, raster history, crosspoints beyond the
+        # ones precreated here) are still created while in SWMR mode,
+        # hence SWMR_SUPPORTED. Row counts are published in a dataset as
+        # readers can refresh datasets but not attributes
+        attrs = self._h5.attrs
+        for word in range(int(attrs['words'])):
+            for bit in range(int(attrs['bits'])):
+                self.__create_timeseries(word, bit)
+                handle = self.__timeseries_handle(word, bit)
+                self.__sync_summary(handle)
+                grp = handle.dset.parent
+                summary = grp['summary'] if 'summary' in grp else \
+                    self.__create_summary(grp)
+                for level in range(1, self._SWMR_SUMMARY_LEVELS + 1):
+                    self.__summary_level(summary, level)
+
+        published = np.zeros(shape=self._h5['crossbar']['current'].shape, \
+            dtype=np.int64)
+        for ((word, bit), handle) in self.__all_timeseries():
+            published[bit, word] = handle.nrows
+
+        crossbar = self._h5['crossbar']
+        if 'nrows' not in crossbar:
+            dset = crossbar.create_dataset('nrows', shape=published.shape, \
+                dtype=np.int64)
+            dset.attrs['TITLE'] = 'nrows'
+        self._nrows = crossbar['nrows']
+        self._nrows[...] = published
+        self._published = published
+        self.__stats_table()
+        if self._stats_dirty or 'stats' not in crossbar:
+            self.__write_stats()
+
+        self._h5.attrs['SWMR'] = True
+        self._h5.swmr_mode = True
+
+    def __all_timeseries(self):
+        for key in self._h5['crosspoints'].keys():
+            match = _WB_KEY.fullmatch(key)
+            if match is not None:
+                (word, bit) = (int(match.group(1)), int(match.group(2)))
+                yield ((word, bit), self.__timeseries_handle(word, bit, create=False))
+
+    def __publish(self, handles):
+        # make the rows of the specified timeseries visible to SWMR
+        # readers; rows have to be on disk before their count is
+        if self._nrows is None:
+            return
+        for handle in handles:
+            handle.dset.flush()
+            self._published[handle.bit, handle.word] = handle.nrows
+        self._nrows[...] = self._published
+        self._nrows.flush()
+
+    @property
+    def swmr(self):
+        """
+        Whether the file is open in SWMR mode
+        """
+        return self._nrows is not None
+
     def __create_top_level_group(self, name):
         try:
             grp = self._h5.create_group(name)
@@ -175,6 +1174,7 @@ class H5DataStore:
             pass
 
     @property
+    @_on_writer(wait=True)
     def name(self):
         """
         The name associated with this data store
@@ -185,6 +1185,7 @@ class H5DataStore:
             return None
 
     @name.setter
+    @_on_writer(wait=True)
     def name(self, name):
         """
         Change the name of this data store. This is _not_ the filename
@@ -204,25 +1205,179 @@ class H5DataStore:
         """
         return self._fname
 
+    @property
+    def writebehind(self):
+        """
+        Whether single row updates are buffered in memory before being
+        written to the file
+        """
+        return self._writebehind
+
+    @writebehind.setter
+    @_on_writer(wait=True)
+    def writebehind(self, enabled):
+        """
+        Enable or disable write-behind buffering. Disabling write-behind
+        will flush all pending rows first.
+
+        :param bool enabled: Whether to buffer single row updates
+        """
+        if not enabled:
+            self.flush()
+        self._writebehind = enabled
+
+    @property
+    def pending_rows(self):
+        """
+        Number of rows buffered in memory and not yet written to the file
+        """
+        return self._pending_rows
+
+    @_on_writer(wait=True)
+    def flush(self):
+        """
+        Write all buffered rows to the file. Each crosspoint with pending
+        rows is written with a single slice write and a single ``NROWS``
+        update. Modified crosspoint statistics and any summary entries
+        still kept in memory are written as well.
+        This is a no-op if nothing is pending. Rows are not necessarily on
+        disk afterwards; see :meth:`~arc2control.h5utils.H5DataStore.sync`.
+        """
+        if len(self._pending) == 0 and len(self._pending_raster) == 0 and \
+            not self._stats_dirty and len(self._catalog_stale) == 0 and \
+            len(self._summary_stale) == 0:
+            self._last_flush = time.monotonic()
+            return
+
+        start = time.monotonic()
+
+        try:
+            handles = [self.__flush_timeseries(word, bit, publish=False) \
+                for (word, bit) in list(self._pending.keys())]
+            self.__publish(handles)
+            self.__sync_summaries()
+
+            if len(self._pending_raster) > 0:
+                (cdset, vdset) = self.__raster_handles()
+                current = cdset[:]
+                voltage = vdset[:]
+                for ((word, bit), (i, v)) in self._pending_raster.items():
+                    current[bit, word] = i
+                    voltage[bit, word] = v
+                cdset[:] = current
+                vdset[:] = voltage
+                self._pending_raster.clear()
+
+            if self._stats_dirty:
+                self.__write_stats()
+
+            self.__sync_catalog()
+
+            if self._nrows is not None:
+                # make everything else visible to SWMR readers as well
+                self._h5.flush()
+        finally:
+            # even if writing failed; don't retry on every single update
+            self._last_flush = time.monotonic()
+
+        self._flushes += 1
+        self._last_flush_latency = self._last_flush - start
+        self._max_flush_latency = max(self._max_flush_latency, \
+            self._last_flush_latency)
+
+    @_on_writer(wait=True)
+    def sync(self):
+        """
+        Write all buffered rows, as :meth:`~arc2control.h5utils.H5DataStore.flush`
+        does, and then have HDF5 write its own buffers and metadata to disk.
+        :meth:`~arc2control.h5utils.H5DataStore.flush` only makes buffered
+        rows part of the HDF5 file; this is required before the file can be
+        opened by another process, for instance with
+        :func:`~arc2control.export.export_store`, as the on-disk file is
+        otherwise incomplete or out of date.
+        """
+        if self._h5.mode == H5Mode.READ.value:
+            return
+        self.flush()
+        self._h5.flush()
+
+    def __flush_timeseries(self, word, bit, publish=True):
+        try:
+            rows = self._pending.pop((word, bit))
+        except KeyError:
+            return None
+
+        self._pending_rows -= len(rows)
+        handle = self.__timeseries_handle(word, bit)
+        self.__append_rows(handle, np.array(rows, dtype=self._TSERIES_DTYPE), \
+            publish=publish)
+
+        return handle
+
+    def __flush_crosspoint(self, word, bit):
+        # flush pending data of a single crosspoint; this is used to
+        # preserve the order of rows when writes bypass the buffer
+        self.__flush_timeseries(word, bit)
+
+        try:
+            (current, voltage) = self._pending_raster.pop((word, bit))
+            (cdset, vdset) = self.__raster_handles()
+            cdset[bit, word] = current
+            vdset[bit, word] = voltage
+        except KeyError:
+            pass
+
+    def __maybe_flush(self):
+        if self._pending_rows >= self._flush_rows or \
+            (time.monotonic() - self._last_flush) >= self._flush_interval:
+            self.flush()
+
     def close(self):
         """
-        Close the file. It needs to be reopened again for any other
+        Close the file. Any buffered rows are written before closing and
+        the background writer, if any, is stopped after processing all
+        queued requests. It needs to be reopened again for any other
         interaction.
         """
+        self.__stop_writer()
+        if self._h5.mode != H5Mode.READ.value:
+            self.flush()
+        self.invalidate_cache()
         self._h5.flush()
         self._h5.close()
 
+    @_on_writer(wait=True)
+    def invalidate_cache(self):
+        """
+        Drop all cached dataset handles, row counts and crosspoint
+        statistics; modified statistics are written first. This is done
+        automatically when the datastore is closed but should also be
+        called if the ``NROWS`` attribute of a crosspoint timeseries is
+        modified externally, for instance via a dataset obtained from
+        :meth:`~arc2control.h5utils.H5DataStore.dataset`.
+        """
+        # as are incomplete summaries
+        self.__sync_summaries()
+        self._handles.clear()
+        self._raster = None
+        self._catalog = None
+        # statistics that have not been written yet would be lost
+        if self._stats_dirty:
+            self.__write_stats()
+        self._stats = None
+        self._stats_dset = None
+
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, traceback):
-        self._h5.flush()
-        self._h5.close()
+        self.close()
 
     def __getitem__(self, key):
         return self.dataset(key)
 
     @property
+    @_on_writer(wait=True)
     def current(self):
         """
         Current view of the crossbar raster
@@ -230,12 +1385,30 @@ class H5DataStore:
         return self._h5['crossbar']['current'][:]
 
     @property
+    @_on_writer(wait=True)
     def voltage(self):
         """
         Voltage view of the crossbar raster
         """
         return self._h5['crossbar']['voltage'][:]
 
+    @_on_writer(wait=False)
+    def set_raster(self, current, voltage):
+        """
+        Replace the whole crossbar raster. Single values of the raster that
+        are still pending are discarded as they are older than the new
+        raster.
+
+        :param current: The current of every crosspoint, in the same layout
+                        as :attr:`~arc2control.h5utils.H5DataStore.current`
+        :param voltage: The read-out voltage of every crosspoint, in the same
+                        layout as :attr:`~arc2control.h5utils.H5DataStore.voltage`
+        """
+        self._pending_raster.clear()
+        (cdset, vdset) = self.__raster_handles()
+        cdset[:] = current
+        vdset[:] = voltage
+
     @property
     def resistance(self):
         """
@@ -251,6 +1424,7 @@ class H5DataStore:
         return np.abs(self.current/self.voltage)
 
     @property
+    @_on_writer(wait=True)
     def shape(self):
         """
         Size of the crossbar stored in this data store
@@ -258,6 +1432,7 @@ class H5DataStore:
         attrs = self._h5.attrs
         return (attrs['words'], attrs['bits'])
 
+    @_on_writer(wait=True)
     def keys(self):
         """
         Top-level keys of this dataset
@@ -266,18 +1441,182 @@ class H5DataStore:
         """
         return self._h5.keys()
 
+    @_on_writer(wait=False)
+    def append_frame(self, tstamp=None):
+        """
+        Record the current state of the crossbar raster, including values
+        still buffered in memory, as a new frame of the raster history. The
+        history is kept in ``/crossbar/history`` as (frames × bits × words)
+        datasets, chunked by frame and compressed, along with the time each
+        frame was recorded. It is created on the first call so datastores
+        that never record frames are not affected. ArC2Control records a
+        frame after every read-all operation if enabled.
+
+        :param float tstamp: Time of the frame in seconds since the epoch;
+                             ``None`` for now
+        """
+        if tstamp is None:
+            tstamp = time.time()
+
+        (cdset, vdset) = self.__raster_handles()
+        current = cdset[:]
+        voltage = vdset[:]
+        for ((word, bit), (i, v)) in self._pending_raster.items():
+            current[bit, word] = i
+            voltage[bit, word] = v
+
+        try:
+            grp = self._h5['crossbar']['history']
+        except KeyError:
+            grp = self.__create_history(current.shape)
+
+        idx = int(grp['tstamp'].attrs['NROWS'])
+        for (name, data) in [('current', current), ('voltage', voltage), \
+            ('tstamp', tstamp)]:
+            dset = grp[name]
+            _grow_dataset(dset, idx + 1, self._growth)
+            dset[idx] = data
+            dset.attrs['NROWS'] = idx + 1
+
+    def __create_history(self, shape):
+        profile = self._profile if self._profile.filtered else _HISTORY_PROFILE
+        opts = {'shuffle': profile.shuffle, 'compression': profile.compression, \
+            'compression_opts': profile.level}
+
+        grp = self._h5['crossbar'].create_group('history')
+        grp.attrs['CLASS'] = 'GROUP'
+        for name in ['current', 'voltage']:
+            dset = grp.create_dataset(name, shape=(0,) + shape, dtype=np.float32, \
+                maxshape=(None,) + shape, chunks=(1,) + shape, **opts)
+            dset.attrs['NROWS'] = 0
+        dset = grp.create_dataset('tstamp', shape=(0,), dtype='<f8', \
+            maxshape=(None,), chunks=True)
+        dset.attrs['NROWS'] = 0
+
+        return grp
+
+    @property
+    @_on_writer(wait=True)
+    def frame_count(self):
+        """
+        Number of frames in the raster history
+        """
+        try:
+            return int(self._h5['crossbar']['history']['tstamp'].attrs['NROWS'])
+        except KeyError:
+            return 0
+
+    @_on_writer(wait=True)
+    def frame_times(self):
+        """
+        Time each frame of the raster history was recorded at, in seconds
+        since the epoch
+
+        :return: A numpy array with one entry per frame
+        """
+        try:
+            dset = self._h5['crossbar']['history']['tstamp']
+        except KeyError:
+            return np.empty(shape=(0,), dtype='<f8')
+        return dset[:int(dset.attrs['NROWS'])]
+
+    @_on_writer(wait=True)
+    def frame(self, index):
+        """
+        A single frame of the raster history. Every frame is stored in its
+        own chunk so only that frame is read and decompressed, no matter
+        how long the history is.
+
+        :param int index: The frame to read; negative values count from
+                          the end
+        :return: A :class:`~arc2control.h5utils.RasterFrame`
+        :raise IndexError: If there is no such frame
+        """
+        try:
+            grp = self._h5['crossbar']['history']
+            nframes = int(grp['tstamp'].attrs['NROWS'])
+        except KeyError:
+            nframes = 0
+
+        if index < 0:
+            index += nframes
+        if index < 0 or index >= nframes:
+            raise IndexError('Frame index out of range')
+
+        return RasterFrame(index, float(grp['tstamp'][index]), \
+            grp['current'][index], grp['voltage'][index])
+
+    def seek_frame(self, tstamp):
+        """
+        Index of the frame that shows the crossbar as it was at ``tstamp``,
+        ie. the last frame recorded at or before that time. Times before
+        the first frame map to the first frame.
+
+        :param float tstamp: Time in seconds since the epoch
+        :return: The frame index, or ``None`` if there is no history
+        """
+        times = self.frame_times()
+        if len(times) == 0:
+            return None
+        return max(int(np.searchsorted(times, tstamp, side='right')) - 1, 0)
+
+    def frames(self, start=None, stop=None, step=1):
+        """
+        Play back the raster history, one frame at a time. Arguments follow
+        python slice conventions; frames are read as they are requested.
+
+        :return: A generator of :class:`~arc2control.h5utils.RasterFrame`
+        """
+        for index in range(*slice(start, stop, step).indices(self.frame_count)):
+            yield self.frame(index)
+
     def __create_timeseries(self, word, bit):
+        # no need to look into the file if the timeseries is
+        # already open
+        if (word, bit) in self._handles:
+            return
         grp_name = 'W%02dB%02d' % (word, bit)
         if grp_name not in self._h5['crosspoints']:
             grp = self._h5['crosspoints'].create_group(grp_name)
             dset = grp.create_dataset('timeseries', shape=(H5DataStore._BASE_SIZE,),
-                dtype=self._TSERIES_DTYPE,
-                maxshape=(None,), chunks=True)
+                dtype=self._TSERIES_DTYPE, maxshape=(None,),
+                **self._profile.dataset_options((H5DataStore._BASE_SIZE,), (None,)))
             dset.attrs['NROWS'] = 0
             dset.attrs['TITLE'] = 'W%02dB%02d' % (word, bit)
             dset.attrs['CLASS'] = 'TABLE'
             dset.attrs['BASE_SIZE'] = H5DataStore._BASE_SIZE
+            self._handles[(word, bit)] = _TimeseriesHandle(dset, 0, word, bit)
+
+    def __timeseries_handle(self, word, bit, create=True):
+        # Return the cached handle of a crosspoint timeseries, opening
+        # (and optionally creating) the dataset if required. Raises
+        # KeyError if the timeseries does not exist and create is False
+        try:
+            return self._handles[(word, bit)]
+        except KeyError:
+            pass
+
+        if create:
+            self.__create_timeseries(word, bit)
+            try:
+                return self._handles[(word, bit)]
+            except KeyError:
+                # timeseries existed already in the file
+                pass
 
+        dset = self._h5['crosspoints']['W%02dB%02d' % (word, bit)]['timeseries']
+        handle = _TimeseriesHandle(dset, int(dset.attrs['NROWS']), word, bit)
+        self._handles[(word, bit)] = handle
+
+        return handle
+
+    def __raster_handles(self):
+        if self._raster is None:
+            crossbar = self._h5['crossbar']
+            self._raster = (crossbar['current'], crossbar['voltage'])
+        return self._raster
+
+    @_on_writer(wait=True)
     def sequence(self, name):
         try:
             grp = self._h5['sequences']
@@ -286,21 +1625,356 @@ class H5DataStore:
 
         return self._h5['sequences'][name]
 
-    def timeseries(self, word, bit):
+    @_on_writer(wait=True)
+    def timeseries(self, word, bit, start=None, stop=None, fields=None):
         """
-        Complete biasing history of specified crosspoint
+        Biasing history of specified crosspoint. By default the complete
+        history is returned but a range of rows can be selected with
+        ``start`` and ``stop``. These follow python slice conventions, so
+        negative values count from the end of the timeseries. Only the
+        requested rows are read from the file. Similarly ``fields`` can
+        be used to select only some of the columns of the timeseries
+        (``current``, ``voltage``, ``pulse_width``, ``read_voltage``,
+        ``op_type``).
 
         :param int word: The wordline of the crosspoint
         :param int bit: The bitline of the crosspoint
+        :param int start: First row to read, or ``None`` to read from the start
+        :param int stop: Row to stop at (exclusive), or ``None`` to read up to
+                         the last row
+        :param fields: A list of field names to read or ``None`` for all fields
 
         :return: A structured numpy array containing the biasing history
+
+        :raise KeyError: If no timeseries exists for this crosspoint
         """
-        grp_name = 'W%02dB%02d' % (word, bit)
-        crosspoint = self._h5['crosspoints'][grp_name]
-        rows = crosspoint['timeseries'].attrs['NROWS']
-        dset = crosspoint['timeseries'][0:rows]
-        return dset
+        pending = self._pending.get((word, bit), [])
+
+        try:
+            handle = self.__timeseries_handle(word, bit, create=False)
+            nrows = handle.nrows
+        except KeyError:
+            # timeseries might not have been created yet, but
+            # there might be rows waiting to be written
+            if len(pending) == 0:
+                raise
+            handle = None
+            nrows = 0
+
+        if isinstance(fields, str):
+            fields = [fields]
+
+        (start, stop, _) = slice(start, stop).indices(nrows + len(pending))
+        stop = max(start, stop)
+
+        parts = []
+
+        if start < nrows:
+            if fields is None:
+                parts.append(handle.dset[start:min(stop, nrows)])
+            else:
+                parts.append(handle.dset.fields(list(fields))[start:min(stop, nrows)])
+
+        if stop > nrows:
+            tail = np.array(pending[max(start-nrows, 0):stop-nrows], \
+                dtype=self._TSERIES_DTYPE)
+            parts.append(self.__select_fields(tail, fields))
+
+        if len(parts) == 0:
+            return self.__select_fields(np.empty(shape=(0,), \
+                dtype=self._TSERIES_DTYPE), fields)
+        elif len(parts) == 1:
+            return parts[0]
+        else:
+            return np.concatenate(parts)
+
+    @_on_writer(wait=True)
+    def timeseries_tail(self, word, bit, n, fields=None):
+        """
+        Last ``n`` rows of the biasing history of the specified crosspoint.
+        This is equivalent to :meth:`~arc2control.h5utils.H5DataStore.timeseries`
+        with ``start = -n``. Fewer rows will be returned if the timeseries has
+        less than ``n`` rows.
+
+        :param int word: The wordline of the crosspoint
+        :param int bit: The bitline of the crosspoint
+        :param int n: Number of rows to read
+        :param fields: A list of field names to read or ``None`` for all fields
+
+        :return: A structured numpy array containing the biasing history
+
+        :raise KeyError: If no timeseries exists for this crosspoint
+        """
+        length = self.timeseries_length(word, bit)
+        return self.timeseries(word, bit, start=max(length-n, 0), fields=fields)
+
+    @_on_writer(wait=True)
+    def timeseries_length(self, word, bit):
+        """
+        Number of rows in the biasing history of the specified crosspoint
+        including any rows that are still buffered.
+
+        :param int word: The wordline of the crosspoint
+        :param int bit: The bitline of the crosspoint
+
+        :return: The number of rows in the timeseries
+
+        :raise KeyError: If no timeseries exists for this crosspoint
+        """
+        pending = len(self._pending.get((word, bit), []))
+
+        try:
+            return self.__timeseries_handle(word, bit, create=False).nrows + pending
+        except KeyError:
+            if pending == 0:
+                raise
+            return pending
+
+    @_on_writer(wait=True)
+    def timeseries_envelope(self, word, bit, start=None, stop=None, width=1000):
+        """
+        Min/max envelope of the biasing history of the specified crosspoint,
+        suitable for plotting ``[start, stop)`` across ``width`` pixels.
+        Long timeseries (more than ``SUMMARY_FACTOR²`` rows) are accompanied
+        by a pyramid of min/max summaries, where every level reduces
+        :data:`~arc2control.h5utils.SUMMARY_FACTOR` entries of the level
+        below. The pyramid is updated as rows are appended. This method
+        returns the coarsest level that still has at least one entry per
+        pixel, so only a few kilobytes are read for zoomed-out views; the
+        result is then reduced to about one entry per pixel. Short ranges
+        fall back to the raw rows, with identical minima and maxima.
+
+        Every entry holds the minimum and maximum of each of the
+        :data:`~arc2control.h5utils.SUMMARY_CHANNELS` as fields
+        ``<channel>_min`` and ``<channel>_max`` and the raw row it starts at
+        as ``index``. Pulse and read voltages are NaN for entries without
+        pulse or read operations. Entries are aligned to multiples of the
+        returned factor, so the first and last entry may cover slightly
+        more or fewer rows than the rest.
+
+        :param int word: The wordline of the crosspoint
+        :param int bit: The bitline of the crosspoint
+        :param int start: First row, or ``None`` to start from the beginning
+        :param int stop: Row to stop at (exclusive), or ``None`` for the end
+        :param int width: Width of the plot in pixels
+
+        :return: A tuple with the number of raw rows per entry (1 for raw
+                 rows) and a structured numpy array with the envelope
+
+        :raise KeyError: If no timeseries exists for this crosspoint
+        """
+        length = self.timeseries_length(word, bit)
+        (start, stop, _) = slice(start, stop).indices(length)
+        stop = max(start, stop)
+        count = stop - start
+
+        # coarsest level with at least one entry per pixel
+        level = 0
+        while count // (SUMMARY_FACTOR ** (level+1)) >= max(width, 1):
+            level += 1
+
+        summary = None
+        if level > 0:
+            # the summary only covers rows written to the file
+            self.__flush_crosspoint(word, bit)
+            handle = self.__timeseries_handle(word, bit, create=False)
+            if self._h5.mode != H5Mode.READ.value:
+                self.__sync_summary(handle)
+            try:
+                summary = handle.dset.parent['summary']
+                if int(summary.attrs['ROWS']) != handle.nrows:
+                    summary = None
+            except KeyError:
+                pass
+
+        if summary is not None:
+            while level > 0 and ('L%d' % level not in summary or \
+                int(summary['L%d' % level].attrs['NROWS']) == 0):
+                level -= 1
+
+        factor = SUMMARY_FACTOR ** level
+
+        if summary is None or level == 0:
+            envelope = self.__envelope_from_raw(word, bit, start, stop, factor)
+        else:
+            dset = summary['L%d' % level]
+            (first, last) = (start // factor, (stop - 1) // factor + 1)
+            rows = dset[first:min(last, int(dset.attrs['NROWS']))]
+            (mins, maxs) = _summary_from_rows(rows)
+            envelope = _summary_to_rows(mins, maxs, \
+                factor * np.arange(first, first + len(rows), dtype=np.int64))
+
+        # there can be up to SUMMARY_FACTOR entries per pixel; reduce
+        # them further in memory to about one per pixel
+        ratio = len(envelope) // max(width, 1)
+        if ratio > 1:
+            (mins, maxs) = _summary_from_rows(envelope)
+            (bucket, mins, maxs) = _summary_reduce(mins, maxs, \
+                int(envelope['index'][0]) // factor, ratio)
+            factor *= ratio
+            envelope = _summary_to_rows(mins, maxs, \
+                factor * np.arange(bucket, bucket + len(mins), dtype=np.int64))
+
+        return (factor, envelope)
+
+    def __envelope_from_raw(self, word, bit, start, stop, factor):
+        # envelope computed directly from the raw rows; this is used
+        # for short ranges and for timeseries without a usable summary
+        # (read-only files), in which case rows are read in blocks
+        parts = []
+        block = max(self._SUMMARY_BLOCK_ROWS // factor, 1) * factor
+        first = (start // factor) * factor if factor > 1 else start
+
+        for bstart in range(first, stop, block):
+            rows = self.timeseries(word, bit, start=max(bstart, start), \
+                stop=min(bstart+block, stop), fields=_SUMMARY_FIELDS)
+            if len(rows) == 0:
+                continue
+            values = _summary_channels(rows)
+            if factor == 1:
+                parts.append(_summary_to_rows(values, values, \
+                    np.arange(bstart, bstart + len(rows), dtype=np.int64)))
+            else:
+                (bucket, mins, maxs) = _summary_reduce(values, values, \
+                    max(bstart, start), factor)
+                parts.append(_summary_to_rows(mins, maxs, factor * \
+                    np.arange(bucket, bucket + len(mins), dtype=np.int64)))
+
+        if len(parts) == 0:
+            return np.empty(shape=(0,), dtype=_ENVELOPE_DTYPE)
 
+        return np.concatenate(parts)
+
+    def __select_fields(self, data, fields):
+        # return a packed copy of the specified fields of a
+        # structured array
+        if fields is None:
+            return data
+
+        dtype = np.dtype([(f, data.dtype[f]) for f in fields])
+        selected = np.empty(shape=data.shape, dtype=dtype)
+        for f in fields:
+            selected[f] = data[f]
+
+        return selected
+
+    @_on_writer(wait=True)
+    def stats(self, word, bit):
+        """
+        Running statistics of the specified crosspoint. These are kept up
+        to date by :meth:`~arc2control.h5utils.H5DataStore.update_status`,
+        :meth:`~arc2control.h5utils.H5DataStore.update_status_bulk` and
+        :meth:`~arc2control.h5utils.H5DataStore.update_status_many` and
+        include pending rows, so no timeseries data is read. Resistance
+        statistics only consider entries with a finite resistance
+        (``|read_voltage/current|``); the variance is the population
+        variance.
+
+        :param int word: The wordline of the crosspoint
+        :param int bit: The bitline of the crosspoint
+
+        :return: A dict with one entry for each of
+                 :data:`~arc2control.h5utils.STATS_METRICS`; resistance
+                 statistics are NaN if there are no valid samples
+        """
+        stats = self.__stats_table()[bit:bit+1, word:word+1]
+        values = {m: _stats_metric(stats, m)[0, 0].item() for m in STATS_METRICS}
+        for m in ['count', 'samples', 'reads', 'pulses', 'pulsereads']:
+            values[m] = int(values[m])
+        return values
+
+    @_on_writer(wait=True)
+    def stats_array(self, metric):
+        """
+        One of the running crosspoint statistics for the whole crossbar,
+        laid out like the crossbar raster (indexed by ``[bit, word]``). This
+        only involves the in-memory copy of the statistics and is cheap
+        enough to call on every crossbar refresh.
+
+        :param str metric: One of :data:`~arc2control.h5utils.STATS_METRICS`
+
+        :return: A float numpy array; resistance statistics of crosspoints
+                 without valid samples are NaN
+        """
+        return _stats_metric(self.__stats_table(), metric)
+
+    @_on_writer(wait=True)
+    def rebuild_stats(self):
+        """
+        Recompute the crosspoint statistics from the complete timeseries of
+        every crosspoint. This is done automatically for files created
+        before statistics were introduced but can also be used if the
+        timeseries have been modified externally. Pending rows are written
+        first and the statistics are only written back to the file if the
+        datastore is writable.
+        """
+        writable = self._h5.mode != H5Mode.READ.value
+        if writable:
+            self.flush()
+
+        stats = _stats_empty(self._h5['crossbar']['current'].shape)
+        for (key, device) in self._h5['crosspoints'].items():
+            match = _WB_KEY.fullmatch(key)
+            if match is None or 'timeseries' not in device:
+                continue
+            (word, bit) = (int(match.group(1)), int(match.group(2)))
+            dset = device['timeseries']
+            nrows = int(dset.attrs['NROWS'])
+            for start in range(0, nrows, self._SUMMARY_BLOCK_ROWS):
+                rows = dset[start:min(start+self._SUMMARY_BLOCK_ROWS, nrows)]
+                _stats_update(stats, np.full(len(rows), word), \
+                    np.full(len(rows), bit), rows)
+
+        self._stats = stats
+        if writable:
+            # start from scratch in case the layout has changed
+            if 'stats' in self._h5['crossbar']:
+                del self._h5['crossbar']['stats']
+            self._stats_dset = None
+            self.__write_stats()
+
+    def __stats_table(self):
+        if self._stats is None:
+            try:
+                dset = self._h5['crossbar']['stats']
+                if [f.decode() if isinstance(f, bytes) else f \
+                    for f in dset.attrs['FIELDS']] != _STATS_FIELDS:
+                    raise KeyError('stats')
+                self._stats = np.ascontiguousarray(dset[:]).view(_STATS_DTYPE)[..., 0]
+            except KeyError:
+                # older file; compute them now
+                logger.info('Building crosspoint statistics')
+                self.rebuild_stats()
+        return self._stats
+
+    def __stats_changed(self):
+        # statistics are kept in memory and written on flush() or close().
+        # Without write-behind nothing flushes periodically so they are
+        # also written every flush_interval seconds; otherwise they would
+        # only reach the file when the datastore is closed
+        self._stats_dirty = True
+        if not self._writebehind and \
+            (time.monotonic() - self._last_stats_write) >= self._flush_interval:
+            self.__write_stats()
+
+    def __write_stats(self):
+        dset = self._stats_dset
+        if dset is None:
+            crossbar = self._h5['crossbar']
+            try:
+                dset = crossbar['stats']
+            except KeyError:
+                dset = crossbar.create_dataset('stats', \
+                    shape=_stats_raw(self._stats).shape, dtype=np.float64)
+                dset.attrs['TITLE'] = 'stats'
+                dset.attrs['FIELDS'] = _STATS_FIELDS
+            self._stats_dset = dset
+
+        dset[...] = _stats_raw(self._stats)
+        self._stats_dirty = False
+        self._last_stats_write = time.monotonic()
+
+    @_on_writer(wait=False)
     def update_status(self, word, bit, current, voltage, pulse, read_voltage, optype=OpType.READ):
         """
         Add a new biasing history entry for the specified crosspoint.
@@ -314,27 +1988,45 @@ class H5DataStore:
         :param optype: An instance of :class:`~OpType` indicating the type
                        of the operation associated with this entry
         """
-        # this will do nothing if timeseries already exists
-        self.__create_timeseries(word, bit)
-        wbid = 'W%02dB%02d' % (word, bit)
+        _stats_add(self.__stats_table(), word, bit, current, read_voltage, optype)
+
+        if self._writebehind:
+            self._pending.setdefault((word, bit), []).append(\
+                (current, voltage, pulse, read_voltage, optype))
+            self._pending_raster[(word, bit)] = (current, voltage)
+            self._pending_rows += 1
+            self._stats_dirty = True
+            self.__maybe_flush()
+            return
+
+        # this will create the timeseries if it does not exist
+        handle = self.__timeseries_handle(word, bit)
 
         # update the timeseries
-        dset = self._h5['crosspoints'][wbid]['timeseries']
-        idx = dset.attrs['NROWS']
+        dset = handle.dset
+        idx = handle.nrows
 
         try:
             dset[idx] = (current, voltage, pulse, read_voltage, optype)
         except IndexError:
             # resize and try again
-            dset.resize((2*dset.shape[0], ))
+            _grow_dataset(dset, idx + 1, self._growth)
             dset[idx] = (current, voltage, pulse, read_voltage, optype)
 
         dset.attrs['NROWS'] = idx + 1
+        handle.nrows = idx + 1
+        if idx + 1 >= self._SUMMARY_MIN_ROWS:
+            self.__sync_summary(handle, complete=False)
+        self.__publish([handle])
 
         # and the crossbar raster
-        self._h5['crossbar']['current'][bit,word] = current
-        self._h5['crossbar']['voltage'][bit,word] = voltage
+        (cdset, vdset) = self.__raster_handles()
+        cdset[bit, word] = current
+        vdset[bit, word] = voltage
+
+        self.__stats_changed()
 
+    @_on_writer(wait=False)
     def update_status_bulk(self, word, bit, currents, voltages, pulses, read_voltages, optypes):
         """
         Similar to :meth:`~arc2control.h5utils.H5DataStore.update_status` but
@@ -353,9 +2045,6 @@ class H5DataStore:
                        indicating the type of the operations applied to the crosspoint.
         """
 
-        self.__create_timeseries(word, bit)
-        wbid = 'W%02dB%02d' % (word, bit)
-
         dlen = len(currents)
         for a in [voltages, pulses]:
             if len(a) != dlen:
@@ -380,37 +2069,244 @@ class H5DataStore:
             pass
 
 
-        dset = self._h5['crosspoints'][wbid]['timeseries']
-        idx = dset.attrs['NROWS']
+        # rows for this crosspoint might still be buffered; write them
+        # first to keep the timeseries in order
+        self.__flush_crosspoint(word, bit)
 
-        # check if we can fit the data in the dataset
-        free_rows = dset.shape[0] - idx
-        if free_rows < dlen:
-            try:
-                BASE_SIZE = dset.attrs['BASE_SIZE']
-            except (KeyError, IndexError):
-                BASE_SIZE = H5DataStore._BASE_SIZE
-            # resize dataset to fit, we need at least this many
-            # total rows
-            min_length = idx + free_rows + dlen + 1
-            # we need to double the size this many times to fit
-            # the data
-            factor = math.ceil(math.log(min_length/BASE_SIZE, 2))
-            dset.resize((BASE_SIZE*2**factor,))
-
-        dset[idx:idx+dlen, 'current'] = currents
-        dset[idx:idx+dlen, 'voltage'] = voltages
-        dset[idx:idx+dlen, 'pulse_width'] = pulses
-        dset[idx:idx+dlen, 'read_voltage'] = read_voltages
-        dset[idx:idx+dlen, 'op_type'] = optypes
+        data = np.empty(shape=(dlen,), dtype=self._TSERIES_DTYPE)
+        data['current'] = currents
+        data['voltage'] = voltages
+        data['pulse_width'] = pulses
+        data['read_voltage'] = read_voltages
+        data['op_type'] = optypes
 
-        dset.attrs['NROWS'] = idx + dlen
+        stats = self.__stats_table()
+        handle = self.__timeseries_handle(word, bit)
+        self.__append_rows(handle, data)
+        _stats_update(stats, np.full(dlen, word), np.full(dlen, bit), data)
 
-        self._h5['crossbar']['current'][bit, word] = currents[-1]
+        (cdset, vdset) = self.__raster_handles()
+        cdset[bit, word] = currents[-1]
         try:
-            self._h5['crossbar']['voltage'][bit, word] = read_voltages[-1]
+            vdset[bit, word] = read_voltages[-1]
         except TypeError: # read_voltages is probably a scalar
-            self._h5['crossbar']['voltage'][bit, word] = read_voltages
+            vdset[bit, word] = read_voltages
+
+        self.__stats_changed()
+
+    @_on_writer(wait=False)
+    def update_status_many(self, words, bits, currents, voltages, pulses, read_voltages, optypes):
+        """
+        Add biasing history entries for several crosspoints at once. This is
+        typically used after a slice or a whole crossbar operation. All array
+        arguments must have the same length with the *i*-th element of each
+        describing one entry for crosspoint ``(words[i], bits[i])``.
+        Arguments ``read_voltages`` and ``optypes`` can be scalar and their
+        values will be broadcasted over all rows. Rows are grouped per
+        crosspoint, preserving their relative order, and every affected
+        timeseries is extended with a single write. The crossbar raster is
+        updated with the last entry of each crosspoint.
+
+        :param words: An ndarray containing the wordline of each entry
+        :param bits: An ndarray containing the bitline of each entry
+        :param currents: An ndarray containing the measured currents
+        :param voltages: An ndarray containing the applied voltages
+        :param pulses: An ndarray containing the applied pulse widths
+        :param read_voltages: An ndarray or single float value that corresponds
+                              to the voltage used to read back each crosspoint
+        :param optypes: An array or single instance of :class:`arc2control.h5utils.OpType`
+                        indicating the type of the operations applied.
+        """
+
+        words = np.asarray(words, dtype=np.int64)
+        bits = np.asarray(bits, dtype=np.int64)
+        dlen = len(words)
+
+        for a in [bits, currents, voltages, pulses]:
+            if len(a) != dlen:
+                raise ValueError("""Words, Bits, Currents, Voltages and Pulse Widths """
+                                 """must have the same length when bulk inserting data""")
+
+        if dlen == 0:
+            return
+
+        data = np.empty(shape=(dlen,), dtype=self._TSERIES_DTYPE)
+        data['current'] = currents
+        data['voltage'] = voltages
+        data['pulse_width'] = pulses
+        data['read_voltage'] = read_voltages
+        data['op_type'] = optypes
+
+        _stats_update(self.__stats_table(), words, bits, data)
+
+        # sort by crosspoint; a stable sort keeps the order of the
+        # rows within each crosspoint intact
+        keys = words * (np.max(bits) + 1) + bits
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        data = data[order]
+        words = words[order]
+        bits = bits[order]
+
+        # first row of each crosspoint group
+        starts = np.flatnonzero(np.diff(keys, prepend=-1))
+        ends = np.append(starts[1:], dlen)
+
+        handles = []
+        for (start, end) in zip(starts, ends):
+            (word, bit) = (int(words[start]), int(bits[start]))
+            # rows for this crosspoint might still be buffered; write
+            # them first to keep the timeseries in order
+            self.__flush_crosspoint(word, bit)
+            handle = self.__timeseries_handle(word, bit)
+            self.__append_rows(handle, data[start:end], publish=False)
+            handles.append(handle)
+        self.__publish(handles)
+
+        # update the crossbar raster with the last row of each
+        # crosspoint in one go
+        last = ends - 1
+        (cdset, vdset) = self.__raster_handles()
+        current = cdset[:]
+        voltage = vdset[:]
+        current[bits[last], words[last]] = data['current'][last]
+        voltage[bits[last], words[last]] = data['read_voltage'][last]
+        cdset[:] = current
+        vdset[:] = voltage
+
+        self.__stats_changed()
+
+    def __append_rows(self, handle, data, publish=True):
+        # append a structured array to the end of a timeseries using
+        # a single slice write and a single NROWS update
+        dset = handle.dset
+        dlen = data.shape[0]
+        idx = handle.nrows
+
+        # make room for the new data, if required
+        _grow_dataset(dset, idx + dlen, self._growth)
+
+        dset[idx:idx+dlen] = data
+        dset.attrs['NROWS'] = idx + dlen
+        handle.nrows = idx + dlen
+
+        self.__sync_summary(handle, data, complete=False)
+        if publish:
+            self.__publish([handle])
+
+    def __sync_summary(self, handle, tail=None, complete=True):
+        # bring the summary pyramid of a timeseries up to date with its
+        # raw rows. Short timeseries have no summary; once they reach
+        # _SUMMARY_MIN_ROWS the summary is built from the existing rows
+        # and from then on only new rows are processed. ``tail`` are the
+        # last rows of the timeseries, if already available. If not
+        # ``complete`` only whole level 1 buckets are processed; the
+        # remaining rows are left for the next call or for flush() so that
+        # single row updates don't rewrite the same bucket every time
+        nrows = handle.nrows
+        if nrows < self._SUMMARY_MIN_ROWS:
+            return
+
+        summary = handle.summary
+        if summary is None:
+            grp = handle.dset.parent
+            try:
+                summary = grp['summary']
+                covered = int(summary.attrs['ROWS'])
+            except KeyError:
+                summary = None
+                covered = 0
+
+            if summary is None or covered > nrows:
+                # missing or does not match the timeseries; start over
+                if summary is not None:
+                    del grp['summary']
+                summary = self.__create_summary(grp)
+                covered = 0
+
+            handle.summary = summary
+            handle.covered = covered
+
+        covered = handle.covered
+        end = nrows if complete else nrows - nrows % SUMMARY_FACTOR
+
+        if end < nrows:
+            self._summary_stale.add((handle.word, handle.bit))
+        else:
+            self._summary_stale.discard((handle.word, handle.bit))
+
+        if end <= covered:
+            return
+
+        if tail is not None and len(tail) >= nrows - covered:
+            first = len(tail) - (nrows - covered)
+            blocks = [(covered, tail[first:first+(end-covered)])]
+        else:
+            blocks = ((start, handle.dset[start:min(start+self._SUMMARY_BLOCK_ROWS, end)]) \
+                for start in range(covered, end, self._SUMMARY_BLOCK_ROWS))
+
+        for (start, rows) in blocks:
+            values = _summary_channels(rows)
+            self.__summary_merge(summary, 1, start, values, values)
+
+        summary.attrs['ROWS'] = end
+        handle.covered = end
+
+    def __sync_summaries(self):
+        # write out the rows of every summary that were held back by
+        # __sync_summary(complete=False)
+        for (word, bit) in list(self._summary_stale):
+            self.__sync_summary(self.__timeseries_handle(word, bit, \
+                create=False))
+        self._summary_stale.clear()
+
+    def __create_summary(self, grp):
+        summary = grp.create_group('summary')
+        summary.attrs['FACTOR'] = SUMMARY_FACTOR
+        summary.attrs['ROWS'] = 0
+        return summary
+
+    def __summary_level(self, summary, level):
+        # summary level ``level``, created empty if it does not exist
+        name = 'L%d' % level
+        try:
+            return summary[name]
+        except KeyError:
+            dset = summary.create_dataset(name, shape=(0,), \
+                dtype=_SUMMARY_DTYPE, maxshape=(None,), chunks=(1024,))
+            dset.attrs['NROWS'] = 0
+            return dset
+
+    def __summary_merge(self, summary, level, first, mins, maxs):
+        # merge entries of the previous level (raw rows for level 1)
+        # starting at index ``first`` into summary level ``level``.
+        # Minima and maxima are idempotent so merging an updated entry
+        # into a bucket that already includes it is safe
+        (bucket, bmins, bmaxs) = _summary_reduce(mins, maxs, first, SUMMARY_FACTOR)
+
+        dset = self.__summary_level(summary, level)
+        nrows = int(dset.attrs['NROWS'])
+
+        if bucket < nrows:
+            (omins, omaxs) = _summary_from_rows(dset[bucket:bucket+1])
+            bmins[0] = np.fmin(bmins[0], omins[0])
+            bmaxs[0] = np.fmax(bmaxs[0], omaxs[0])
+
+        end = bucket + len(bmins)
+        _grow_dataset(dset, end, self._growth)
+        dset[bucket:end] = _summary_to_rows(bmins, bmaxs)
+        nrows = max(nrows, end)
+        dset.attrs['NROWS'] = nrows
+
+        # keep adding levels until the top one is small; levels might
+        # exist but still be empty if they were created upfront
+        if nrows > SUMMARY_FACTOR:
+            upper = summary.get('L%d' % (level+1))
+            if upper is not None and int(upper.attrs['NROWS']) > 0:
+                self.__summary_merge(summary, level+1, bucket, bmins, bmaxs)
+            else:
+                (amins, amaxs) = _summary_from_rows(dset[:nrows])
+                self.__summary_merge(summary, level+1, 0, amins, amaxs)
 
     def __make_group(self, crosspoints, grpname, ts=None):
 
@@ -463,6 +2359,7 @@ class H5DataStore:
 
         return basepath
 
+    @_on_writer(wait=True)
     def make_wb_group(self, word, bit, name, tstamp=True):
         """
         Create a new experiment group tied to a specific crosspoint. This can be
@@ -497,8 +2394,12 @@ class H5DataStore:
             grpname = 'crosspoints/W%02dB%02d/experiments/%s' % \
                 (word, bit, name)
 
-        return self.__make_group([[word, bit]], grpname, ts)
+        grp = self.__make_group([[word, bit]], grpname, ts)
+        self.__catalog_add(CatalogKind.EXPERIMENT, [[word, bit]], name, ts, grp.name, 0)
 
+        return grp
+
+    @_on_writer(wait=True)
     def make_wb_table(self, word, bit, name, shape, dtype, grp=None, maxshape=None, tstamp=True):
         """
         Create a new experiment table tied to a specific crosspoint. Arguments
@@ -527,7 +2428,9 @@ class H5DataStore:
                                 creation. If an integer is provided it will be used
                                 as a timestamp instead.
 
-        :return: A newly created HDF5 dataset
+        :return: A newly created HDF5 dataset; see
+                 :meth:`~arc2control.h5utils.H5DataStore.dataset` for
+                 threaded datastores
         """
         # make sure time series exists
         try:
@@ -570,8 +2473,12 @@ class H5DataStore:
         dset.attrs['crosspoints'] = [[word, bit]]
         dset.attrs['BASE_SIZE'] = shape[0]
 
-        return dset
+        self.__catalog_add(CatalogKind.EXPERIMENT, [[word, bit]], name, \
+            ts if tstamp else None, dset.name, self.__table_rows(dset))
 
+        return self.__table(dset)
+
+    @_on_writer(wait=True)
     def make_synthetic_group(self, crosspoints, name, tstamp=True):
         """
         Create a new synthetic experiment group. This can be used to group
@@ -604,8 +2511,12 @@ class H5DataStore:
             ts = None
             grpname = 'synthetics/%s' % name
 
-        return self.__make_group(crosspoints, grpname, ts)
+        grp = self.__make_group(crosspoints, grpname, ts)
+        self.__catalog_add(CatalogKind.SYNTHETIC, crosspoints, name, ts, grp.name, 0)
 
+        return grp
+
+    @_on_writer(wait=True)
     def make_synthetic_table(self, crosspoints, name, shape, dtype, grp=None, maxshape=None, tstamp=True):
         """
         Create a new experiment table encompassing many crosspoints. Arguments
@@ -634,7 +2545,9 @@ class H5DataStore:
                                 at creation. An integer can be provided to use as a
                                 timestamp instead.
 
-        :return: A newly created HDF5 dataset
+        :return: A newly created HDF5 dataset; see
+                 :meth:`~arc2control.h5utils.H5DataStore.dataset` for
+                 threaded datastores
         """
         # make sure individual time series exists
         for (w, b) in crosspoints:
@@ -675,8 +2588,12 @@ class H5DataStore:
         if tstamp:
             dset.attrs['TSTAMP'] = ts
 
-        return dset
+        self.__catalog_add(CatalogKind.SYNTHETIC, crosspoints, name, \
+            ts if tstamp else None, dset.name, self.__table_rows(dset))
+
+        return self.__table(dset)
 
+    @_on_writer(wait=True)
     def make_sequence_group(self, name, datasets=[], tstamp=True):
         """
         Create a new sequence pseudo-group used to organise many existing
@@ -699,8 +2616,10 @@ class H5DataStore:
             sequences = self._h5.create_group('/sequences')
 
         if tstamp:
-            actual_name = '%s_%d' % (name, time.time_ns())
+            ts = time.time_ns()
+            actual_name = '%s_%d' % (name, ts)
         else:
+            ts = None
             actual_name = name
 
         grp = sequences.create_group(actual_name, track_order=True)
@@ -713,31 +2632,552 @@ class H5DataStore:
             dsetobj.attrs['seqno'] = idx
             grp[basename] = h5py.SoftLink(dset)
 
+        self.__catalog_add(CatalogKind.SEQUENCE, [[-1, -1]], name, ts, \
+            grp.name, len(datasets))
+
         return grp
 
+    @_on_writer(wait=True)
+    def catalog(self, word=None, bit=None, tag=None, since=None, until=None, kind=None,
+        rowcounts=True):
+        """
+        Query the experiment catalog of this datastore. The catalog holds one
+        entry per experiment table, experiment group and sequence created
+        through this class, with the fields ``kind`` (a
+        :class:`~arc2control.h5utils.CatalogKind`), ``word``, ``bit``, ``tag``
+        (the name the experiment was created with), ``tstamp`` (in ns; 0 if
+        the experiment has no timestamp), ``path`` (the absolute path of the
+        HDF5 object) and ``nrows`` (the number of rows of a table or the
+        number of members of a sequence). Row counts of tables that are
+        appended to are updated on the next query or flush. Synthetic
+        experiments have one entry per crosspoint; sequences have no
+        crosspoint and their ``word`` and ``bit`` are -1. All arguments are
+        optional filters that are combined. Entries are returned in order of
+        creation. Files that predate the catalog are indexed automatically
+        the first time the catalog is queried.
+
+        :param int word: Only return entries for this wordline
+        :param int bit: Only return entries for this bitline
+        :param str tag: Only return entries created with this name
+        :param int since: Only return entries with timestamps ≥ ``since`` (ns)
+        :param int until: Only return entries with timestamps < ``until`` (ns)
+        :param kind: Only return entries of this
+                     :class:`~arc2control.h5utils.CatalogKind`
+        :param bool rowcounts: Bring the row counts of tables that have been
+                               appended to up to date first; with ``False``
+                               no table is ever opened and ``nrows`` might
+                               be out of date
+
+        :return: A structured numpy array with the matching entries
+        """
+        if rowcounts:
+            self.__sync_catalog()
+
+        rows = self.__catalog_rows()
+        mask = np.ones(rows.shape, dtype=bool)
+
+        if word is not None:
+            mask &= rows['word'] == word
+        if bit is not None:
+            mask &= rows['bit'] == bit
+        if tag is not None:
+            mask &= rows['tag'] == tag
+        if since is not None:
+            mask &= rows['tstamp'] >= since
+        if until is not None:
+            mask &= rows['tstamp'] < until
+        if kind is not None:
+            mask &= rows['kind'] == kind
+
+        return rows[mask]
+
+    @_on_writer(wait=True)
+    def rebuild_catalog(self):
+        """
+        Recreate the experiment catalog by scanning the whole datastore. This
+        is done automatically for files created before the catalog was
+        introduced but can also be used if the file has been modified
+        externally. The catalog is only written back to the file if the
+        datastore is writable.
+
+        :return: The number of catalog entries
+        """
+        rows = self.__scan_catalog()
+
+        if self._h5.mode != H5Mode.READ.value:
+            if 'catalog' in self._h5:
+                del self._h5['catalog']
+            dset = self.__create_catalog()
+            self.__write_catalog(dset, rows)
+
+        self._catalog = rows
+
+        return len(rows)
+
+    def __create_catalog(self):
+        dset = self._h5.create_dataset('catalog', shape=(0,), \
+            dtype=self._CATALOG_DTYPE, maxshape=(None,), chunks=True)
+        dset.attrs['NROWS'] = 0
+        dset.attrs['TITLE'] = 'catalog'
+        dset.attrs['CLASS'] = 'TABLE'
+        return dset
+
+    def __write_catalog(self, dset, rows):
+        idx = int(dset.attrs['NROWS'])
+        _grow_dataset(dset, idx + len(rows), self._growth)
+        dset[idx:idx+len(rows)] = rows
+        dset.attrs['NROWS'] = idx + len(rows)
+
+    def __catalog_rows(self):
+        if self._catalog is not None:
+            return self._catalog
+
+        try:
+            dset = self._h5['catalog']
+        except KeyError:
+            # older file; index it now
+            self.rebuild_catalog()
+            return self._catalog
+
+        rows = dset[:int(dset.attrs['NROWS'])]
+        # strings are returned as bytes
+        for field in ['tag', 'path']:
+            rows[field] = [x.decode() if isinstance(x, bytes) else x \
+                for x in rows[field]]
+        self._catalog = rows
+
+        return rows
+
+    def __sync_catalog(self):
+        # update the row counts of tables appended to since the last
+        # call, in memory and in the file
+        if len(self._catalog_stale) == 0:
+            return
+
+        rows = self.__catalog_rows()
+        try:
+            dset = self._h5['catalog']
+        except KeyError:
+            dset = None
+
+        for path in self._catalog_stale:
+            obj = self._h5.get(path)
+            if not isinstance(obj, h5py.Dataset):
+                continue
+            idxs = np.flatnonzero(rows['path'] == path)
+            rows['nrows'][idxs] = self.__table_rows(obj)
+            if dset is not None:
+                for idx in idxs:
+                    dset[idx] = rows[idx]
+
+        self._catalog_stale.clear()
+
+    def __catalog_add(self, kind, crosspoints, tag, tstamp, path, nrows):
+        rows = np.empty(shape=(len(crosspoints),), dtype=self._CATALOG_DTYPE)
+        rows['kind'] = kind
+        rows['word'] = [x[0] for x in crosspoints]
+        rows['bit'] = [x[1] for x in crosspoints]
+        rows['tag'] = tag
+        rows['tstamp'] = 0 if tstamp is None else tstamp
+        rows['path'] = path
+        rows['nrows'] = nrows
+
+        try:
+            dset = self._h5['catalog']
+        except KeyError:
+            # index the existing contents first (this will also
+            # pick up the object that has just been created)
+            self.rebuild_catalog()
+            return
+
+        self.__write_catalog(dset, rows)
+
+        if self._catalog is not None:
+            self._catalog = np.concatenate((self._catalog, rows))
+
+    def __table_rows(self, dset):
+        # number of rows in a table; resizable tables track their
+        # length with NROWS, for the rest it's their size
+        if dset.shape is None or len(dset.shape) == 0:
+            return 0
+        if dset.maxshape[0] is None or dset.maxshape[0] > dset.shape[0]:
+            return int(dset.attrs.get('NROWS', 0))
+        return dset.shape[0]
+
+    def __scan_catalog(self):
+        entries = []
+
+        def _split(name, obj):
+            # experiment names are TAG_TSTAMP or TAG
+            try:
+                tstamp = int(obj.attrs['TSTAMP'])
+            except KeyError:
+                tstamp = 0
+            (tag, _, suffix) = name.rpartition('_')
+            if tag == '' or not suffix.isdigit():
+                tag = name
+            elif tstamp == 0:
+                tstamp = int(suffix)
+            return (tag, tstamp)
+
+        def _visit(grp, kind, crosspoints):
+            for (name, obj) in grp.items():
+                (tag, tstamp) = _split(name, obj)
+                if isinstance(obj, h5py.Group):
+                    nrows = 0
+                else:
+                    nrows = self.__table_rows(obj)
+                xpts = crosspoints
+                if xpts is None:
+                    xpts = [(int(x[0]), int(x[1])) for x in obj.attrs.get('crosspoints', [])]
+                for (w, b) in xpts:
+                    entries.append((kind, w, b, tag, tstamp, obj.name, nrows))
+                if isinstance(obj, h5py.Group):
+                    _visit(obj, kind, crosspoints)
+
+        for (key, device) in self._h5['crosspoints'].items():
+            match = _WB_KEY.fullmatch(key)
+            if match is None or 'experiments' not in device:
+                continue
+            (w, b) = (int(match.group(1)), int(match.group(2)))
+            _visit(device['experiments'], CatalogKind.EXPERIMENT, [(w, b)])
+
+        if 'synthetics' in self._h5:
+            _visit(self._h5['synthetics'], CatalogKind.SYNTHETIC, None)
+
+        if 'sequences' in self._h5:
+            for (name, grp) in self._h5['sequences'].items():
+                (tag, tstamp) = _split(name, grp)
+                entries.append((CatalogKind.SEQUENCE, -1, -1, tag, tstamp, \
+                    grp.name, len(grp)))
+
+        rows = np.array(entries, dtype=self._CATALOG_DTYPE)
+        # entries are generally created in chronological order
+        return rows[np.argsort(rows['tstamp'], kind='stable')]
+
+    @_on_writer(wait=True)
+    def compact(self, target, profile=None, block_rows=_COMPACT_BLOCK_ROWS):
+        """
+        Write a compacted copy of this datastore to ``target``. Resizable
+        datasets, such as crosspoint timeseries and appendable experiment
+        tables, are trimmed to the number of rows they actually hold
+        (their ``NROWS`` attribute) and everything else is copied verbatim.
+        All attributes, groups, sequences and soft links are preserved.
+        Unless ``profile`` is provided datasets keep their existing chunking
+        and compression, otherwise they are rewritten using the new profile
+        which is also recorded in the compacted file. Data is copied in
+        blocks of ``block_rows`` rows so the datastore does not need to fit
+        in memory. This datastore is not modified.
+
+        :param str target: Filename of the compacted datastore; will be
+                           overwritten if it exists
+        :param profile: A :class:`~arc2control.h5utils.StorageProfile`, the
+                        name of one of the predefined
+                        :data:`~arc2control.h5utils.STORAGE_PROFILES` or
+                        ``None`` to keep the current layout
+        :param int block_rows: Maximum number of rows to copy at once
+
+        :return: The number of bytes saved; this is the difference in size
+                 between the original file and the compacted one
+
+        :raise ValueError: If ``target`` is the file of this datastore
+        """
+        if os.path.exists(target) and os.path.samefile(target, self._fname):
+            raise ValueError('Cannot compact a datastore onto itself')
+
+        if isinstance(profile, str):
+            profile = STORAGE_PROFILES[profile]
+
+        if self._h5.mode != H5Mode.READ.value:
+            self.flush()
+            self._h5.flush()
+
+        with h5py.File(target, 'w') as dst:
+            self.__compact_group(self._h5, dst, profile, block_rows)
+            if profile is not None:
+                profile.to_attrs(dst.attrs)
+
+        return os.path.getsize(self._fname) - os.path.getsize(target)
+
+    def __compact_group(self, src, dst, profile, block_rows):
+        for (key, value) in src.attrs.items():
+            dst.attrs[key] = value
+
+        for name in src.keys():
+            link = src.get(name, getlink=True)
+
+            if isinstance(link, (h5py.SoftLink, h5py.ExternalLink)):
+                dst[name] = link
+                continue
+
+            obj = src[name]
+            if isinstance(obj, h5py.Group):
+                # keep the ordering of ordered groups, such as sequences
+                ordered = obj.id.get_create_plist().get_link_creation_order() != 0
+                grp = dst.create_group(name, track_order=ordered)
+                self.__compact_group(obj, grp, profile, block_rows)
+            else:
+                self.__compact_dataset(obj, dst, name, profile, block_rows)
+
+    def __compact_dataset(self, src, dst, name, profile, block_rows):
+        shape = src.shape
+
+        if shape is None:
+            # empty dataspace; nothing to copy except the attributes
+            dset = dst.create_dataset(name, data=h5py.Empty(src.dtype))
+            for (key, value) in src.attrs.items():
+                dset.attrs[key] = value
+            return
+
+        maxshape = src.maxshape
+
+        # only resizable datasets track their length with NROWS; fixed
+        # ones are written in one go and NROWS is meaningless there
+        if len(shape) > 0 and src.chunks is not None and \
+            (maxshape[0] is None or maxshape[0] > shape[0]) and 'NROWS' in src.attrs:
+            nrows = min(int(src.attrs['NROWS']), shape[0])
+            shape = (nrows,) + shape[1:]
+
+        if len(shape) == 0:
+            opts = {}
+        elif profile is not None:
+            opts = profile.dataset_options(shape, \
+                maxshape if src.chunks is not None else None)
+        elif src.chunks is not None:
+            opts = {'chunks': src.chunks, 'compression': src.compression, \
+                'compression_opts': src.compression_opts, 'shuffle': src.shuffle}
+        else:
+            opts = {}
+
+        if src.chunks is not None:
+            opts['maxshape'] = maxshape
+
+        dset = dst.create_dataset(name, shape=shape, dtype=src.dtype, **opts)
+
+        if len(shape) == 0:
+            dset[()] = src[()]
+        else:
+            for start in range(0, shape[0], block_rows):
+                stop = min(start + block_rows, shape[0])
+                dset[start:stop] = src[start:stop]
+
+        for (key, value) in src.attrs.items():
+            dset.attrs[key] = value
+
     def __make_table(self, name, shape, dtype, maxshape):
+        opts = self._profile.dataset_options(shape, maxshape)
         if maxshape is None:
-            dset = self._h5.create_dataset(name, shape=shape, dtype=dtype)
+            dset = self._h5.create_dataset(name, shape=shape, dtype=dtype, **opts)
         else:
             dset = self._h5.create_dataset(name, shape=shape, dtype=dtype,
-                maxshape=maxshape, chunks=True)
+                maxshape=maxshape, **opts)
 
         dset.attrs['NROWS'] = 0
         dset.attrs['TITLE'] = name
         dset.attrs['CLASS'] = 'TABLE'
 
         # add an append function
-        dset.append = types.MethodType(_dataset_append, dset)
+        dset.append = partial(self.__table_append, dset)
 
         return dset
 
+    @_on_writer(wait=True)
     def dataset(self, name):
         """
-        Return the HDF5 dataset specified by ``name``
+        Return the HDF5 dataset specified by ``name``. If the datastore has
+        a background writer the dataset is wrapped so that reading and
+        writing its data and attributes, ``append`` and ``resize`` are done
+        on the writer thread, in order with all other requests; other
+        attributes and methods (``name``, ``shape``, ``dtype``, ...) are
+        those of the underlying ``h5py.Dataset``. Groups returned by the
+        ``make_*_group`` methods are not wrapped and should only be used
+        to pass them back to the datastore.
         """
 
         dset = self._h5[name]
-        dset.append = types.MethodType(_dataset_append, dset)
+        dset.append = partial(self.__table_append, dset)
 
-        return dset
+        return self.__table(dset)
+
+    def __table_append(self, dset, row):
+        # appends to tables go through the datastore so that the catalog
+        # knows which row counts have changed
+        _dataset_append(dset, row, self._growth)
+        self._catalog_stale.add(dset.name)
+
+    def __table(self, dset):
+        if self._writer is None:
+            return dset
+        return _WriterDataset(self, dset)
+
+    @_on_writer(wait=True)
+    def _writer_call(self, func, *args):
+        # run an arbitrary function on the writer thread; used by datasets
+        # returned to callers so that they don't touch the file directly
+        return func(*args)
+
+
+
+class H5DataStoreFollower:
+    """
+    Read-only view of a datastore that is being written to by an
+    :class:`~arc2control.h5utils.H5DataStore` in SWMR mode, typically from
+    another process. Nothing is copied: the file is opened for SWMR reading
+    and :meth:`~arc2control.h5utils.H5DataStoreFollower.refresh` picks up the
+    row counts published by the writer. New rows can then be collected with
+    :meth:`~arc2control.h5utils.H5DataStoreFollower.follow`, which only reads
+    the rows that have been added since the last call.
+
+    >>> from arc2control.h5utils import H5DataStoreFollower
+    >>> with H5DataStoreFollower('/path/to/store') as follower:
+    >>>     while True:
+    >>>         for (word, bit, rows) in follower.follow():
+    >>>             print(word, bit, len(rows))
+    >>>         time.sleep(1.0)
+
+    :param str fname: The filename of the datastore
+    :param bool from_start: If ``True`` the first call to
+                            :meth:`~arc2control.h5utils.H5DataStoreFollower.follow`
+                            returns all existing rows, otherwise only rows
+                            added after the follower was created
+
+    :raise H5FormatError: If the file was not created for SWMR access
+    """
+
+    def __init__(self, fname, from_start=True):
+        self._fname = fname
+        self._h5 = h5py.File(fname, 'r', libver='latest', swmr=True)
+
+        try:
+            self._nrows = self._h5['crossbar']['nrows']
+        except KeyError:
+            self._h5.close()
+            raise H5FormatError('File %s was not created for SWMR access' % \
+                os.path.basename(fname))
+
+        # published row counts and rows already returned by follow();
+        # both indexed by [bit, word] like the crossbar raster
+        self._counts = self._nrows[:]
+        if from_start:
+            self._cursors = np.zeros_like(self._counts)
+        else:
+            self._cursors = self._counts.copy()
+        self._dsets = {}
 
+    @property
+    def fname(self):
+        """
+        The filename of the followed datastore
+        """
+        return self._fname
+
+    @property
+    def shape(self):
+        """
+        Size of the crossbar stored in this data store
+        """
+        attrs = self._h5.attrs
+        return (attrs['words'], attrs['bits'])
+
+    def close(self):
+        """
+        Close the file. The writer is not affected.
+        """
+        self._dsets.clear()
+        self._h5.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    def refresh(self):
+        """
+        Pick up the row counts published by the writer since the last
+        refresh.
+
+        :return: A list of ``(word, bit)`` tuples of the crosspoints with
+                 new rows
+        """
+        self._nrows.refresh()
+        counts = self._nrows[:]
+        changed = np.argwhere(counts != self._counts)
+        self._counts = counts
+
+        return [(int(w), int(b)) for (b, w) in changed]
+
+    def timeseries_length(self, word, bit):
+        """
+        Number of rows of a crosspoint timeseries as of the last
+        :meth:`~arc2control.h5utils.H5DataStoreFollower.refresh`.
+        """
+        return int(self._counts[bit, word])
+
+    def timeseries(self, word, bit, start=None, stop=None):
+        """
+        Biasing history of the specified crosspoint, up to the last row
+        published before the last
+        :meth:`~arc2control.h5utils.H5DataStoreFollower.refresh`. Row ranges
+        follow the conventions of
+        :meth:`~arc2control.h5utils.H5DataStore.timeseries`.
+
+        :param int word: The wordline of the crosspoint
+        :param int bit: The bitline of the crosspoint
+        :param int start: First row, or ``None`` to start from the beginning
+        :param int stop: Row to stop at (exclusive), or ``None`` for the end
+
+        :return: A structured numpy array
+        """
+        (start, stop, _) = slice(start, stop).indices(self.timeseries_length(word, bit))
+
+        try:
+            dset = self._dsets[(word, bit)]
+        except KeyError:
+            dset = self._h5['crosspoints']['W%02dB%02d' % (word, bit)]['timeseries']
+            self._dsets[(word, bit)] = dset
+
+        if stop <= start:
+            return np.empty(shape=(0,), dtype=dset.dtype)
+
+        dset.refresh()
+        return dset[start:stop]
+
+    def follow(self, refresh=True):
+        """
+        Rows added to every crosspoint since the previous call. Each row is
+        returned only once.
+
+        :param bool refresh: Refresh the row counts first
+
+        :return: A generator of ``(word, bit, rows)`` tuples, where ``rows``
+                 is a structured numpy array with the new rows of crosspoint
+                 ``(word, bit)``
+        """
+        if refresh:
+            self.refresh()
+
+        for (b, w) in np.argwhere(self._counts > self._cursors):
+            (word, bit) = (int(w), int(b))
+            stop = int(self._counts[bit, word])
+            rows = self.timeseries(word, bit, int(self._cursors[bit, word]), stop)
+            self._cursors[bit, word] = stop
+            yield (word, bit, rows)
+
+    @property
+    def current(self):
+        """
+        Current view of the crossbar raster as of the writer's last flush
+        """
+        dset = self._h5['crossbar']['current']
+        dset.refresh()
+        return dset[:]
+
+    @property
+    def voltage(self):
+        """
+        Voltage view of the crossbar raster as of the writer's last flush
+        """
+        dset = self._h5['crossbar']['voltage']
+        dset.refresh()
+        return dset[:]
@@ -162,7 +162,7 @@ def main(args=None):
     # load the app, merging all modules into a dict
     wdg = App(mappers, shape=(res['nbits'], res['nwords']), \
         modules={**mods, **emods}, mapper=res['mapper'], \
-        dset=res['dataset'])
+        dset=res['dataset'], profile=res['profile'], swmr=res['swmr'])
     wdg.show()
     app.exec()
 
@@ -65,6 +65,24 @@ class ChannelMapper:
             [x[0] for x in sorted(bit_act_idxes, key=lambda x: x[1])])
         self._bit_adc2cb = [x[0] for x in sorted(b_monstrosity, key=lambda x: x[1])]
 
+        # vectorised versions of the lookups above
+        self._word_channels = np.array(wordarr[0:nwords], dtype=np.uint64)
+        self._bit_channels = np.array(bitarr[0:nbits], dtype=np.uint64)
+        self._channel_table = np.stack(np.broadcast_arrays(\
+            self._word_channels[np.newaxis, :], \
+            self._bit_channels[:, np.newaxis]), axis=-1)
+
+        # ArC2 reports full-array reads as a MAX_BITS × MAX_WORDS array
+        # with one row per bitline channel and one column per wordline
+        # channel, both in ascending channel order
+        half = ChannelMapper.MAX_BITS//2
+        rows = (self._bit_channels % half) + \
+            (self._bit_channels // ChannelMapper.MAX_BITS) * half
+        cols = (self._word_channels % half) + \
+            (self._word_channels // ChannelMapper.MAX_WORDS) * half
+        self._raster_index = (rows[:, np.newaxis] * ChannelMapper.MAX_WORDS + \
+            cols[np.newaxis, :]).astype(np.intp)
+
     @property
     def name(self):
         """
@@ -145,6 +163,67 @@ class ChannelMapper:
         """
         return self._word_adc2cb
 
+    @property
+    def word_channels(self):
+        """
+        Channels of wordlines 0 to ``nwords`` as a numpy array; the
+        array equivalent of :attr:`~arc2control.mapper.ChannelMapper.w2ch`
+
+        .. code-block:: pycon
+
+           >>> highs = mapper.word_channels[[0, 2, 5]]
+        """
+        return self._word_channels
+
+    @property
+    def bit_channels(self):
+        """
+        Channels of bitlines 0 to ``nbits`` as a numpy array; the
+        array equivalent of :attr:`~arc2control.mapper.ChannelMapper.b2ch`
+        """
+        return self._bit_channels
+
+    @property
+    def channel_table(self):
+        """
+        A ``nbits × nwords × 2`` array with the channel pair of every
+        crosspoint. This is the same as
+        :attr:`~arc2control.mapper.ChannelMapper.wb2ch` but indexed
+        by bitline first
+
+        .. code-block:: pycon
+
+           >>> (high, low) = mapper.channel_table[bitline, wordline]
+        """
+        return self._channel_table
+
+    @property
+    def raster_index(self):
+        """
+        A ``nbits × nwords`` array of indices into a flattened full-array
+        read-out of ArC2 (as returned from ``read_all`` or ``pulseread_all``
+        with ``BiasOrder.Cols``). Fancy-indexing the raw response with it
+        gives the currents in crossbar order, see
+        :meth:`~arc2control.mapper.ChannelMapper.to_raster`.
+        """
+        return self._raster_index
+
+    def to_raster(self, raw, nbits=None, nwords=None):
+        """
+        Convert a full-array read-out of ArC2 (``BiasOrder.Cols``) into a
+        ``nbits × nwords`` array indexed by bitline and wordline.
+
+        :param raw: The read-out as returned by pyarc2
+        :param int nbits: Number of bitlines to return; ``None`` for all
+                          mapped bitlines
+        :param int nwords: Number of wordlines to return; ``None`` for all
+                           mapped wordlines
+
+        :return: A new ``nbits × nwords`` array
+        """
+        idx = self._raster_index[0:nbits, 0:nwords]
+        return np.ravel(raw)[idx]
+
     @property
     def total_devices(self):
         """
@@ -4,11 +4,15 @@ import pyqtgraph as pg
 import numpy as np
 
 from arc2control.widgets.datasettable_widget import DatasetTableView
+from arc2control.widgets.export_dialog import exportWithProgress
+from arc2control.h5utils import envelope
 
 from . import MOD_NAME
 
 
 _AF_EXPORT_FILE_FILTER = 'Comma separated file (*.csv);;Tab separated file (*.tsv)'
+# full range plots of datasets longer than this show min/max envelopes
+_AF_ENVELOPE_ROWS = 100000
 
 
 class AFDataDisplayWidget(QtWidgets.QWidget):
@@ -361,6 +365,11 @@ class AFDataDisplayWidget(QtWidgets.QWidget):
 
         len_timeseries = self.dataset.shape[0]
 
+        if self.fullRangeButton.isChecked() == True and \
+            len_timeseries > _AF_ENVELOPE_ROWS:
+            self.__replotEnvelopes()
+            return
+
         if self.fullRangeButton.isChecked() == True:
             timeseries = self.dataset
             offset = 0
@@ -401,6 +410,44 @@ class AFDataDisplayWidget(QtWidgets.QWidget):
         self.setTraceLog()
         self.setWidthLog()
 
+    def __replotEnvelopes(self):
+        # too many points to plot individually; read the dataset in
+        # blocks and only plot the min/max of every pixel's worth of rows
+        width = max(int(self.tracePlot.getViewBox().width()), 100)
+        (factor, env) = envelope(self.dataset, {
+            'resistance': lambda d: np.abs(d['read_voltage']/d['current']),
+            'voltage': lambda d: d['voltage'],
+            'read_voltage': lambda d: d['read_voltage'],
+            'pulse_width': lambda d: d['pulse_width']}, width=width)
+
+        idxes = np.repeat(env['index'], 2)
+
+        def _minmax(name):
+            values = np.empty(2*len(env), dtype=np.float32)
+            values[0::2] = env['%s_min' % name]
+            values[1::2] = env['%s_max' % name]
+            return values
+
+        self.tracePlot.plot(idxes, _minmax('resistance'), \
+            pen={'color': '#F00', 'width': 1}, clear=True)
+
+        voltages = _minmax('voltage')
+        impulses = np.zeros(2*len(voltages), dtype=voltages.dtype)
+        impulses[1::2] = voltages
+        self.pulsePlot.plot(np.repeat(idxes, 2), impulses, \
+            pen=(0, 150, 150), connect='pairs')
+
+        self.pulsePlot.plot(idxes, _minmax('read_voltage'), pen=None,\
+            symbolPen=None, symbolBrush=(0, 0, 255),  symbol='+',\
+            symbolSize=6)
+
+        self.widthPlot.plot(idxes, _minmax('pulse_width'), pen=None,\
+            symbolPen=None, symbolBrush=(0, 170, 0),  symbol='+',\
+            symbolSize=6)
+
+        self.setTraceLog()
+        self.setWidthLog()
+
     def setTraceLog(self):
         if self.traceLogButton.isChecked() == True:
             self.tracePlot.setLogMode(False, True)
@@ -451,7 +498,8 @@ class AFDataDisplayWidget(QtWidgets.QWidget):
         else:
             delimiter = ','
 
-        np.savetxt(fname, self.data, comments='#', header='\n'.join(header), \
+        exportWithProgress(self, "Export data from %s" % MOD_NAME, \
+            dataset, fname, comments='#', header='\n'.join(header), \
             delimiter=delimiter)
 
 
@@ -4,6 +4,7 @@ import pyqtgraph as pg
 import numpy as np
 
 from arc2control.widgets.datasettable_widget import DatasetTableView
+from arc2control.widgets.export_dialog import exportWithProgress
 
 from . import MOD_TAG, MOD_NAME
 
@@ -146,4 +147,5 @@ class RETDataDisplayWidget(QtWidgets.QWidget):
         else:
             delimiter = ','
 
-        np.savetxt(fname, self.data, delimiter=delimiter)
+        exportWithProgress(self, "Export data from %s" % MOD_NAME, \
+            self.data, fname, delimiter=delimiter)
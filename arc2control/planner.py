@@ -0,0 +1,225 @@
+"""
+Planning of crossbar operations. A selection of crosspoints can be
+read or pulsed in several ways: with a single full-array operation,
+one slice operation per bitline or wordline or one operation per
+crosspoint. :func:`~arc2control.planner.plan_operation` picks the one
+that requires the least instrument time, as estimated by a
+:class:`~arc2control.planner.CostModel`.
+
+.. code-block:: python
+
+   from arc2control.planner import CostModel, PlanKind, plan_operation
+
+   costs = CostModel()
+   plan = plan_operation(cells, mapper, costs)
+   if plan.kind == PlanKind.Wordlines:
+       for (word, bits) in plan.groups.items():
+           # one slice per wordline
+           ...
+"""
+
+import time
+from enum import Enum
+from collections import namedtuple
+import numpy as np
+
+from pyarc2 import BiasOrder
+
+
+class PlanKind(Enum):
+    """
+    Strategy used to apply an operation to a set of crosspoints
+    """
+
+    All = 1
+    """
+    A single full-array operation
+    """
+    Bitlines = 2
+    """
+    One slice operation per bitline, covering the selected wordlines
+    """
+    Wordlines = 3
+    """
+    One slice operation per wordline, covering the selected bitlines
+    """
+    Cells = 4
+    """
+    One operation per crosspoint
+    """
+
+
+class OperationPlan(namedtuple('OperationPlan', \
+    ['kind', 'groups', 'commands', 'cost'])):
+    """
+    An operation plan as returned from
+    :func:`~arc2control.planner.plan_operation`: the strategy, the
+    crosspoints grouped by the strategy, the number of instrument
+    commands needed and the estimated cost (in s).
+
+    ``groups`` is ``None`` for :attr:`~arc2control.planner.PlanKind.All`,
+    a dict of bitline (or wordline) to a sorted array of wordlines (or
+    bitlines) for slice plans and a list of cells for
+    :attr:`~arc2control.planner.PlanKind.Cells`.
+    """
+
+    __slots__ = ()
+
+    def __str__(self):
+        return '%s plan: %d command(s), %.3g ms' % \
+            (self.kind.name, self.commands, self.cost * 1000.0)
+
+
+class CostModel:
+    """
+    Estimated time (in s) of every kind of instrument operation, including
+    the finalisation that follows it. The defaults are rough figures for
+    ArC TWO; use :meth:`~arc2control.planner.CostModel.calibrate` to
+    measure them on a connected instrument.
+
+    :param float full: Time of a full-array operation
+    :param float slice: Time of a slice operation
+    :param float single: Time of a single-crosspoint operation
+    :param float device: Additional time per crosspoint in slice operations
+    """
+
+    FIELDS = ['full', 'slice', 'single', 'device']
+
+    def __init__(self, full=10e-3, slice=1.5e-3, single=1e-3, device=0.0):
+        self.full = float(full)
+        self.slice = float(slice)
+        self.single = float(single)
+        self.device = float(device)
+
+    def __repr__(self):
+        return 'CostModel(%s)' % ', '.join('%s=%g' % (f, getattr(self, f)) \
+            for f in CostModel.FIELDS)
+
+    def cost(self, kind, commands, devices):
+        """
+        Estimated time of a plan of ``kind`` that needs ``commands``
+        operations on ``devices`` crosspoints in total.
+        """
+        if kind == PlanKind.All:
+            return commands * self.full
+        elif kind == PlanKind.Cells:
+            return commands * self.single
+        else:
+            return commands * self.slice + devices * self.device
+
+    def to_dict(self):
+        """
+        The model parameters as a dict, suitable for storing in settings
+        """
+        return {f: getattr(self, f) for f in CostModel.FIELDS}
+
+    @staticmethod
+    def from_dict(values):
+        """
+        Create a new model from a dict created by
+        :meth:`~arc2control.planner.CostModel.to_dict`. Missing
+        parameters take their default values.
+        """
+        return CostModel(**{f: float(v) for (f, v) in values.items() \
+            if f in CostModel.FIELDS})
+
+    @staticmethod
+    def calibrate(arc, mapper, vread, idleMode=None, repeats=5):
+        """
+        Measure the cost of each kind of operation by timing read-outs
+        on a connected instrument. Reads do not disturb the devices so
+        this is safe to do on any crossbar. The per-crosspoint cost is
+        derived from slices of different lengths.
+
+        :param arc: The instrument
+        :param mapper: The active :class:`~arc2control.mapper.ChannelMapper`
+        :param float vread: The read-out voltage
+        :param idleMode: The idle mode to finalise every operation with
+        :param int repeats: Number of times every operation is timed; the
+                            fastest is kept
+
+        :return: A new :class:`~arc2control.planner.CostModel`
+        """
+
+        def _time(fn):
+            best = np.inf
+            for _ in range(repeats):
+                start = time.perf_counter()
+                fn()
+                arc.finalise_operation(idleMode)
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        (high, low) = mapper.wb2ch[0][0]
+        words = mapper.word_channels
+
+        full = _time(lambda: arc.read_all(vread, BiasOrder.Cols))
+        single = _time(lambda: arc.read_one(low, high, vread))
+        short = _time(lambda: arc.read_slice_masked(low, words[0:1], vread))
+        slc = _time(lambda: arc.read_slice_masked(low, words, vread))
+        device = max(slc - short, 0.0) / max(len(words) - 1, 1)
+
+        return CostModel(full, max(slc - device * len(words), 0.0), single, \
+            device)
+
+
+def group_cells(cells, kind):
+    """
+    Group crosspoints into slices. For :attr:`~arc2control.planner.PlanKind.Bitlines`
+    this is a dict of bitline to the sorted array of its selected wordlines,
+    for :attr:`~arc2control.planner.PlanKind.Wordlines` the other way around.
+    """
+    groups = {}
+    for c in cells:
+        (key, value) = (c.b, c.w) if kind == PlanKind.Bitlines else (c.w, c.b)
+        try:
+            groups[key].append(value)
+        except KeyError:
+            groups[key] = [value]
+    return {k: np.array(sorted(v), dtype=np.intp) for (k, v) in groups.items()}
+
+
+def plan_operation(cells, mapper, costs, superset=False):
+    """
+    Pick the cheapest way to apply an operation to ``cells``. Crosspoints
+    excluded by the mapper mask are dropped. A full-array operation is only
+    considered if the mapper is not masked and either every crosspoint is
+    selected or ``superset`` is ``True``, which means that the operation can
+    be applied to unselected crosspoints as well (such as a read-out,
+    where the results of unselected crosspoints are discarded). When plans
+    cost the same the simplest one wins.
+
+    :param cells: The selected crosspoints, an iterable of
+                  :class:`~arc2control.widgets.crossbar_widget.Cell`
+    :param mapper: The active :class:`~arc2control.mapper.ChannelMapper`
+    :param costs: The :class:`~arc2control.planner.CostModel` to use
+    :param bool superset: Whether the operation may touch unselected
+                          crosspoints
+
+    :return: An :class:`~arc2control.planner.OperationPlan`; ``None`` if
+             there is nothing to do
+    """
+    mask = mapper.mask
+    cells = [c for c in cells if c.b < mask.shape[0] and c.w < mask.shape[1] \
+        and mask[c.b][c.w] == 1]
+    if len(cells) == 0:
+        return None
+
+    ndevices = len(cells)
+    candidates = []
+
+    candidates.append(OperationPlan(PlanKind.Cells, cells, ndevices, \
+        costs.cost(PlanKind.Cells, ndevices, ndevices)))
+
+    for kind in [PlanKind.Bitlines, PlanKind.Wordlines]:
+        groups = group_cells(cells, kind)
+        candidates.append(OperationPlan(kind, groups, len(groups), \
+            costs.cost(kind, len(groups), ndevices)))
+
+    if not mapper.is_masked and \
+        (superset or ndevices == mapper.total_devices):
+        candidates.append(OperationPlan(PlanKind.All, None, 1, \
+            costs.cost(PlanKind.All, 1, mapper.total_devices)))
+
+    # min keeps the first of equal candidates
+    return min(candidates, key=lambda p: p.cost)
@@ -33,6 +33,9 @@ class __Signals(QObject):
     valueUpdate = pyqtSignal(int, int, float, float, float, float, OpType)
     # same, but with ndarrays for bulk updates
     valueBulkUpdate = pyqtSignal(int, int, ndarray, ndarray, ndarray, ndarray, ndarray)
+    # wordlines, bitlines, currents, voltages, pulse widths, vreads, optypes
+    # as ndarrays for updates spanning multiple crosspoints
+    valueMultiUpdate = pyqtSignal(ndarray, ndarray, ndarray, ndarray, ndarray, ndarray, ndarray)
     # wordline, bitline
     dataDisplayUpdate = pyqtSignal(int, int)
     # weakref to the current dataset
@@ -104,6 +107,19 @@ Signature: ``valueUpdate(word: int, bit: int, current: ndarray, vpulse: ndarray,
 pulse_width: ndarray, vread: ndarray, optype: ndarray)``
 """
 
+valueMultiUpdate = __signals.valueMultiUpdate
+"""
+Status of multiple crosspoints changed. Emit this signal to store values in
+the timeseries data of several crosspoints at once, for instance after a
+slice or a full crossbar operation. The *i*-th element of each array
+corresponds to crosspoint ``(words[i], bits[i])``. This is considerably
+faster than emitting :meth:`~arc2control.signals.valueUpdate` for every
+crosspoint.
+
+Signature: ``valueMultiUpdate(words: ndarray, bits: ndarray, current: ndarray,
+vpulse: ndarray, pulse_width: ndarray, vread: ndarray, optype: ndarray)``
+"""
+
 dataDisplayUpdate = __signals.dataDisplayUpdate
 """
 Data display update request on specific crosspoint. Emit this signal to
@@ -0,0 +1,439 @@
+"""
+A software model of ArC TWO that implements the subset of the
+:class:`pyarc2.Instrument` API used by ArC2Control and its built-in
+modules. It can be used in place of a real instrument to run the
+application, modules and benchmarks without any hardware attached.
+
+ArC TWO channels 0–15 and 32–47 are treated as bitlines and channels
+16–31 and 48–63 as wordlines (as in all the bundled mappings) so
+every bitline/wordline channel pair is a crosspoint. Each crosspoint
+holds a normalised state :math:`x \\in [0, 1]` and its resistance is
+interpolated logarithmically between ``roff`` (:math:`x = 0`) and
+``ron`` (:math:`x = 1`). A voltage :math:`V` across a crosspoint
+(wordline potential minus bitline potential) switches it if
+:math:`|V|` exceeds ``threshold``; positive voltages move it towards
+``ron``, negative voltages towards ``roff``. Read-outs never disturb
+the devices.
+
+As with the real instrument, pulsing and channel configuration commands
+are queued and only take effect on
+:meth:`~arc2control.simulator.SimulatedInstrument.execute`, whereas
+read-outs execute any pending commands and return immediately. Every
+command costs ``latency`` seconds when it is executed.
+
+.. code-block:: python
+
+   from arc2control.simulator import SimulatedInstrument
+   from pyarc2 import BiasOrder
+
+   arc = SimulatedInstrument(ron=1e3, roff=1e5, latency=1e-3, seed=0)
+   arc.pulse_all(2.0, 100000, BiasOrder.Cols).execute()
+   currents = arc.read_all(0.2, BiasOrder.Cols)
+"""
+
+import time
+import threading
+from collections import Counter
+import numpy as np
+
+from pyarc2 import BiasOrder, DataMode, ReadAt, ReadAfter
+
+
+NUM_CHANNELS = 64
+
+_CHANNELS = np.arange(NUM_CHANNELS)
+# True for wordline (high) channels
+_IS_WORD = ((_CHANNELS // 16) % 2) == 1
+# position of every channel within its half, in ascending channel order
+_COMPACT = (_CHANNELS % 16) + (_CHANNELS // 32) * 16
+_BIT_CHANNELS = _CHANNELS[~_IS_WORD]
+_WORD_CHANNELS = _CHANNELS[_IS_WORD]
+
+# pulse width the switching rate is specified for
+_REFERENCE_PULSE_NS = 100000
+
+
+class SimulatedInstrument:
+    """
+    A simulated ArC TWO. It can be used wherever ArC2Control expects a
+    :class:`pyarc2.Instrument`, for instance by connecting it through
+    :meth:`~arc2control.widgets.arc2connection_widget.ArC2ConnectionWidget.connectInstrument`.
+
+    :param resistances: Initial crosspoint resistances; either a scalar
+                        or a 32×32 array indexed by ``[bitline, wordline]``
+                        position in ascending channel order. If ``None``
+                        resistances are drawn log-uniformly between ``ron``
+                        and ``roff``
+    :param float ron: The lowest resistance of a device
+    :param float roff: The highest resistance of a device
+    :param float threshold: Minimum voltage (absolute) needed to switch a
+                            device
+    :param float rate: State change (as a fraction of the full range) per
+                       volt above ``threshold`` for a 100 µs pulse. It
+                       scales with the square root of the pulse width
+    :param float noise: Relative standard deviation of the read-out noise
+    :param latency: Time (in s) every command takes to execute; either a
+                    single value for all commands or a dict of command
+                    names (for instance ``'read_all'``) to time. Commands
+                    missing from the dict take no time
+    :param int seed: Seed for the random number generator
+    """
+
+    def __init__(self, resistances=None, ron=1e3, roff=1e5, threshold=1.0, \
+        rate=0.2, noise=0.0, latency=0.0, seed=None):
+
+        if ron <= 0 or roff <= ron:
+            raise ValueError("Resistance bounds must satisfy 0 < ron < roff")
+
+        self._ron = float(ron)
+        self._roff = float(roff)
+        self._threshold = float(threshold)
+        self._rate = float(rate)
+        self._noise = float(noise)
+        self._latency = latency
+        self._rng = np.random.default_rng(seed)
+
+        shape = (len(_BIT_CHANNELS), len(_WORD_CHANNELS))
+        if resistances is None:
+            self._state = self._rng.uniform(0.0, 1.0, size=shape)
+        else:
+            res = np.broadcast_to(np.asarray(resistances, dtype=np.float64), \
+                shape)
+            self._state = self.__resistance2state(res)
+
+        self._potentials = np.zeros(NUM_CHANNELS)
+        self._queue = []
+        self._buffer = []
+        self._commands = Counter()
+        self._idleMode = None
+        self._logic = None
+        self._lock = threading.RLock()
+
+    @property
+    def resistances(self):
+        """
+        A copy of the current crosspoint resistances as a 32×32 array
+        indexed by ``[bitline, wordline]`` position in ascending channel
+        order; the same layout as :meth:`read_all` with ``BiasOrder.Cols``.
+        """
+        with self._lock:
+            return self.__state2resistance(self._state)
+
+    def resistance(self, low, high):
+        """
+        The current resistance of the crosspoint between channels ``low``
+        and ``high``.
+        """
+        (bits, words, _) = self.__pairs(low, high)
+        with self._lock:
+            return float(self.__state2resistance(self._state[bits, words])[0])
+
+    @property
+    def command_count(self):
+        """
+        Number of commands executed so far, by command name. Useful to
+        check how many round-trips to the instrument an operation needs.
+        """
+        with self._lock:
+            return Counter(self._commands)
+
+    @property
+    def idle_mode(self):
+        """
+        The idle mode last set with :meth:`finalise_operation`
+        """
+        return self._idleMode
+
+    # Device model
+
+    def __state2resistance(self, state):
+        return self._roff * np.power(self._ron/self._roff, state)
+
+    def __resistance2state(self, res):
+        res = np.clip(res, self._ron, self._roff)
+        return np.log(res/self._roff) / np.log(self._ron/self._roff)
+
+    def __pairs(self, lows, highs):
+        # (bitline, wordline) positions of the crosspoints between
+        # the channel pairs and the orientation of the channels; +1 if
+        # ``highs`` are wordlines, -1 otherwise
+        lows = np.atleast_1d(np.asarray(lows, dtype=np.int64))
+        highs = np.atleast_1d(np.asarray(highs, dtype=np.int64))
+        (lows, highs) = np.broadcast_arrays(lows, highs)
+
+        if np.any(_IS_WORD[lows] == _IS_WORD[highs]):
+            raise ValueError("Channels %s and %s do not form crosspoints" % \
+                (lows, highs))
+
+        bits = np.where(_IS_WORD[highs], lows, highs)
+        words = np.where(_IS_WORD[highs], highs, lows)
+        sign = np.where(_IS_WORD[highs], 1.0, -1.0)
+
+        return (_COMPACT[bits], _COMPACT[words], sign)
+
+    def __switch(self, bits, words, voltages, nanos):
+        # apply ``voltages`` (wordline minus bitline) to the crosspoints
+        # for ``nanos`` ns
+        voltages = np.broadcast_to(voltages, np.shape(bits))
+        overdrive = np.abs(voltages) - self._threshold
+        active = overdrive > 0.0
+        if not np.any(active) or nanos <= 0:
+            return
+
+        delta = self._rate * overdrive[active] * \
+            np.sqrt(nanos / _REFERENCE_PULSE_NS) * np.sign(voltages[active])
+        (bits, words) = (bits[active], words[active])
+        self._state[bits, words] = np.clip(self._state[bits, words] + delta, \
+            0.0, 1.0)
+
+    def __currents(self, bits, words, voltages):
+        # current flowing into the high channel of each crosspoint when
+        # its low channel is at ``-voltages`` and the high channel at 0
+        res = self.__state2resistance(self._state[bits, words])
+        currents = -np.asarray(voltages) / res
+        if self._noise > 0.0:
+            currents = currents * (1.0 + \
+                self._rng.normal(0.0, self._noise, size=np.shape(currents)))
+        return currents
+
+    def __stress(self, nanos):
+        # bias the whole array with the current channel potentials
+        voltages = self._potentials[_WORD_CHANNELS][np.newaxis, :] - \
+            self._potentials[_BIT_CHANNELS][:, np.newaxis]
+        (bits, words) = np.indices(voltages.shape)
+        self.__switch(bits.ravel(), words.ravel(), voltages.ravel(), nanos)
+
+    # Command handling
+
+    def __cost(self, name):
+        self._commands[name] += 1
+        if isinstance(self._latency, dict):
+            return self._latency.get(name, 0.0)
+        return self._latency
+
+    def __enqueue(self, name, fn):
+        with self._lock:
+            self._queue.append((name, fn))
+        return self
+
+    def __run(self):
+        # execute pending commands; called with the lock held
+        elapsed = 0.0
+        (queue, self._queue) = (self._queue, [])
+        for (name, fn) in queue:
+            elapsed += self.__cost(name)
+            fn()
+        return elapsed
+
+    def __immediate(self, name, fn):
+        with self._lock:
+            elapsed = self.__run()
+            elapsed += self.__cost(name)
+            result = fn()
+        if elapsed > 0.0:
+            time.sleep(elapsed)
+        return result
+
+    def execute(self):
+        """
+        Execute all queued commands
+        """
+        with self._lock:
+            elapsed = self.__run()
+            elapsed += self.__cost('execute')
+        if elapsed > 0.0:
+            time.sleep(elapsed)
+        return self
+
+    def wait(self):
+        return self
+
+    def busy(self):
+        return False
+
+    def finalise_operation(self, mode=None, control=None):
+        def _finalise():
+            self._potentials[:] = 0.0
+            if mode is not None:
+                self._idleMode = mode
+
+        self.__immediate('finalise_operation', _finalise)
+        return self
+
+    # Channel configuration
+
+    def __setPotentials(self, channels, voltage):
+        channels = np.asarray(channels, dtype=np.int64)
+        return lambda: self._potentials.__setitem__(channels, voltage)
+
+    def connect_to_gnd(self, chans):
+        return self.__enqueue('connect_to_gnd', \
+            self.__setPotentials(np.asarray(chans, dtype=np.int64), 0.0))
+
+    def ground_all(self):
+        return self.__enqueue('ground_all', self.__setPotentials(_CHANNELS, 0.0))
+
+    def ground_all_fast(self):
+        return self.__enqueue('ground_all_fast', \
+            self.__setPotentials(_CHANNELS, 0.0))
+
+    def float_all(self):
+        return self.__enqueue('float_all', self.__setPotentials(_CHANNELS, 0.0))
+
+    def set_logic(self, mask, cl0=None, cl1=None, cl2=None, cl3=None):
+        self._logic = (mask, cl0, cl1, cl2, cl3)
+        return self
+
+    def config_channels(self, input, base=None):
+        config = list(input)
+
+        def _config():
+            if base is not None:
+                self._potentials[:] = base
+            for (chan, voltage) in config:
+                self._potentials[chan] = voltage
+
+        return self.__enqueue('config_channels', _config)
+
+    def delay(self, nanos):
+        return self.__enqueue('delay', lambda: self.__stress(nanos))
+
+    # Pulsing
+
+    def pulse_one(self, low, high, voltage, nanos):
+        (bits, words, sign) = self.__pairs(low, high)
+        return self.__enqueue('pulse_one', \
+            lambda: self.__switch(bits, words, sign*voltage, nanos))
+
+    def pulse_slice_masked(self, chan, voltage, nanos, mask):
+        (bits, words, sign) = self.__pairs(chan, mask)
+        return self.__enqueue('pulse_slice_masked', \
+            lambda: self.__switch(bits, words, sign*voltage, nanos))
+
+    def pulse_all(self, voltage, nanos, order):
+        (bits, words) = np.indices(self._state.shape)
+        (bits, words) = (bits.ravel(), words.ravel())
+        return self.__enqueue('pulse_all', \
+            lambda: self.__switch(bits, words, voltage, nanos))
+
+    def pulse_slice_fast_open(self, chans, cl_nanos, preset_state):
+        chans = list(chans)
+
+        def _pulse():
+            previous = self._potentials.copy()
+            for (chan, voltage, _) in chans:
+                self._potentials[chan] = voltage
+                # pulse widths are set per cluster of 8 channels
+                nanos = cl_nanos[chan // 8]
+                if nanos is not None:
+                    self.__stress(nanos)
+            if preset_state:
+                self._potentials[:] = previous
+
+        return self.__enqueue('pulse_slice_fast_open', _pulse)
+
+    # Read-outs
+
+    def read_one(self, low, high, vread):
+        (bits, words, _) = self.__pairs(low, high)
+        return self.__immediate('read_one', \
+            lambda: float(self.__currents(bits, words, vread)[0]))
+
+    def __readSlice(self, chan, mask, vread):
+        mask = np.atleast_1d(np.asarray(mask, dtype=np.int64))
+        (bits, words, _) = self.__pairs(chan, mask)
+        result = np.full(NUM_CHANNELS//2, np.nan, dtype=np.float32)
+        result[_COMPACT[mask]] = self.__currents(bits, words, vread)
+        return result
+
+    def __readAll(self, vread, order):
+        (bits, words) = np.indices(self._state.shape)
+        currents = self.__currents(bits, words, vread).astype(np.float32)
+        if order == BiasOrder.Rows:
+            return np.ascontiguousarray(currents.T)
+        return currents
+
+    def read_slice_masked(self, chan, mask, vread):
+        return self.__immediate('read_slice_masked', \
+            lambda: self.__readSlice(chan, mask, vread))
+
+    def read_all(self, vread, order):
+        return self.__immediate('read_all', lambda: self.__readAll(vread, order))
+
+    def read_slice_open(self, highs, ground_after):
+        highs = np.atleast_1d(np.asarray(highs, dtype=np.int64))
+
+        def _read():
+            result = np.full(NUM_CHANNELS, np.nan, dtype=np.float32)
+            # every high channel sinks current from all the channels
+            # on the other half of the array
+            for high in highs:
+                others = _WORD_CHANNELS if not _IS_WORD[high] else _BIT_CHANNELS
+                voltages = self._potentials[high] - self._potentials[others]
+                (bits, words, _) = self.__pairs(others, high)
+                result[high] = np.sum(self.__currents(bits, words, voltages))
+            if ground_after:
+                self._potentials[:] = 0.0
+            return result
+
+        return self.__immediate('read_slice_open', _read)
+
+    def pulseread_one(self, low, high, vpulse, nanos, vread):
+        self.pulse_one(low, high, vpulse, nanos)
+        return self.read_one(low, high, vread)
+
+    def pulseread_slice_masked(self, chan, mask, vpulse, nanos, vread):
+        self.pulse_slice_masked(chan, vpulse, nanos, mask)
+        return self.read_slice_masked(chan, mask, vread)
+
+    def pulseread_all(self, vpulse, nanos, vread, order):
+        self.pulse_all(vpulse, nanos, order)
+        return self.read_all(vread, order)
+
+    # Ramps
+
+    def generate_ramp(self, low, high, vstart, vstep, vstop, pw_nanos, \
+        inter_nanos, num_pulses, read_at, read_after):
+        (bits, words, sign) = self.__pairs(low, high)
+        voltages = np.arange(vstart, vstop, vstep)
+        npulses = max(num_pulses, 1)
+
+        def _read(vbias):
+            if read_at == ReadAt.Never or read_after == ReadAfter.Never:
+                return
+            vread = vbias if read_at == ReadAt.Bias else read_at.voltage()
+            result = np.full(NUM_CHANNELS, np.nan, dtype=np.float32)
+            current = self.__currents(bits, words, vread)[0]
+            result[high] = current
+            result[low] = -current
+            self._buffer.append(result)
+
+        def _ramp():
+            for v in voltages:
+                for _ in range(npulses):
+                    self.__switch(bits, words, sign*v, pw_nanos)
+                    if read_after == ReadAfter.Pulse:
+                        _read(v)
+                if read_after == ReadAfter.Block:
+                    _read(v)
+            if read_after == ReadAfter.Ramp and len(voltages) > 0:
+                _read(voltages[-1])
+
+        return self.__enqueue('generate_ramp', _ramp)
+
+    def get_iter(self, mode, rtype=None):
+        """
+        Iterate through, and consume, the read-outs stored by ramp
+        operations. Every item is a list with a single array of channel
+        currents, as with the real instrument.
+        """
+        while True:
+            with self._lock:
+                if len(self._buffer) == 0:
+                    return
+                data = self._buffer.pop(0)
+            if mode == DataMode.Words:
+                data = data[_WORD_CHANNELS]
+            elif mode == DataMode.Bits:
+                data = data[_BIT_CHANNELS]
+            yield [data]
@@ -0,0 +1,97 @@
+"""
+Command line utilities for ArC2Control datastores. Available commands are
+``compact`` which rewrites a datastore trimming all unused space and
+optionally changing its compression and ``export`` which dumps the
+timeseries and experiment tables of all crosspoints.
+
+.. code-block:: console
+
+   $ python -m arc2control.storetool compact dataset.h5 compacted.h5 --profile compact
+   $ python -m arc2control.storetool export dataset.h5 dataset.npz --format npz
+"""
+
+import sys
+import os.path
+import argparse
+from .h5utils import H5DataStore, H5Mode, STORAGE_PROFILES
+from .export import export_store, human_bytes, BULK_FORMATS, EXPORT_CHUNK_ROWS
+
+
+def _compact(args):
+    if not os.path.exists(args.source):
+        print('%s: no such file' % args.source, file=sys.stderr)
+        return 1
+
+    with H5DataStore(args.source, mode=H5Mode.READ) as store:
+        saved = store.compact(args.target, profile=args.profile, \
+            block_rows=args.block_rows)
+
+    original = os.path.getsize(args.source)
+    print('%s: %s → %s: %s (saved %s, %.1f%%)' % \
+        (args.source, human_bytes(original), args.target, \
+         human_bytes(original - saved), human_bytes(saved), \
+         100.0*saved/original if original > 0 else 0.0))
+
+    return 0
+
+
+def _export(args):
+    if not os.path.exists(args.source):
+        print('%s: no such file' % args.source, file=sys.stderr)
+        return 1
+
+    def progress(done, total):
+        print('\r%d/%d crosspoints' % (done, total), end='', file=sys.stderr)
+
+    summary = export_store(args.source, args.target, args.format, \
+        workers=args.workers, chunk_rows=args.chunk_rows, \
+        progress=None if args.quiet else progress)
+
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    print('%s → %s: %d tables, %d rows from %d crosspoints; '
+        '%s in %.1f s (%s/s)' % (args.source, args.target, summary.tables, \
+        summary.rows, summary.crosspoints, human_bytes(summary.nbytes), \
+        summary.elapsed, human_bytes(summary.throughput)))
+
+    return 0
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='arc2control-store', \
+        description='ArC2Control datastore utilities')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compact = subparsers.add_parser('compact', \
+        help='Trim unused space from a datastore and optionally recompress it')
+    compact.add_argument('source', help='Datastore to compact')
+    compact.add_argument('target', help='Filename of the compacted datastore')
+    compact.add_argument('--profile', choices=list(STORAGE_PROFILES.keys()), \
+        default=None, help='Rewrite all datasets with this storage profile '
+        '(default: keep current layout)')
+    compact.add_argument('--block-rows', type=int, \
+        default=H5DataStore._COMPACT_BLOCK_ROWS, \
+        help='Number of rows to copy at once (default: %(default)s)')
+    compact.set_defaults(func=_compact)
+
+    export = subparsers.add_parser('export', \
+        help='Export the timeseries and experiments of all crosspoints')
+    export.add_argument('source', help='Datastore to export')
+    export.add_argument('target', help='Output directory, or file for npz')
+    export.add_argument('--format', choices=BULK_FORMATS, default='csv', \
+        help='Output format (default: %(default)s)')
+    export.add_argument('--workers', type=int, default=None, \
+        help='Number of worker processes (default: one per CPU)')
+    export.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS, \
+        help='Number of rows to process at once (default: %(default)s)')
+    export.add_argument('--quiet', action='store_true', \
+        help='Do not report progress')
+    export.set_defaults(func=_export)
+
+    args = parser.parse_args(args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
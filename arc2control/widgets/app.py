@@ -24,12 +24,16 @@ from .plottingoptions_widget import DisplayType as PlotDisplayType
 from .plottingoptions_widget import YScale as PlotYScale
 from .plottingoptions_widget import PlottingOptionsWidget
 from .device_explorer_widget import DeviceExplorerWidget
+from .export_dialog import exportWithProgress, bulkExportWithProgress
+from ..export import BULK_FORMATS
 from .statustray_widget import StatusTrayWidget
 from .fwmanager_dialog import FirmwareManagementDialog
 from .about_dialog import AboutDialog
 from .crossbar_widget import PaintWidget, Cell
 from .. import graphics
 from ..h5utils import H5DataStore, OpType, H5Mode
+from ..planner import CostModel, PlanKind, plan_operation, group_cells
+from .crossbar_operation import CrossbarOperation, OperationContext
 import weakref
 import os, tempfile
 from .. import signals
@@ -38,12 +42,58 @@ from .. import constants
 from .. import ArC2ControlSettings
 
 
+# timeseries columns required by the main plot
+_PLOT_FIELDS = ['current', 'voltage', 'read_voltage', 'op_type']
+# number of rows above which the main plot shows a min/max envelope
+# of the timeseries instead of individual points
+_PLOT_ENVELOPE_ROWS = 100000
+# quantities that can be displayed on the crossbar: label, datastore
+# statistic (None for the latest resistance), unit and colour scale
+# (None for the default resistance scale, otherwise 'log' or 'linear'
+# fitted to the displayed values)
+_HEATMAP_METRICS = [
+    ('Resistance', None, 'Ω', None),
+    ('Mean resistance', 'mean', 'Ω', None),
+    ('Min. resistance', 'min', 'Ω', None),
+    ('Max. resistance', 'max', 'Ω', None),
+    ('Resistance std. dev.', 'std', 'Ω', 'log'),
+    ('Resistance drift', 'drift', 'Ω', 'linear'),
+    ('Operations', 'count', '', 'linear'),
+    ('Reads', 'reads', '', 'linear'),
+    ('Pulses', 'pulses', '', 'linear'),
+    ('Pulse-reads', 'pulsereads', '', 'linear')
+]
+# minimum interval between crossbar statistics refreshes (in ms)
+_HEATMAP_REFRESH_INTERVAL = 250
+# trace symbol for each display type
+_PLOT_SYMBOLS = {
+    PlotDisplayType.Resistance: '+',
+    PlotDisplayType.Conductance: 'x',
+    PlotDisplayType.Current: 't',
+    PlotDisplayType.AbsCurrent: 't1'
+}
+
+
 class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
 
-    def __init__(self, mappers, shape=(32,32), modules={}, mapper=None, dset=None, parent=None):
+    def __init__(self, mappers, shape=(32,32), modules={}, mapper=None, dset=None, \
+        profile=None, swmr=False, parent=None):
         self._arc = None
         self._modules = modules
+        # storage profile for new datasets
+        self._profile = profile
+        # whether new datasets can be read by other processes while
+        # they are being written to
+        self._swmr = swmr
         (self._nbits, self._nwords) = shape
+        # estimated cost of instrument operations, used to pick how
+        # selections are read or pulsed
+        self._costModel = CostModel.from_dict(\
+            ArC2ControlSettings.value('main/opcosts', {}) or {})
+        # read/pulse operation of the main crossbar currently running
+        # and operations waiting for it, by kind
+        self._crossbarOp = None
+        self._pendingOps = {}
         GeneratedElements.Ui_ArC2MainWindow.__init__(self)
         QtWidgets.QWidget.__init__(self, parent=parent)
 
@@ -74,9 +124,9 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         self.__connectSignals()
 
         if dset is None:
-            self._datastore = H5DataStore(tempfile.NamedTemporaryFile(\
+            self._datastore = self.__openDatastore(tempfile.NamedTemporaryFile(\
                 suffix='.h5', delete=False).name,\
-                mode=H5Mode.WRITE, shape=shape)
+                mode=H5Mode.WRITE, shape=shape, profile=self._profile)
             self._datastore.__setattr__('is_temporary', True)
             self._datastore.__setattr__('is_readonly', False)
 
@@ -85,10 +135,10 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
                 np.zeros(self._datastore.shape))
         else:
             try:
-                self._datastore = H5DataStore(dset, mode=H5Mode.APPEND, shape=shape)
+                self._datastore = self.__openDatastore(dset, mode=H5Mode.APPEND, shape=shape)
                 self._datastore.__setattr__('is_readonly', False)
             except PermissionError:
-                self._datastore = H5DataStore(dset, mode=H5Mode.READ, shape=shape)
+                self._datastore = self.__openDatastore(dset, mode=H5Mode.READ, shape=shape)
                 self._datastore.__setattr__('is_readonly', True)
             self._datastore.__setattr__('is_temporary', False)
             self.deviceExplorerWidget.clear()
@@ -141,10 +191,21 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         self.bitlineLabel.setStyleSheet('font-weight: bold')
         self.bitlineLabel.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
 
+        for (label, _, _, _) in _HEATMAP_METRICS:
+            self.heatmapMetricComboBox.addItem(label)
+
+        # statistics are refreshed at most every _HEATMAP_REFRESH_INTERVAL
+        # ms while data is coming in
+        self._heatmapTimer = QtCore.QTimer(self)
+        self._heatmapTimer.setSingleShot(True)
+        self._heatmapTimer.setInterval(_HEATMAP_REFRESH_INTERVAL)
+        self._heatmapTimer.timeout.connect(self.__refreshHeatmap)
+
 
     def __connectSignals(self):
 
         self.selectAllButton.clicked.connect(lambda: self.mainCrossbarWidget.selectAll())
+        self.heatmapMetricComboBox.currentIndexChanged.connect(self.__heatmapMetricChanged)
 
         self.mainCrossbarWidget.selectionChanged.connect(self.selectionChanged)
         self.mainCrossbarWidget.mousePositionChanged.connect(self.mousePositionChanged)
@@ -173,6 +234,13 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         self.openReadonlyDatasetAction.triggered.connect(partial(self.openDataset, forceRO=True))
         self.saveDatasetAction.triggered.connect(self.saveDataset)
         self.saveDatasetAsAction.triggered.connect(self.saveDatasetAs)
+        self.exportDatasetAction.triggered.connect(self.exportDataset)
+        self.rasterHistoryAction.setChecked(\
+            ArC2ControlSettings.value('main/rasterhistory', False, type=bool))
+        self.rasterHistoryAction.toggled.connect(\
+            lambda checked: ArC2ControlSettings.setValue('main/rasterhistory', checked))
+        self.calibrateCostsAction.triggered.connect(\
+            lambda: self.calibrateOperationCosts())
         signals.datastoreReplaced.connect(self.datastoreReplaced)
         self.quitAction.triggered.connect(self.close)
         self.aboutAction.triggered.connect(self.showAboutDialog)
@@ -187,6 +255,7 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
 
         signals.valueUpdate.connect(self.valueUpdate)
         signals.valueBulkUpdate.connect(self.valueUpdateBulk)
+        signals.valueMultiUpdate.connect(self.valueUpdateMany)
         signals.dataDisplayUpdate.connect(self.updateSinglePlot)
 
     def __setupControlWidgets(self):
@@ -204,6 +273,14 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         self.controlCollapsibleTreeWidget.addWidget("Plotting Options",\
             self.plottingOptionsWidget)
 
+    def __openDatastore(self, fname, mode, **kwargs):
+        # all file access happens on the datastore's writer thread so that
+        # slow disks don't block the UI; rows are buffered in write-behind
+        # mode and flushed periodically by the writer
+        if mode == H5Mode.WRITE:
+            kwargs.setdefault('swmr', self._swmr)
+        return H5DataStore(fname, mode=mode, writebehind=True, threaded=True, **kwargs)
+
     def __setupPlottingWidgets(self):
         self.tracePlot = self.mainPlotWidget.addPlot(name='trace')
         self.tracePlot.showGrid(x=True, y=True)
@@ -229,6 +306,31 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         self.mainPlotWidget.ci.layout.setRowStretchFactor(0, 2)
         self.mainPlotWidget.ci.layout.setRowStretchFactor(1, 1)
 
+        # persistent plot items; these are updated in place with new data
+        # instead of being recreated on every value update
+        self.traceCurve = self.tracePlot.plot([], [], \
+            pen={'color': '#F00', 'width': 1}, symbol='+', symbolPen=None, \
+            symbolSize=6, symbolBrush='#F00')
+        self.pulsePoints = self.pulsePlot.plot([], [], pen=None,\
+            symbolPen=None, symbolBrush=(0, 150, 150),  symbol='s',\
+            symbolSize=6)
+        self.pulseImpulses = self.pulsePlot.plot([], [], \
+            pen=(0, 150, 150), connect='pairs')
+        self.readPoints = self.pulsePlot.plot([], [], pen=None,\
+            symbolPen=None, symbolBrush=(0, 0, 255),  symbol='+',\
+            symbolSize=6)
+        self.__resetPlotBuffers()
+
+        # long timeseries are plotted as an envelope that is re-read
+        # for the visible range when zooming
+        self._envelopeTimer = QtCore.QTimer(self)
+        self._envelopeTimer.setSingleShot(True)
+        self._envelopeTimer.setInterval(100)
+        self._envelopeTimer.timeout.connect(self.__envelopeRangeChanged)
+        self.tracePlot.sigXRangeChanged.connect(\
+            lambda *args: self._envelopeTimer.start() \
+                if self._envelopeQuery is not None else None)
+
     def __populateModuleComboBox(self):
         for (tag, (name, mod)) in self._modules.items():
             self.moduleListComboBox.addItem(name, mod)
@@ -313,6 +415,7 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
             self._arc = weakref.ref(self.arc2ConnectionWidget.arc2)
         else:
             self._arc = None
+        self.calibrateCostsAction.setEnabled(connected)
         signals.arc2ConnectionChanged.emit(connected, self._arc)
 
     def experimentSelected(self, tag, path):
@@ -379,7 +482,10 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
             return
         else:
             cell = list(cells)[0]
-            value = self.mainCrossbarWidget.valueOf(cell)
+            if self.__heatmapMetric[1] is None:
+                value = self.mainCrossbarWidget.valueOf(cell)
+            else:
+                value = self._datastore.stats(cell.w, cell.b)['last']
             self.readOpsWidget.setValue(cell.w, cell.b, value, suffix='Ω')
             self.updateSinglePlot(*list(cells)[0])
 
@@ -390,37 +496,164 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
 
         (w, b) = (cell.w, cell.b)
         value = self.mainCrossbarWidget.valueOf(cell)
-        if not np.isnan(value):
-            value = pg.siFormat(value, suffix='Ω')
-        else:
+        unit = self.__heatmapMetric[2]
+        if np.isnan(value):
             value = "N/A"
+        elif unit == '':
+            value = '%g' % value
+        else:
+            value = pg.siFormat(value, suffix=unit)
         self.hoverLabel.setText("W = %d | B = %d – %s" % (cell.w+1, cell.b+1, value))
 
     def readoutVoltageChanged(self, voltage):
         signals.readoutVoltageChanged.emit(voltage)
 
+    @property
+    def costModel(self):
+        """
+        The :class:`~arc2control.planner.CostModel` used to plan read and
+        pulse operations on selections
+        """
+        return self._costModel
+
+    @costModel.setter
+    def costModel(self, model):
+        self._costModel = model
+        ArC2ControlSettings.setValue('main/opcosts', model.to_dict())
+
+    def calibrateOperationCosts(self, repeats=5):
+        """
+        Measure the cost of read operations on the connected instrument
+        and use them for planning from now on. This is what the
+        *Calibrate operation costs* entry of the *File* menu does. Any
+        running or queued crossbar operations are allowed to finish first
+        as calibration drives the instrument directly.
+
+        :return: The new :class:`~arc2control.planner.CostModel`
+        """
+        if self._arc is None:
+            return self._costModel
+
+        self.waitForCrossbarOperations()
+        if self._arc is None:
+            # disconnected in the meantime
+            return self._costModel
+
+        self.costModel = CostModel.calibrate(self._arc(), self.mapper, \
+            self.readOpsWidget.readoutVoltage(), \
+            self.arc2ConnectionWidget.idleMode, repeats)
+        logger.info("calibrated operation costs: %s" % self._costModel)
+
+        return self._costModel
+
+    def __plan(self, cells, superset=False):
+        plan = plan_operation(cells, self.mapper, self._costModel, superset)
+        if plan is not None:
+            logger.debug("%d crosspoint(s) → %s" % (len(cells), plan))
+        return plan
+
+    def __context(self):
+        return OperationContext(self._arc(), self.mapper, \
+            self.arc2ConnectionWidget.idleMode, \
+            self.readOpsWidget.readoutVoltage(), self._nbits, self._nwords, \
+            self._costModel)
+
+    def __submit(self, key, job, *args, finished=None):
+        # run ``job`` on a background thread; if an operation is already
+        # running the job is queued, replacing any queued job of the same
+        # kind so that repeated requests do not stack up
+        if self._arc is None:
+            return
+
+        if self._crossbarOp is not None:
+            if key in self._pendingOps:
+                logger.debug("merging queued %s operation" % key)
+            self._pendingOps[key] = (job, args, finished)
+            return
+
+        self.__startOperation(key, job, args, finished)
+
+    def __startOperation(self, key, job, args, finished):
+        if self._arc is None:
+            self._pendingOps.clear()
+            self.__setOperationsEnabled(True)
+            return
+
+        ctx = self.__context()
+        op = CrossbarOperation(key, lambda op: job(ctx, op, *args), parent=self)
+        op.resultsReady.connect(self.__operationResults)
+        op.operationFinished.connect(\
+            lambda msg: self.__operationFinished(op, msg, finished))
+        self._crossbarOp = op
+        self.__setOperationsEnabled(False)
+        op.start()
+
+    def __operationResults(self, results):
+        signals.valueMultiUpdate.emit(*results)
+
+    def __operationFinished(self, op, msg, finished):
+        op.wait()
+        op.deleteLater()
+        self._crossbarOp = None
+
+        if msg != '':
+            logger.error("%s operation failed: %s" % (op.key, msg))
+        elif finished is not None:
+            finished()
+
+        if len(self._pendingOps) > 0:
+            key = next(iter(self._pendingOps))
+            self.__startOperation(key, *self._pendingOps.pop(key))
+        else:
+            self.__setOperationsEnabled(True)
+
+    def __setOperationsEnabled(self, enabled):
+        self.readOpsWidget.setEnabled(enabled)
+        self.pulseOpsWidget.setEnabled(enabled)
+
+    def waitForCrossbarOperations(self):
+        """
+        Block until all running and queued read and pulse operations of the
+        main crossbar are finished and their results have been recorded.
+        """
+        while self._crossbarOp is not None:
+            self._crossbarOp.wait()
+            QtCore.QCoreApplication.processEvents()
+
     def readSelectedClicked(self):
-        cells = self.mainCrossbarWidget.selectedCells
-        if len(cells) != 1:
-            self.readSelectedSlices(cells)
+        self.__readCells(self.mainCrossbarWidget.selectedCells)
+
+    def __readCells(self, cells, finished=None):
+        # reads do not disturb unselected crosspoints so a full
+        # array read can be used for any selection
+        plan = self.__plan(cells, superset=True)
+        if plan is None:
+            return
+
+        if plan.kind == PlanKind.All:
+            self.__submit('read', self.__readAllJob, cells, finished=finished)
+        elif plan.kind == PlanKind.Cells:
+            self.__submit('read', self.__readCellsJob, plan.groups, \
+                finished=finished)
         else:
-            self.readSelectedCell(cells)
+            self.__submit('read', self.__readSlicesJob, cells, plan.kind, \
+                finished=finished)
 
     def __pulseOpInner(self, voltage, pulsewidth, _single, _slice, _all):
         cells = self.mainCrossbarWidget.selectedCells
 
-        # first check if we can use the Pulse{Read}All operation
-        # from libarc2, this can only be applied to the full
-        # crossbar
-        if len(cells) == self.mapper.total_devices:
+        # the Pulse{Read}All operation from libarc2 can only
+        # be used if the full crossbar is selected
+        plan = self.__plan(cells)
+        if plan is None:
+            return
+
+        if plan.kind == PlanKind.All:
             _all(voltage, pulsewidth)
-        # otherwise either do single pulse or slice pulse
+        elif plan.kind == PlanKind.Cells:
+            _single(plan.groups, voltage, pulsewidth)
         else:
-            if len(cells) != 1:
-                _slice(cells, voltage, pulsewidth)
-            else:
-                _single(cells, voltage, pulsewidth)
-
+            _slice(cells, voltage, pulsewidth, kind=plan.kind)
 
     def pulseSelectedClicked(self, polarity):
 
@@ -452,252 +685,294 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
 
         self.__pulseOpInner(v, pw, _single, _slice, _all)
 
-    def pulseReadSelectedCell(self, cells, vpulse, pulsewidth, vread):
-        cell = cells[0]
-        (w, b) = (cell.w, cell.b)
-        (high, low) = self.mapper.wb2ch[w][b]
-        logger.debug("pulseread (word: %2d bit: %2d ←→ low: %2d high: %2d)" % (w, b, low, high))
-        logger.debug("pulseread (V = %g, PW = %g ns)" % (vpulse, pulsewidth*1.0e9))
-        if self._arc is not None:
-            self.__initialiseOperation()
-            current = self._arc().pulseread_one(low, high, vpulse, int(pulsewidth*1.0e9),
-                vread)
-            self.__finaliseOperation()
-            #self.mainCrossbarWidget.updateData(w, b, np.abs(vread/current))
-            self.readOpsWidget.setValue(w, b, np.abs(vread/current))
-            signals.valueUpdate.emit(w, b, current, vpulse, pulsewidth, vread,\
-                OpType.PULSEREAD)
-            signals.dataDisplayUpdate.emit(w, b)
-
-    def pulseReadSelectedSlices(self, cells, vpulse, pulsewidth, vread):
-        slices = {}
-
-        data = self.mainCrossbarWidget.data
-
-        for c in cells:
-            try:
-                slices[c.b].append(c.w)
-            except KeyError:
-                slices[c.b] = [c.w]
-
-        self.__initialiseOperation()
-        for (k, v) in slices.items():
-            try:
-                (volt, curr, idx) = self.__pulseReadSlice(self.mapper.b2ch[k],
-                    np.array([self.mapper.w2ch[x] for x in v], dtype=np.uint64),
-                    vpulse, pulsewidth)
-                data[k][idx] = np.abs(volt/curr[idx])
-                for w in idx:
-                    signals.valueUpdate.emit(w, k, curr[w], volt, \
-                        pulsewidth, self.readOpsWidget.readoutVoltage(),\
-                        OpType.PULSEREAD)
-                self.__finaliseOperation()
-            except TypeError:
-                # arc not connected
-                return
+    def readSelectedCell(self, cells):
+        self.__submit('read', self.__readCellsJob, cells)
 
-        self.mainCrossbarWidget.setData(data)
+    def readSelectedSlices(self, cells, kind=PlanKind.Bitlines):
+        self.__submit('read', self.__readSlicesJob, cells, kind)
 
-    def pulseReadAll(self, vpulse, pulsewidth, vread):
+    def readAllClicked(self):
         if self._arc is None:
             return
 
-        # if crossbar is masked this is not really a full crossbar operation
-        # so do a sliced operation instead
+        # if crossbar is masked this is not really a full crossbar read
+        # so read the available crosspoints in the cheapest way instead
         if self.mapper.is_masked:
-            self.pulseReadSelectedSlices(self.mainCrossbarWidget.allCells)
-            return
-
-        voltage = self.readOpsWidget.readoutVoltage()
-        self.__initialiseOperation()
-        raw = self._arc().pulseread_all(vpulse, int(pulsewidth*1.0e9), voltage,
-            BiasOrder.Cols)
-        self.__finaliseOperation()
-        data = np.empty(shape=(self._nbits, self._nwords))
-        for (row, channel) in enumerate(sorted(self.mapper.ch2b.keys())):
-            bitline = self.mapper.ch2b[channel]
-            # skip bitlines > than the total number of configured bitlines
-            if bitline >= self._nbits:
-                continue
-            data[bitline] = voltage/np.abs(raw[row][self.mapper.word_idxs])[0:self._nwords]
-
-        self.mainCrossbarWidget.setData(data)
-
-    def readSelectedSlices(self, cells):
-
-        slices = {}
-
-        data = self.mainCrossbarWidget.data
-
-        for c in cells:
-            try:
-                slices[c.b].append(c.w)
-            except KeyError:
-                slices[c.b] = [c.w]
-
-        self.__initialiseOperation()
-        for (k, v) in slices.items():
-            try:
-                (volt, curr, idx) = self.__readSlice(self.mapper.b2ch[k],
-                    np.array([self.mapper.w2ch[x] for x in v], dtype=np.uint64))
-                data[k][idx] = np.abs(volt/curr[idx])
-                for w in idx:
-                    signals.valueUpdate.emit(w, k, curr[w], volt, 0.0,\
-                        volt, OpType.READ)
-                self.__finaliseOperation()
-            except TypeError:
-                # arc not connected
-                return
-
-        self.mainCrossbarWidget.setData(data)
-
-    def __readSlice(self, low, highs):
-        if self._arc is None:
-            return
-
-        voltage = self.readOpsWidget.readoutVoltage()
-        data = self._arc().read_slice_masked(low, highs, voltage)
-        bitline = self.mapper.ch2b[low]
-        # convert channel order to word order
-        currents = data[self.mapper.word_idxs]
-
-        # find the non-nan indices in the current results
-        idx = np.where(~np.isnan(currents))[0]
-        return (voltage, currents, idx)
-
-    def __pulseReadSlice(self, low, highs, vpulse, pulsewidth):
-        if self._arc is None:
-            return
-
-        voltage = self.readOpsWidget.readoutVoltage()
-        data = self._arc().pulseread_slice_masked(low, highs, vpulse,
-            int(pulsewidth*1.0e9), voltage)
-        bitline = self.mapper.ch2b[low]
-        # convert channel order to word order
-        currents = data[self.mapper.word_idxs]
-
-        # find the non-nan indices
-        idx = np.where(~np.isnan(currents))[0]
-        return (vpulse, currents, idx)
-
+            self.__readCells(self.mainCrossbarWidget.allCells, \
+                finished=self.__recordFrame)
+        else:
+            self.__submit('readall', self.__readAllJob, finished=self.__recordFrame)
 
-    def __initialiseOperation(self):
-        if self._arc is None:
-            return
+    def pulseSelectedCell(self, cells, voltage, pulsewidth):
+        self.__submit('pulse', self.__pulseCellsJob, cells, voltage, pulsewidth)
 
-        idleMode = self.arc2ConnectionWidget.idleMode
-        if idleMode == IdleMode.HardGnd:
-            self._arc().connect_to_gnd(np.arange(0, dtype=np.uint64))\
-                       .float_all()\
-                       .execute()
+    def pulseSelectedSlices(self, cells, voltage, pulsewidth, kind=PlanKind.Bitlines, \
+        batched=True):
+        self.__submit('pulse', self.__pulseSlicesJob, cells, voltage, \
+            pulsewidth, kind, batched)
 
-    def __finaliseOperation(self):
-        if self._arc is None:
+    def pulseAll(self, voltage, pulsewidth):
+        # if crossbar is masked this is not really a full crossbar operation
+        # so do a sliced operation instead
+        if self.mapper.is_masked:
+            self.pulseSelectedSlices(self.mainCrossbarWidget.allCells, voltage, \
+                pulsewidth)
             return
 
-        idleMode = self.arc2ConnectionWidget.idleMode
-        self._arc().finalise_operation(idleMode)
+        self.__submit('pulse', self.__pulseAllJob, voltage, pulsewidth)
 
-    def readSelectedCell(self, cells):
-        cell = cells[0]
-        (w, b) = (cell.w, cell.b)
-        (high, low) = self.mapper.wb2ch[w][b]
-        logger.debug("read (word: %2d bit: %2d ←→ low: %2d high: %2d" % (w, b, low, high))
-        if self._arc is not None:
-            self.__initialiseOperation()
-            voltage = self.readOpsWidget.readoutVoltage()
-            current = self._arc().read_one(low, high, voltage)
-            self.__finaliseOperation()
-
-            signals.valueUpdate.emit(w, b, current, voltage, 0.0, \
-                self.readOpsWidget.readoutVoltage(), OpType.READ)
-            signals.dataDisplayUpdate.emit(w, b)
+    def pulseReadSelectedCell(self, cells, vpulse, pulsewidth, vread):
+        self.__submit('pulseread', self.__pulseReadCellsJob, cells, vpulse, \
+            pulsewidth, vread)
 
-    def readAllClicked(self):
-        if self._arc is None:
-            return
+    def pulseReadSelectedSlices(self, cells, vpulse, pulsewidth, vread, \
+        kind=PlanKind.Bitlines, batched=True):
+        self.__submit('pulseread', self.__pulseReadSlicesJob, cells, vpulse, \
+            pulsewidth, vread, kind, batched)
 
-        # if crossbar is masked this is not really a full crossbar read
-        # so do slice read instead
+    def pulseReadAll(self, vpulse, pulsewidth, vread):
+        # if crossbar is masked this is not really a full crossbar operation
+        # so do a sliced operation instead
         if self.mapper.is_masked:
-            self.readSelectedSlices(self.mainCrossbarWidget.allCells)
+            self.pulseReadSelectedSlices(self.mainCrossbarWidget.allCells, \
+                vpulse, pulsewidth, vread)
             return
 
-        voltage = self.readOpsWidget.readoutVoltage()
-        self.__initialiseOperation()
-        raw = self._arc().read_all(voltage, BiasOrder.Cols)
-        self.__finaliseOperation()
-        data = np.empty(shape=(self._nbits, self._nwords))
-        for (_, channel) in enumerate(sorted(self.mapper.ch2b.keys())):
-            bitline = self.mapper.ch2b[channel]
-            # skip bitlines > than the total number of configured bitlines
-            if bitline >= self._nbits:
-                continue
-            idx = (channel % (self.mapper.MAX_BITS//2)) + (channel // self.mapper.MAX_BITS) * (self.mapper.MAX_BITS//2)
-            data[bitline] = raw[idx][self.mapper.word_idxs][0:self._nwords]
+        self.__submit('pulseread', self.__pulseReadAllJob, vpulse, pulsewidth, \
+            vread)
 
-        shape = data.shape
-        actual_voltage = np.repeat([voltage], shape[0]*shape[1]).reshape(*shape)
-        self.crossbarRefresh(data, actual_voltage)
+    def __recordFrame(self):
+        # the datastore has already been updated (or the update has been
+        # queued) so the frame includes the latest read-all
+        if self.rasterHistoryAction.isChecked() and not self._datastore.is_readonly:
+            self._datastore.append_frame()
 
-    def pulseSelectedCell(self, cells, voltage, pulsewidth):
-        if self._arc is None:
-            return
+    # The following run on the crossbar operation thread; they must
+    # only use the operation context and report back through the operation
 
-        cell = cells[0]
-        (w, b) = (cell.w, cell.b)
-        (high, low) = self.mapper.wb2ch[w][b]
+    def __initialiseOperation(self, ctx):
+        if ctx.idleMode == IdleMode.HardGnd:
+            ctx.arc.connect_to_gnd(np.arange(0, dtype=np.uint64))\
+                   .float_all()\
+                   .execute()
 
-        logger.debug("pulse (word: %2d bit: %2d ←→ low: %2d high: %2d)" % (w, b, low, high))
-        logger.debug("pulse (V = %g V; PW = %g ns)" % (voltage, pulsewidth*1.0e9))
+    def __finaliseOperation(self, ctx):
+        ctx.arc.finalise_operation(ctx.idleMode)
+
+    def __sliceChannels(self, mapper, line, others, kind):
+        # low channel, high channels, indices of the crosspoints in the
+        # raw response and polarity of a slice. Wordline slices have the
+        # wordline as the low channel so voltages are inverted to bias
+        # the devices the same way as bitline slices do
+        if kind == PlanKind.Bitlines:
+            return (mapper.b2ch[line], mapper.word_channels[others], \
+                mapper.word_idxs, 1.0)
+        else:
+            return (mapper.w2ch[line], mapper.bit_channels[others], \
+                mapper.bit_idxs, -1.0)
 
-        self.__initialiseOperation()
-        self._arc().pulse_one(low, high, voltage, int(pulsewidth*1.0e9))\
-                   .execute()
-        signals.valueUpdate.emit(w, b, np.NaN, voltage, pulsewidth, \
-            np.NaN, OpType.PULSE)
-        self.__finaliseOperation()
+    def __sliceCells(self, line, idx, kind):
+        # words and bits of the crosspoints ``idx`` along ``line``
+        if kind == PlanKind.Bitlines:
+            return (idx, np.full(len(idx), line))
+        else:
+            return (np.full(len(idx), line), idx)
+
+    def __readCellData(self, ctx, cells, vread, finaliseEach=True):
+        (words, bits, currents) = ([], [], [])
+
+        for cell in cells:
+            (w, b) = (cell.w, cell.b)
+            (high, low) = ctx.mapper.wb2ch[w][b]
+            logger.debug("read (word: %2d bit: %2d ←→ low: %2d high: %2d" % (w, b, low, high))
+            if finaliseEach:
+                self.__initialiseOperation(ctx)
+            currents.append(ctx.arc.read_one(low, high, vread))
+            if finaliseEach:
+                self.__finaliseOperation(ctx)
+            words.append(w)
+            bits.append(b)
+
+        return (words, bits, currents)
+
+    def __readSliceData(self, ctx, cells, kind, vread, finaliseEach=True):
+        (words, bits, currents) = ([], [], [])
+
+        for (line, others) in group_cells(cells, kind).items():
+            (low, highs, rawIdxs, sign) = self.__sliceChannels(ctx.mapper, \
+                line, others, kind)
+            data = ctx.arc.read_slice_masked(low, highs, sign*vread)
+            if finaliseEach:
+                self.__finaliseOperation(ctx)
+            # convert channel order to word (or bit) order
+            sliceCurrents = sign*data[rawIdxs]
+
+            # find the non-nan indices in the current results
+            idx = np.where(~np.isnan(sliceCurrents))[0]
+            (w, b) = self.__sliceCells(line, idx, kind)
+            words.append(w)
+            bits.append(b)
+            currents.append(sliceCurrents[idx])
+
+        return (np.concatenate(words), np.concatenate(bits), \
+            np.concatenate(currents))
+
+    def __readAllData(self, ctx, cells, vread):
+        # read the full array and keep either all crosspoints
+        # or only ``cells``
+        raw = ctx.arc.read_all(vread, BiasOrder.Cols)
+        # convert channel order to crossbar order in one go
+        data = ctx.mapper.to_raster(raw, ctx.nbits, ctx.nwords)
+
+        if cells is None:
+            (bits, words) = np.indices(data.shape)
+            (bits, words) = (bits.ravel(), words.ravel())
+        else:
+            words = np.array([c.w for c in cells], dtype=np.intp)
+            bits = np.array([c.b for c in cells], dtype=np.intp)
 
-    def pulseSelectedSlices(self, cells, voltage, pulsewidth):
-        if self._arc is None:
-            return
+        return (words, bits, data[bits, words])
 
-        slices = {}
+    def __readBack(self, ctx, cells, vread):
+        # read a set of crosspoints in the cheapest way without
+        # finalising in between
+        plan = plan_operation(cells, ctx.mapper, ctx.costs, superset=True)
+        logger.debug("read-back of %d crosspoint(s) → %s" % (len(cells), plan))
 
-        for c in cells:
-            try:
-                slices[c.b].append(c.w)
-            except KeyError:
-                slices[c.b] = [c.w]
-
-        self.__initialiseOperation()
-        for (k, v) in slices.items():
-            low = self.mapper.b2ch[k]
-            highs = np.array([self.mapper.w2ch[x] for x in v], dtype=np.uint64)
+        if plan.kind == PlanKind.All:
+            return self.__readAllData(ctx, cells, vread)
+        elif plan.kind == PlanKind.Cells:
+            return self.__readCellData(ctx, plan.groups, vread, finaliseEach=False)
+        else:
+            return self.__readSliceData(ctx, cells, plan.kind, vread, \
+                finaliseEach=False)
+
+    def __readCellsJob(self, ctx, op, cells):
+        op.record(*self.__readCellData(ctx, cells, ctx.vread), ctx.vread, 0.0, \
+            ctx.vread, OpType.READ)
+
+    def __readSlicesJob(self, ctx, op, cells, kind):
+        self.__initialiseOperation(ctx)
+        op.record(*self.__readSliceData(ctx, cells, kind, ctx.vread), ctx.vread, \
+            0.0, ctx.vread, OpType.READ)
+
+    def __readAllJob(self, ctx, op, cells=None):
+        self.__initialiseOperation(ctx)
+        results = self.__readAllData(ctx, cells, ctx.vread)
+        self.__finaliseOperation(ctx)
+        op.record(*results, ctx.vread, 0.0, ctx.vread, OpType.READ)
+
+    def __pulseCellsJob(self, ctx, op, cells, voltage, pulsewidth):
+        for cell in cells:
+            (w, b) = (cell.w, cell.b)
+            (high, low) = ctx.mapper.wb2ch[w][b]
+
+            logger.debug("pulse (word: %2d bit: %2d ←→ low: %2d high: %2d)" % (w, b, low, high))
+            logger.debug("pulse (V = %g V; PW = %g ns)" % (voltage, pulsewidth*1.0e9))
+
+            self.__initialiseOperation(ctx)
+            ctx.arc.pulse_one(low, high, voltage, int(pulsewidth*1.0e9))\
+                   .execute()
+            self.__finaliseOperation(ctx)
+            op.record([w], [b], [np.nan], voltage, pulsewidth, np.nan, \
+                OpType.PULSE)
+
+    def __queueSlicePulses(self, ctx, cells, voltage, pulsewidth, kind, \
+        executeEach=False):
+        # queue the pulses of all slices; they are only applied on the
+        # next ``execute`` unless ``executeEach`` is set
+        (words, bits) = ([], [])
+
+        for (line, others) in group_cells(cells, kind).items():
+            (low, highs, _, sign) = self.__sliceChannels(ctx.mapper, line, \
+                others, kind)
             logger.info("pulse slice (low: %2d; highs %s)" % (low, highs))
-            self._arc().pulse_slice_masked(low, voltage, int(pulsewidth*1.0e9), highs)\
-                       .ground_all()\
-                       .execute()
-            for w in v:
-                signals.valueUpdate.emit(w, k, np.NaN, voltage, pulsewidth,\
-                    np.NaN, OpType.PULSE)
-            self.__finaliseOperation()
-
-    def pulseAll(self, voltage, pulsewidth):
-        if self._arc is None:
+            ctx.arc.pulse_slice_masked(low, sign*voltage, int(pulsewidth*1.0e9), highs)\
+                   .ground_all()
+            if executeEach:
+                ctx.arc.execute()
+                self.__finaliseOperation(ctx)
+            (w, b) = self.__sliceCells(line, others, kind)
+            words.append(w)
+            bits.append(b)
+
+        return (np.concatenate(words), np.concatenate(bits))
+
+    def __pulseSlicesJob(self, ctx, op, cells, voltage, pulsewidth, kind, batched):
+        self.__initialiseOperation(ctx)
+        (words, bits) = self.__queueSlicePulses(ctx, cells, voltage, \
+            pulsewidth, kind, executeEach=not batched)
+        if batched:
+            # all slices are pulsed by a single program
+            ctx.arc.execute()
+            self.__finaliseOperation(ctx)
+
+        op.record(words, bits, np.full(len(words), np.nan), voltage, \
+            pulsewidth, np.nan, OpType.PULSE)
+
+    def __pulseAllJob(self, ctx, op, voltage, pulsewidth):
+        self.__initialiseOperation(ctx)
+        ctx.arc.pulse_all(voltage, int(pulsewidth*1.0e9), BiasOrder.Cols)\
+               .ground_all()\
+               .execute()
+        self.__finaliseOperation(ctx)
+
+    def __pulseReadCellsJob(self, ctx, op, cells, vpulse, pulsewidth, vread):
+        (words, bits, currents) = ([], [], [])
+
+        for cell in cells:
+            (w, b) = (cell.w, cell.b)
+            (high, low) = ctx.mapper.wb2ch[w][b]
+            logger.debug("pulseread (word: %2d bit: %2d ←→ low: %2d high: %2d)" % (w, b, low, high))
+            logger.debug("pulseread (V = %g, PW = %g ns)" % (vpulse, pulsewidth*1.0e9))
+            self.__initialiseOperation(ctx)
+            currents.append(ctx.arc.pulseread_one(low, high, vpulse, \
+                int(pulsewidth*1.0e9), vread))
+            self.__finaliseOperation(ctx)
+            words.append(w)
+            bits.append(b)
+
+        op.record(words, bits, currents, vpulse, pulsewidth, vread, \
+            OpType.PULSEREAD)
+
+    def __pulseReadSlicesJob(self, ctx, op, cells, vpulse, pulsewidth, vread, \
+        kind, batched):
+        self.__initialiseOperation(ctx)
+
+        if batched:
+            # pulse all slices with a single program and then read all
+            # the pulsed crosspoints back in one pass
+            self.__queueSlicePulses(ctx, cells, vpulse, pulsewidth, kind)
+            ctx.arc.execute()
+            results = self.__readBack(ctx, cells, vread)
+            self.__finaliseOperation(ctx)
+            op.record(*results, vpulse, pulsewidth, vread, OpType.PULSEREAD)
             return
 
-        # if crossbar is masked this is not really a full crossbar operation
-        # so do a sliced operation instead
-        if self.mapper.is_masked:
-            self.pulseSelectedSlices(self.mainCrossbarWidget.allCells)
-            return
+        for (line, others) in group_cells(cells, kind).items():
+            (low, highs, rawIdxs, sign) = self.__sliceChannels(ctx.mapper, \
+                line, others, kind)
+            data = ctx.arc.pulseread_slice_masked(low, highs, sign*vpulse,
+                int(pulsewidth*1.0e9), sign*vread)
+            self.__finaliseOperation(ctx)
+            # convert channel order to word (or bit) order
+            currents = sign*data[rawIdxs]
+
+            # find the non-nan indices
+            idx = np.where(~np.isnan(currents))[0]
+            op.record(*self.__sliceCells(line, idx, kind), currents[idx], \
+                vpulse, pulsewidth, vread, OpType.PULSEREAD)
+
+    def __pulseReadAllJob(self, ctx, op, vpulse, pulsewidth, vread):
+        self.__initialiseOperation(ctx)
+        raw = ctx.arc.pulseread_all(vpulse, int(pulsewidth*1.0e9), vread,
+            BiasOrder.Cols)
+        self.__finaliseOperation(ctx)
+        # convert channel order to crossbar order in one go
+        data = ctx.mapper.to_raster(raw, ctx.nbits, ctx.nwords)
 
-        self.__initialiseOperation()
-        self._arc().pulse_all(voltage, int(pulsewidth*1.0e9), BiasOrder.Cols)\
-                   .ground_all()\
-                   .execute()
-        self.__finaliseOperation()
+        (bits, words) = np.indices(data.shape)
+        op.record(words, bits, data, vpulse, pulsewidth, vread, OpType.PULSEREAD)
 
     def addModuleClicked(self):
         mod = self.moduleListComboBox.currentData()
@@ -818,10 +1093,8 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
     def clearPlots(self):
         dispType = self.plottingOptionsWidget.displayType
 
-        self.tracePlot.plot([0],[0])
-        self.tracePlot.clear()
-        self.pulsePlot.plot([0],[0])
-        self.pulsePlot.clear()
+        self.__resetPlotBuffers()
+        self.__redrawPlotItems()
         self.tracePlot.getAxis('left').setLabel(**dispType.plotLabel())
 
     def changePlotScale(self, scale):
@@ -834,76 +1107,279 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         cells = self.mainCrossbarWidget.selectedCells
         if len(cells) == 1:
             (w, b) = cells[0]
-            self.updateSinglePlot(w, b)
+            self.updateSinglePlot(w, b, reload=True)
         else:
             self.clearPlots()
 
     def valueUpdate(self, w, b, curr, volt, pw, vread, optype):
         self._datastore.update_status(w, b, curr, volt, pw, vread, optype)
-        self.mainCrossbarWidget.updateData(w, b, np.abs(vread/curr))
+        if self.__heatmapMetric[1] is None:
+            self.mainCrossbarWidget.updateData(w, b, np.abs(vread/curr))
+        else:
+            self.__scheduleHeatmapRefresh()
         self.selectionChanged(self.mainCrossbarWidget.selection)
 
     def valueUpdateBulk(self, w, b, curr, volt, pw, vread, optype):
         self._datastore.update_status_bulk(w, b, curr, volt, pw, vread, optype)
-        self.mainCrossbarWidget.updateData(w, b, np.abs(vread[-1]/curr[-1]))
+        if self.__heatmapMetric[1] is None:
+            self.mainCrossbarWidget.updateData(w, b, np.abs(vread[-1]/curr[-1]))
+        else:
+            self.__scheduleHeatmapRefresh()
+        self.selectionChanged(self.mainCrossbarWidget.selection)
+
+    def valueUpdateMany(self, words, bits, curr, volt, pw, vread, optype):
+        self._datastore.update_status_many(words, bits, curr, volt, pw, vread, optype)
+        if self.__heatmapMetric[1] is None:
+            data = self.mainCrossbarWidget.data
+            data[bits, words] = np.abs(vread/curr)
+            self.mainCrossbarWidget.setData(data)
+        else:
+            self.__scheduleHeatmapRefresh()
+        self.selectionChanged(self.mainCrossbarWidget.selection)
+
+    @property
+    def __heatmapMetric(self):
+        return _HEATMAP_METRICS[max(self.heatmapMetricComboBox.currentIndex(), 0)]
+
+    def __heatmapMetricChanged(self, idx):
+        self._heatmapTimer.stop()
+        self.__refreshHeatmap()
         self.selectionChanged(self.mainCrossbarWidget.selection)
 
-    def updateSinglePlot(self, w, b):
+    def __scheduleHeatmapRefresh(self):
+        if not self._heatmapTimer.isActive():
+            self._heatmapTimer.start()
+
+    def __refreshHeatmap(self):
+        # redraw the crossbar with the selected quantity; statistics are
+        # kept in memory by the datastore so this does not involve any
+        # timeseries reads
+        (_, metric, _, scale) = self.__heatmapMetric
+        mask = self.mapper.mask
+
+        if metric is None:
+            # pending values might not be in the raster yet
+            self._datastore.flush()
+            (voltage, current) = (self._datastore.voltage, self._datastore.current)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                data = np.where(mask, np.abs(voltage/current), np.nan)
+        else:
+            data = np.where(mask, self._datastore.stats_array(metric), np.nan)
+
+        if scale is None:
+            limits = None
+        else:
+            values = data[np.isfinite(data)]
+            if scale == 'log':
+                values = values[values > 0]
+            if len(values) == 0:
+                limits = (0.0, 1.0, False)
+            else:
+                limits = (np.min(values), np.max(values), scale == 'log')
+
+        if self.mainCrossbarWidget.scale != limits:
+            if limits is None:
+                self.mainCrossbarWidget.setScale()
+            else:
+                self.mainCrossbarWidget.setScale(*limits)
+        self.mainCrossbarWidget.setData(data)
+
+    def updateSinglePlot(self, w, b, reload=False):
+        """
+        Plot the timeseries of crosspoint ``(w, b)``. If the same crosspoint
+        is already displayed with the same display type and range only the
+        rows added since the last call are read from the datastore and
+        appended to the existing plot items. Otherwise, or if ``reload`` is
+        ``True``, the plot is rebuilt from scratch.
+
+        :param int w: The word coordinate of the crosspoint
+        :param int b: The bit coordinate of the crosspoint
+        :param bool reload: Force a full reload of the plotted data
+        """
 
         xRange = self.plottingOptionsWidget.xRange
         dispType = self.plottingOptionsWidget.displayType
 
+        if dispType not in _PLOT_SYMBOLS:
+            # unknown plot type, nothing to show
+            return
+
         try:
-            full_timeseries = self._datastore.timeseries(w, b)
-            len_timeseries = full_timeseries.shape[0]
+            len_timeseries = self._datastore.timeseries_length(w, b)
         except KeyError: # no dataset exists
             self.clearPlots()
             return
 
+        key = (w, b, dispType, xRange)
+
         if xRange is None:
-            timeseries = full_timeseries
-            offset = 0
+            count = len_timeseries
         else:
-            timeseries = full_timeseries[-xRange:]
-            offset = max(len_timeseries - xRange, 0)
+            count = min(len_timeseries, xRange)
+
+        if count > _PLOT_ENVELOPE_ROWS:
+            self.__plotEnvelope(key, len_timeseries, reload)
+            return
+        elif self._envelopeQuery is not None:
+            # was showing an envelope; replot the actual points
+            reload = True
+
+        if reload or key != self._plotKey or len_timeseries < self._plotRows:
+            # different crosspoint, display type or range (or the data
+            # underneath changed); start over
+            self.__resetPlotBuffers()
+            self._plotKey = key
+
+            if xRange is None:
+                offset = 0
+            else:
+                offset = max(len_timeseries - xRange, 0)
+            self._plotRows = offset
+
+            self.traceCurve.setSymbol(_PLOT_SYMBOLS[dispType])
+            self.tracePlot.getAxis('left').setLabel(**dispType.plotLabel())
+        elif len_timeseries == self._plotRows:
+            # nothing new to plot
+            return
+
+        self.__appendPlotRows(w, b, dispType, len_timeseries)
+
+        if xRange is not None:
+            self.__trimPlotBuffers(len_timeseries - xRange)
+
+        self.__redrawPlotItems()
+
+    def __plotEnvelope(self, key, length, reload=False):
+        (w, b, dispType, xRange) = key
+        viewBox = self.tracePlot.getViewBox()
+
+        if reload or key != self._plotKey or self._envelopeQuery is None:
+            self.__resetPlotBuffers()
+            self._plotKey = key
+            self.tracePlot.getAxis('left').setLabel(**dispType.plotLabel())
+            viewBox.enableAutoRange(x=True)
 
-        idxes = np.arange(offset, len_timeseries)
+        start = 0 if xRange is None else max(length - xRange, 0)
+        stop = length
+
+        if not viewBox.autoRangeEnabled()[0]:
+            # zoomed in; only read the visible part
+            (x0, x1) = viewBox.viewRange()[0]
+            start = min(max(start, int(np.floor(x0))), stop)
+            stop = max(min(stop, int(np.ceil(x1)) + 1), start)
+
+        width = max(int(viewBox.width()), 100)
+        query = (key, start, stop, width)
+        if query == self._envelopeQuery:
+            return
+        self._envelopeQuery = query
+
+        (factor, envelope) = self._datastore.timeseries_envelope(w, b, \
+            start=start, stop=stop, width=width)
 
         if dispType == PlotDisplayType.Resistance:
-            self.tracePlot.plot(idxes, np.abs(timeseries['read_voltage']/timeseries['current']),\
-                pen={'color': '#F00', 'width': 1}, symbol='+', symbolPen=None, \
-                symbolSize=6, symbolBrush='#F00',\
-                clear=True)
+            (low, high) = (envelope['resistance_min'], envelope['resistance_max'])
         elif dispType == PlotDisplayType.Conductance:
-            self.tracePlot.plot(idxes, np.abs(timeseries['current']/timeseries['read_voltage']),\
-                pen={'color': '#F00', 'width': 1}, symbol='x', symbolPen=None, \
-                symbolSize=6, symbolBrush='#F00',\
-                clear=True)
+            with np.errstate(divide='ignore'):
+                (low, high) = (1.0/envelope['resistance_max'], \
+                    1.0/envelope['resistance_min'])
         elif dispType == PlotDisplayType.Current:
-            self.tracePlot.plot(idxes, timeseries['current'], \
-                pen={'color': '#F00', 'width': 1}, symbol='t', symbolPen=None, \
-                symbolSize=6, symbolBrush='#F00',\
-                clear=True)
-        elif dispType == PlotDisplayType.AbsCurrent:
-            self.tracePlot.plot(idxes, np.abs(timeseries['current']), \
-                pen={'color': '#F00', 'width': 1}, symbol='t1', symbolPen=None, \
-                symbolSize=6, symbolBrush='#F00',\
-                clear=True)
-        else:
-            # unknown plot type, nothing to show
+            (low, high) = (envelope['current_min'], envelope['current_max'])
+        else: # PlotDisplayType.AbsCurrent
+            (low, high) = (envelope['abs_current_min'], envelope['abs_current_max'])
+
+        index = envelope['index']
+
+        def _points(low, high, keep=None):
+            # a single point per raw row or a min/max pair per entry
+            if keep is not None:
+                (x, low, high) = (index[keep], low[keep], high[keep])
+            else:
+                x = index
+            if factor == 1:
+                return (x, high)
+            y = np.empty(2*len(x), dtype=high.dtype)
+            y[0::2] = low
+            y[1::2] = high
+            return (np.repeat(x, 2), y)
+
+        # individual symbols are meaningless for an envelope
+        self.traceCurve.setSymbol(_PLOT_SYMBOLS[dispType] if factor == 1 else None)
+        (self._traceX, self._traceY) = _points(low, high)
+        (self._pulseX, self._pulseY) = _points(envelope['vpulse_min'], \
+            envelope['vpulse_max'], ~np.isnan(envelope['vpulse_max']))
+        (self._readX, self._readY) = _points(envelope['vread_min'], \
+            envelope['vread_max'], ~np.isnan(envelope['vread_max']))
+        self._plotRows = length
+
+        self.__redrawPlotItems()
+
+    def __envelopeRangeChanged(self):
+        if self._envelopeQuery is None or self._plotKey is None:
             return
+        (w, b) = self._plotKey[:2]
+        self.updateSinglePlot(w, b)
+
+    def __resetPlotBuffers(self):
+        self._envelopeQuery = None
+        self._plotKey = None
+        self._plotRows = 0
+        self._traceX = np.empty(0, dtype=np.int64)
+        self._traceY = np.empty(0, dtype=np.float32)
+        self._pulseX = np.empty(0, dtype=np.int64)
+        self._pulseY = np.empty(0, dtype=np.float32)
+        self._readX = np.empty(0, dtype=np.int64)
+        self._readY = np.empty(0, dtype=np.float32)
+
+    def __appendPlotRows(self, w, b, dispType, stop):
+        start = self._plotRows
+
+        # only read the rows and columns that will actually be plotted
+        timeseries = self._datastore.timeseries(w, b, start=start, \
+            stop=stop, fields=_PLOT_FIELDS)
 
-        self.tracePlot.getAxis('left').setLabel(**dispType.plotLabel())
+        if dispType == PlotDisplayType.Resistance:
+            values = np.abs(timeseries['read_voltage']/timeseries['current'])
+        elif dispType == PlotDisplayType.Conductance:
+            values = np.abs(timeseries['current']/timeseries['read_voltage'])
+        elif dispType == PlotDisplayType.Current:
+            values = timeseries['current']
+        else: # PlotDisplayType.AbsCurrent
+            values = np.abs(timeseries['current'])
 
         # find points with pulse operations
         idxp = np.where((timeseries['op_type'] & OpType.PULSE) == OpType.PULSE)[0]
         # find points with read operations
         idxr = np.where((timeseries['op_type'] & OpType.READ) == OpType.READ)[0]
 
-        # plot the pulse points
-        self.pulsePlot.plot(offset+idxp, timeseries['voltage'][idxp], pen=None,\
-            symbolPen=None, symbolBrush=(0, 150, 150),  symbol='s',\
-            symbolSize=6, clear=True )
+        self._traceX = np.concatenate((self._traceX, np.arange(start, stop)))
+        self._traceY = np.concatenate((self._traceY, values))
+        self._pulseX = np.concatenate((self._pulseX, start+idxp))
+        self._pulseY = np.concatenate((self._pulseY, timeseries['voltage'][idxp]))
+        self._readX = np.concatenate((self._readX, start+idxr))
+        self._readY = np.concatenate((self._readY, timeseries['read_voltage'][idxr]))
+
+        self._plotRows = stop
+
+    def __trimPlotBuffers(self, first):
+        # drop everything before index `first`; all buffers are sorted
+        # by index so the cut-off point can be found with a bisection
+        if first <= 0:
+            return
+
+        cut = np.searchsorted(self._traceX, first)
+        self._traceX = self._traceX[cut:]
+        self._traceY = self._traceY[cut:]
+        cut = np.searchsorted(self._pulseX, first)
+        self._pulseX = self._pulseX[cut:]
+        self._pulseY = self._pulseY[cut:]
+        cut = np.searchsorted(self._readX, first)
+        self._readX = self._readX[cut:]
+        self._readY = self._readY[cut:]
+
+    def __redrawPlotItems(self):
+        self.traceCurve.setData(self._traceX, self._traceY)
+        self.pulsePoints.setData(self._pulseX, self._pulseY)
 
         # this ugly hack is required because pyqtgraph has no way to plot a dataset
         # with impulses. The only way remotely resembling this setup is by using
@@ -938,31 +1414,23 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         # | |  |
         # | |  | |
         # o----------->
+        impulses = np.zeros(2*len(self._pulseY), dtype=self._pulseY.dtype)
+        impulses[1::2] = self._pulseY
+        self.pulseImpulses.setData(np.repeat(self._pulseX, 2), impulses)
 
-        # plot the impulse lines
-        self.pulsePlot.plot(offset+np.repeat(idxp, 2), \
-            np.dstack((\
-                np.zeros(len(timeseries['voltage'][idxp])), timeseries['voltage'][idxp])
-            ).flatten(), \
-            pen=(0, 150, 150),\
-            connect='pairs')
-
-        # plot the read points
-        self.pulsePlot.plot(offset+idxr, timeseries['read_voltage'][idxr], pen=None,\
-            symbolPen=None, symbolBrush=(0, 0, 255),  symbol='+',\
-            symbolSize=6)
+        self.readPoints.setData(self._readX, self._readY)
 
     def crossbarRefresh(self, current, voltage):
-        vdset = self._datastore.dataset('crossbar/voltage')
-        cdset = self._datastore.dataset('crossbar/current')
-        cdset[:] = current
-        vdset[:] = voltage
-        mapper = self.mapper
+        # this also drops any pending single values so that they don't
+        # overwrite the new raster when flushed
+        self._datastore.set_raster(current, voltage)
 
-        data = np.where(mapper.mask, np.abs(vdset[:]/cdset[:]), np.nan)
-        self.mainCrossbarWidget.setData(data)
+        self.__refreshHeatmap()
 
     def newDataset(self):
+        # results of operations in progress belong to the current dataset
+        self.waitForCrossbarOperations()
+
         if self._datastore is not None:
             # save existing data
             self._datastore.close()
@@ -980,16 +1448,16 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
                         # if cancel is pressed, reopen the previous
                         # dataset and exit
                         fname = self._datastore.fname
-                        self._datastore = H5DataStore(fname, mode=H5Mode.APPEND)
+                        self._datastore = self.__openDatastore(fname, mode=H5Mode.APPEND)
                         self._datastore.__setattr__('is_temporary', True)
                         return
                 else:
                     os.remove(self._datastore.fname)
 
         # create a new temp dataset
-        self._datastore = H5DataStore(tempfile.NamedTemporaryFile(\
+        self._datastore = self.__openDatastore(tempfile.NamedTemporaryFile(\
             suffix='.h5', delete=False).name,\
-            mode=H5Mode.WRITE)
+            mode=H5Mode.WRITE, profile=self._profile)
         self._datastore.__setattr__('is_temporary', True)
         self.saveDatasetAction.setEnabled(True)
         self.saveDatasetAction.setToolTip('Save')
@@ -999,6 +1467,7 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         self.deviceExplorerWidget.loadFromStore(self._datastore)
 
     def openDataset(self, *args, fnameToOpen=None, forceRO=False):
+        self.waitForCrossbarOperations()
         remove_old_temp_dataset = False
 
         if self._datastore is not None and self._datastore.is_temporary:
@@ -1034,12 +1503,12 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
                 # check if read-only is forced, otherwise try to
                 # open the file normally (normal operation)
                 mode = H5Mode.READ if forceRO else H5Mode.APPEND
-                self._datastore = H5DataStore(fname[0], mode=mode)
+                self._datastore = self.__openDatastore(fname[0], mode=mode)
                 self._datastore.__setattr__('is_readonly', forceRO)
             except PermissionError:
                 # if, for some reason, no write permission exists always
                 # open the dataset as read-only
-                self._datastore = H5DataStore(fname[0], mode=H5Mode.READ)
+                self._datastore = self.__openDatastore(fname[0], mode=H5Mode.READ)
                 self._datastore.__setattr__('is_readonly', True)
             self._datastore.__setattr__('is_temporary', False)
             self.saveDatasetAction.setEnabled(False)
@@ -1056,6 +1525,7 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         self.reloadFromDataset()
 
     def saveDataset(self):
+        self.waitForCrossbarOperations()
         fname = QtWidgets.QFileDialog.getSaveFileName(self, "Save dataset as",\
             '', constants.H5_FILE_FILTER)
         if fname is not None and len(fname[0]) > 0:
@@ -1065,7 +1535,7 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
             self._datastore.close()
             shutil.move(self._datastore.fname, fname[0])
             self._datastore = None
-            self._datastore = H5DataStore(fname[0], mode=H5Mode.APPEND)
+            self._datastore = self.__openDatastore(fname[0], mode=H5Mode.APPEND)
             self._datastore.__setattr__('is_temporary', False)
             self._datastore.__setattr__('is_readonly', False)
             self.saveDatasetAction.setEnabled(False)
@@ -1077,6 +1547,7 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
             self.__addToRecentDatasets(fname[0], w, b)
 
     def saveDatasetAs(self):
+        self.waitForCrossbarOperations()
         fname = QtWidgets.QFileDialog.getSaveFileName(self, "Save dataset as",\
             '', constants.H5_FILE_FILTER)
         if fname is not None and len(fname[0]) > 0:
@@ -1088,7 +1559,7 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
 
             self._datastore = None
 
-            self._datastore = H5DataStore(fname[0], mode=H5Mode.APPEND)
+            self._datastore = self.__openDatastore(fname[0], mode=H5Mode.APPEND)
             self._datastore.__setattr__('is_temporary', False)
             self._datastore.__setattr__('is_readonly', False)
             self.saveDatasetAction.setEnabled(False)
@@ -1098,14 +1569,34 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
             (w, b) = self._datastore.shape
             self.__addToRecentDatasets(fname[0], w, b)
 
+    def exportDataset(self):
+        title = 'Export all crosspoints'
+        labels = {'csv': 'Comma separated files (csv)', \
+            'tsv': 'Tab separated files (tsv)', \
+            'npz': 'Single numpy archive (npz)', \
+            'arrow': 'Arrow IPC files (arrow)'}
+        (label, ok) = QtWidgets.QInputDialog.getItem(self, title, 'Format', \
+            [labels[f] for f in BULK_FORMATS], 0, False)
+        if not ok:
+            return
+        fmt = BULK_FORMATS[[labels[f] for f in BULK_FORMATS].index(label)]
+
+        if fmt == 'npz':
+            (target, _) = QtWidgets.QFileDialog.getSaveFileName(self, title, \
+                '', 'Numpy archives (*.npz)')
+        else:
+            target = QtWidgets.QFileDialog.getExistingDirectory(self, title)
+
+        if target is None or len(target) == 0:
+            return
+
+        # make sure everything is on disk before the workers read the file
+        self._datastore.sync()
+        bulkExportWithProgress(self, title, self._datastore.fname, target, fmt)
+
     def reloadFromDataset(self):
         self.refreshCurrentPlot()
-        vdset = self._datastore.dataset('crossbar/voltage')
-        cdset = self._datastore.dataset('crossbar/current')
-        mapper = self.mapper
-
-        data = np.where(mapper.mask, np.abs(vdset[:]/cdset[:]), np.nan)
-        self.mainCrossbarWidget.setData(data)
+        self.__refreshHeatmap()
         signals.datastoreReplaced.emit(weakref.ref(self._datastore))
         self.setWindowTitle('%s [%s]' % \
             (constants.APP_TITLE, os.path.basename(self._datastore.fname)))
@@ -1140,11 +1631,11 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
 
     def __exportTimeSeries(self, w, b, complete):
 
+        length = self._datastore.timeseries_length(w, b)
+
         if complete:
-            ts = self._datastore.timeseries(w, b)[0:]
+            (fromIdx, toIdx) = (0, length)
         else:
-            ts = self._datastore.timeseries(w, b)
-
             # ask for a range
             dialog = QtWidgets.QDialog(self)
             dialog.setWindowTitle('Export data range')
@@ -1153,22 +1644,22 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
 
             layout.addWidget(QtWidgets.QLabel('From'), 0, 0)
             fromSpinBox = QtWidgets.QSpinBox(dialog)
-            fromSpinBox.setMaximum(ts.shape[0])
+            fromSpinBox.setMaximum(length)
             fromSpinBox.setMinimum(0)
             layout.addWidget(fromSpinBox, 0, 1)
 
             layout.addWidget(QtWidgets.QLabel('To'), 0, 2)
             toSpinBox = QtWidgets.QSpinBox(dialog)
-            toSpinBox.setMaximum(ts.shape[0])
+            toSpinBox.setMaximum(length)
             toSpinBox.setMinimum(0)
-            toSpinBox.setValue(ts.shape[0])
+            toSpinBox.setValue(length)
             layout.addWidget(toSpinBox, 0, 3)
 
             minButton = QtWidgets.QPushButton('Min', dialog)
             minButton.clicked.connect(lambda: fromSpinBox.setValue(0))
 
             maxButton = QtWidgets.QPushButton('Max', dialog)
-            maxButton.clicked.connect(lambda: toSpinBox.setValue(ts.shape[0]))
+            maxButton.clicked.connect(lambda: toSpinBox.setValue(length))
 
             layout.addWidget(minButton, 1, 1)
             layout.addWidget(maxButton, 1, 3)
@@ -1194,7 +1685,6 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
                         'Export timeseries', \
                         'Export range invalid (from > to)')
                     return
-                ts = ts[fromIdx:toIdx]
             else:
                 return
 
@@ -1211,11 +1701,18 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         else:
             raise ValueError('Invalid export file type')
 
-        # ts is defined here
-        np.savetxt(fname, ts, delimiter=delimiter)
+        # only read the requested range from the datastore, a
+        # block of rows at a time
+        store = self._datastore
+        source = lambda start, stop: store.timeseries(w, b, \
+            start=fromIdx+start, stop=fromIdx+stop)
+        exportWithProgress(self, 'Export timeseries', source, fname, \
+            nrows=toIdx-fromIdx, delimiter=delimiter)
 
     def __mapperChanged(self, mapper):
         self.mainCrossbarWidget.setMask(mapper.mask)
+        if self.__heatmapMetric[1] is not None:
+            self.__refreshHeatmap()
 
     def quit(self):
 
@@ -1258,6 +1755,9 @@ class App(GeneratedElements.Ui_ArC2MainWindow, QtWidgets.QMainWindow):
         return False
 
     def closeEvent(self, evt):
+        # let any instrument operations in progress complete before
+        # the dataset is closed
+        self.waitForCrossbarOperations()
         # ensure that the dataset is saved unless the user
         # opted not to
         if self.quit():
@@ -8,6 +8,7 @@ from .. import constants
 from ..arc2config import ArC2Config
 from ..fwutils import discoverFirmwares
 from ..mapper import ChannelMapper
+from ..simulator import SimulatedInstrument
 
 from enum import Enum
 
@@ -16,6 +17,8 @@ from pyarc2 import Instrument, BiasOrder, ControlMode, ReadAt, \
 
 _CONNECTED_LABEL_STYLE = "QLabel { color: white; background-color: green; font-weight: bold }"
 _DISCONNECTED_LABEL_STYLE = "QLabel { color: white; background-color: #D11A1A; font-weight: bold }"
+# address of the simulated instrument in the list of tools
+_SIMULATED_EFM_ID = -1
 
 
 class ArC2ConnectionWidget(GeneratedElements.Ui_ArC2ConnectionWidget, QtWidgets.QWidget):
@@ -48,6 +51,10 @@ class ArC2ConnectionWidget(GeneratedElements.Ui_ArC2ConnectionWidget, QtWidgets.
         self.efmIDsComboBox.clear()
         for i in find_ids():
             self.efmIDsComboBox.addItem('%2d' % i, i)
+        # the simulator is always available, after any real tools
+        self.efmIDsComboBox.addItem('Sim', _SIMULATED_EFM_ID)
+        self.efmIDsComboBox.setItemData(self.efmIDsComboBox.count() - 1, \
+            'Simulated ArC2', QtCore.Qt.ItemDataRole.ToolTipRole)
 
     def refreshFirmwares(self):
         self.firmwareComboBox.clear()
@@ -141,10 +148,15 @@ class ArC2ConnectionWidget(GeneratedElements.Ui_ArC2ConnectionWidget, QtWidgets.
 
     def __arc2Connect(self):
 
-        if self.efmIDsComboBox.count() == 0:
-            QtWidgets.QMessageBox.critical(self, \
-                'Connect ArC2', \
-                'No tools found. Connect an ArC TWO and click the refresh button')
+        if self._arc is not None:
+            self.__setDisconnected()
+            return
+
+        efmid = self.efmIDsComboBox.currentData()
+
+        if efmid == _SIMULATED_EFM_ID:
+            self.connectInstrument(SimulatedInstrument())
+            return
 
         if self.firmwareComboBox.count() == 0:
             resp = QtWidgets.QMessageBox.question(self, \
@@ -155,37 +167,50 @@ class ArC2ConnectionWidget(GeneratedElements.Ui_ArC2ConnectionWidget, QtWidgets.
                 self.firmwareRequest.emit()
             return
 
+        fw = self.firmwareComboBox.currentData()
+        if not os.path.exists(fw):
+            QtWidgets.QMessageBox.critical(self, \
+                'Connect ArC2', \
+                'Firmware file %s does not exist' % os.path.basename(fw))
+            return
+        try:
+            arc = Instrument(efmid, fw)
+        except:
+            return
+        self.connectInstrument(arc)
+
+    def connectInstrument(self, arc):
+        """
+        Connect an already opened instrument, either a :class:`pyarc2.Instrument`
+        or a :class:`~arc2control.simulator.SimulatedInstrument`. Any
+        currently connected instrument is disconnected first.
+
+        :param arc: The instrument to use
+        """
         if self._arc is not None:
-            self.connectionArC2StatusLabel.setText("Disconnected")
-            self.connectionArC2StatusLabel.setStyleSheet(_DISCONNECTED_LABEL_STYLE)
-            del self._arc
-            self._arc = None
-            self.connectArC2Button.setText("Connect ArC2")
-            self.connectionChanged.emit(False)
-            self.firmwareComboBox.setEnabled(True)
-            self.efmIDsComboBox.setEnabled(True)
-            self.refreshIDsButton.setEnabled(True)
-        else:
-            fw = self.firmwareComboBox.currentData()
-            efmid = self.efmIDsComboBox.currentData()
-            if not os.path.exists(fw):
-                QtWidgets.QMessageBox.critical(self, \
-                    'Connect ArC2', \
-                    'Firmware file %s does not exist' % os.path.basename(fw))
-                return
-            try:
-                self._arc = Instrument(efmid, fw)
-            except:
-                return
-            self.connectionArC2StatusLabel.setText("Connected")
-            self.connectionArC2StatusLabel.setStyleSheet(_CONNECTED_LABEL_STYLE)
-            self.connectArC2Button.setText("Disconnect ArC2")
-            self.connectionChanged.emit(True)
-            self.__idleModeChanged()
-            self.__ioconfigChanged(self.ioconfigComboBox.currentIndex())
-            self.efmIDsComboBox.setEnabled(False)
-            self.firmwareComboBox.setEnabled(False)
-            self.refreshIDsButton.setEnabled(False)
+            self.__setDisconnected()
+
+        self._arc = arc
+        self.connectionArC2StatusLabel.setText("Connected")
+        self.connectionArC2StatusLabel.setStyleSheet(_CONNECTED_LABEL_STYLE)
+        self.connectArC2Button.setText("Disconnect ArC2")
+        self.connectionChanged.emit(True)
+        self.__idleModeChanged()
+        self.__ioconfigChanged(self.ioconfigComboBox.currentIndex())
+        self.efmIDsComboBox.setEnabled(False)
+        self.firmwareComboBox.setEnabled(False)
+        self.refreshIDsButton.setEnabled(False)
+
+    def __setDisconnected(self):
+        self.connectionArC2StatusLabel.setText("Disconnected")
+        self.connectionArC2StatusLabel.setStyleSheet(_DISCONNECTED_LABEL_STYLE)
+        del self._arc
+        self._arc = None
+        self.connectArC2Button.setText("Connect ArC2")
+        self.connectionChanged.emit(False)
+        self.firmwareComboBox.setEnabled(True)
+        self.efmIDsComboBox.setEnabled(True)
+        self.refreshIDsButton.setEnabled(True)
 
     def disconnectArC2(self):
         if self._arc is not None:
@@ -0,0 +1,71 @@
+from collections import namedtuple
+import numpy as np
+from PyQt6 import QtCore
+
+
+class OperationContext(namedtuple('OperationContext', \
+    ['arc', 'mapper', 'idleMode', 'vread', 'nbits', 'nwords', 'costs'])):
+    """
+    Everything an instrument job needs, captured on the GUI thread when
+    the job is started: the instrument, the active channel mapper, the
+    idle mode, the read-out voltage, the size of the crossbar and the
+    :class:`~arc2control.planner.CostModel` for planning read-outs.
+    """
+
+    __slots__ = ()
+
+
+class CrossbarOperation(QtCore.QThread):
+    """
+    Run a read or pulse job of the main crossbar on a background thread.
+    ``job`` is called with the operation as its only argument; it talks to
+    the instrument and records its results with
+    :meth:`~arc2control.widgets.crossbar_operation.CrossbarOperation.record`.
+    All results are emitted together with ``resultsReady`` when the job is
+    done, as a tuple of arrays in the same order as the arguments of
+    :data:`~arc2control.signals.valueMultiUpdate`. ``operationFinished``
+    is emitted last with an empty string on success and an error message
+    otherwise; results recorded before an error are still emitted.
+    """
+
+    resultsReady = QtCore.pyqtSignal(object)
+    operationFinished = QtCore.pyqtSignal(str)
+
+    def __init__(self, key, job, parent=None):
+        super().__init__(parent=parent)
+        self.key = key
+        self.job = job
+        self._results = []
+
+    def record(self, words, bits, currents, vpulse, pulsewidth, vread, optype):
+        """
+        Record the results of a part of the job. ``words``, ``bits`` and
+        ``currents`` are arrays of the same length; the rest are scalars
+        broadcasted over all crosspoints.
+        """
+        words = np.asarray(words, dtype=np.intp).ravel()
+        size = len(words)
+        if size == 0:
+            return
+
+        self._results.append((words, \
+            np.asarray(bits, dtype=np.intp).ravel(), \
+            np.asarray(currents).ravel(), \
+            np.full(size, vpulse), np.full(size, pulsewidth), \
+            np.full(size, vread), np.full(size, optype, dtype=np.uint32)))
+
+    def run(self):
+        self._results = []
+
+        try:
+            self.job(self)
+            msg = ''
+        except Exception as exc:
+            msg = str(exc) or type(exc).__name__
+
+        if len(self._results) > 0:
+            self.resultsReady.emit(tuple(np.concatenate(col) \
+                for col in zip(*self._results)))
+            self._results = []
+
+        self.operationFinished.emit(msg)
@@ -1,5 +1,6 @@
 import copy
 import sys
+import time
 import numpy as np
 import itertools
 import math
@@ -52,6 +53,50 @@ for i in range(256):
     GRAD.insert(0, color)
 
 
+# ARGB lookup table used to colour the crossbar raster; the first 256
+# entries are the gradient, followed by white (unreadable values) and
+# transparent (masked out crosspoints)
+_WHITE_IDX = len(GRAD)
+_TRANSPARENT_IDX = len(GRAD) + 1
+_COLOURLUT = np.array([c.rgba() for c in GRAD] + \
+    [QtGui.QColor(QtCore.Qt.GlobalColor.white).rgba(), 0], dtype=np.uint32)
+
+
+def _colourIndices(data, mask=None, scale=None):
+    """
+    Convert an array of values into indices of ``_COLOURLUT`` in a single
+    pass. By default values are resistances mapped logarithmically between
+    ``MIN_RES`` and ``MAX_RES``; a different range can be selected with
+    ``scale``, a tuple of ``(low, high, log)``. Anything outside the range is
+    coloured with the last gradient entry, NaNs and very large values are
+    white and masked out crosspoints are transparent.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    (low, high, log) = (MIN_RES, MAX_RES, True) if scale is None else scale
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if log:
+            (scaled, low, high) = (np.log10(data), np.log10(low), np.log10(high))
+        else:
+            scaled = data
+        norm = (high - low) if high > low else 1.0
+        scaled = (scaled - low)*255/norm
+
+    idx = np.full(data.shape, len(GRAD)-1, dtype=np.intp)
+    # casting truncates towards zero, so anything above -1 ends up at 0
+    inrange = np.isfinite(scaled) & (scaled > -1.0) & (scaled < len(GRAD))
+    idx[inrange] = scaled[inrange].astype(np.intp)
+
+    # the ceiling applies to the values themselves, not their logarithm
+    with np.errstate(invalid='ignore'):
+        idx[~(data < np.iinfo(np.int32).max)] = _WHITE_IDX
+
+    if mask is not None:
+        idx[np.asarray(mask) == 0] = _TRANSPARENT_IDX
+
+    return idx
+
+
 Cell = namedtuple('Cell', ['w', 'b'])
 
 
@@ -67,13 +112,15 @@ def _clip(value, low, high, inclusive=False):
 
 class CachedBackground:
 
-    def __init__(self, data, bits, words, mask):
+    def __init__(self, data, bits, words, mask, scale=None):
         self._data = data
         self._bits = bits
         self._words = words
+        self._scale = scale
         self._cbpad = min(CBPADX(self._words), CBPADY(self._bits))
         self._dd = min(DX(self._words), DY(self._bits))
         self._mask = mask
+        self._gridPath = self.makeGridPath()
         self._pixmap = self.makePixmap()
 
     @property
@@ -88,6 +135,19 @@ class CachedBackground:
     def pixmap(self):
         return self._pixmap
 
+    def makeGridPath(self):
+        DD = self._dd
+
+        # outline of every unmasked cell, stroked in one go
+        path = QtGui.QPainterPath()
+        for row in range(self._bits):
+            for col in range(self._words):
+                if self._mask is not None and self._mask[row][col] == 0:
+                    continue
+                path.addRect(QtCore.QRectF(col*DD, row*DD, DD, DD))
+
+        return path
+
     def makePixmap(self):
         CBPAD = self._cbpad
         DD = self._dd
@@ -96,29 +156,15 @@ class CachedBackground:
         pxm.fill(QtCore.Qt.GlobalColor.transparent)
         painter = QtGui.QPainter(pxm)
         painter.translate(QtCore.QPoint(CBPAD, CBPAD))
+
+        # one pixel per cell, scaled up to the cell size when drawn
+        argb = np.ascontiguousarray(_COLOURLUT[_colourIndices(self._data, self._mask, self._scale)])
+        img = QtGui.QImage(argb.data, self._words, self._bits, 4*self._words, \
+            QtGui.QImage.Format.Format_ARGB32)
+        painter.drawImage(QtCore.QRect(0, 0, self._words*DD, self._bits*DD), img)
+
         painter.setPen(GRIDPEN)
-        for row in range(self._bits):
-            for col in range(self._words):
-                if self._mask is not None and self._mask[row][col] == 0:
-                    continue
-                val = self._data[row][col]
-                if (val is not np.nan) and (val < np.iinfo(np.int32).max):
-                    #idx = int(val*7.9)
-                    #painter.fillRect(col*DX,row*DY,DX,DY, GRAD[idx])
-                    minR = np.log10(MIN_RES)
-                    normR = np.log10(MAX_RES) - minR
-
-                    try:
-                        idx = int((np.log10(val) - minR)*255/normR)
-                    except (OverflowError, ValueError):
-                        idx = -1
-                    if idx < 256 and idx >= 0:
-                        painter.fillRect(col*DD, row*DD, DD, DD, GRAD[idx])
-                    else:
-                        painter.fillRect(col*DD, row*DD, DD, DD, GRAD[-1])
-                else: ##### here
-                    painter.fillRect(col*DD, row*DD, DD, DD, QtCore.Qt.GlobalColor.white)
-                painter.drawRect(QtCore.QRect(col*DD, row*DD, DD, DD))
+        painter.drawPath(self._gridPath)
 
         font = painter.font()
         font.setPointSize(8);
@@ -140,36 +186,33 @@ class CachedBackground:
     def refreshPixmap(self):
         self._pixmap = self.makePixmap()
 
-    def blitPixmap(self, indices):
-        CBPAD = self._cbpad
+    def paintCells(self, indices):
+        """
+        Repaint the specified cells in place on the cached pixmap.
+
+        :param indices: An iterable of ``(row, col)`` tuples; any additional
+                        elements of each tuple are ignored
+        """
         DD = self._dd
 
-        pxm = QtGui.QPixmap(self._words*DD+1+2*CBPAD, self._bits*DD+1+2*CBPAD)
-        pxm.fill(QtCore.Qt.GlobalColor.transparent)
-        painter = QtGui.QPainter(pxm)
-        painter.drawPixmap(0, 0, self._pixmap)
-        painter.translate(QtCore.QPoint(CBPAD, CBPAD))
+        coords = [(coord[0], coord[1]) for coord in indices]
+        if len(coords) == 0:
+            return
+
+        (rows, cols) = zip(*coords)
+        mask = None if self._mask is None else np.asarray(self._mask)[rows, cols]
+        colours = _colourIndices(self._data[rows, cols], mask, self._scale)
+
+        painter = QtGui.QPainter(self._pixmap)
+        painter.translate(QtCore.QPoint(self._cbpad, self._cbpad))
         painter.setPen(GRIDPEN)
-        for coord in indices:
-            (row, col) = (coord[0], coord[1])
-            if self._mask is not None and self._mask[row][col] == 0:
+        for (row, col, idx) in zip(rows, cols, colours):
+            if idx == _TRANSPARENT_IDX:
                 continue
-            val = self._data[row][col]
-            if (val is not np.nan) and (val > 0.0) and (val < np.iinfo(np.int32).max):
-                # idx = int(val*7.9)
-                minR = np.log10(MIN_RES)
-                normR = np.log10(MAX_RES) - minR
-
-                idx = int((np.log10(val) - minR)*255/normR)
-                if idx < 256 and idx >= 0:
-                    painter.fillRect(col*DD,row*DD, DD, DD, GRAD[idx])
-                else:
-                    painter.fillRect(col*DD, row*DD, DD, DD, GRAD[-1])
-            else:
-                painter.fillRect(col*DD, row*DD, DD, DD, QtCore.Qt.GlobalColor.white)
+            painter.fillRect(col*DD, row*DD, DD, DD, \
+                QtGui.QColor.fromRgba(int(_COLOURLUT[idx])))
             painter.drawRect(QtCore.QRect(col*DD, row*DD, DD, DD))
-
-        return pxm
+        painter.end()
 
     # def update(self, data):
 
@@ -184,7 +227,7 @@ class CachedBackground:
 
     def update(self, xs, ys, vals):
 
-        self._pixmap = self.blitPixmap(zip(xs, ys, vals))
+        self.paintCells(zip(xs, ys, vals))
 
 
 class PaintWidget(QtWidgets.QWidget):
@@ -192,7 +235,9 @@ class PaintWidget(QtWidgets.QWidget):
     mousePositionChanged = QtCore.pyqtSignal(Cell)
     selectionChanged = QtCore.pyqtSignal(set)
 
-    def __init__(self, shape=(32, 32), mask=None, parent=None):
+    MAX_FPS = 30
+
+    def __init__(self, shape=(32, 32), mask=None, maxFps=MAX_FPS, parent=None):
         super().__init__(parent)
         self.selection = set()
         self.secselection = set()
@@ -211,11 +256,51 @@ class PaintWidget(QtWidgets.QWidget):
         self._cbpad = min(CBPADX(self._words), CBPADY(self._bits))
         self._dd = min(DX(self._words), DY(self._bits))
         self._mask = mask
+        self._scale = None
 
         self.setMinimumSize(self._dd*self._words+2*self._cbpad, self._dd*self._bits+2*self._cbpad)
         self.setMaximumSize(self._dd*self._words+2*self._cbpad, self._dd*self._bits+2*self._cbpad)
         self.background = CachedBackground(self._data, self._bits, self._words, mask)
 
+        # cells changed since the last frame; these are painted onto
+        # the cached background at most `maxFps` times per second
+        self._dirty = set()
+        self._lastFrame = 0.0
+        self._frameTimer = QtCore.QTimer(self)
+        self._frameTimer.setSingleShot(True)
+        self._frameTimer.timeout.connect(self.__paintDirtyCells)
+        self.setMaxFps(maxFps)
+
+    def setMaxFps(self, fps):
+        """
+        Set the maximum number of repaints per second triggered by
+        :meth:`~arc2control.widgets.crossbar_widget.PaintWidget.updateData`.
+
+        :param float fps: Maximum frame rate; must be positive
+        """
+        if fps <= 0:
+            raise ValueError('Frame rate must be positive')
+        self._maxFps = fps
+
+    @property
+    def maxFps(self):
+        return self._maxFps
+
+    def __scheduleFrame(self):
+        if self._frameTimer.isActive():
+            return
+        interval = 1.0/self._maxFps
+        elapsed = time.monotonic() - self._lastFrame
+        self._frameTimer.start(int(max(interval - elapsed, 0.0)*1000))
+
+    def __paintDirtyCells(self):
+        self._lastFrame = time.monotonic()
+        if len(self._dirty) == 0:
+            return
+        self.background.paintCells(self._dirty)
+        self._dirty.clear()
+        self.update()
+
     def paintEvent(self, evt):
         painter = QtGui.QPainter(self)
         self.paint(painter)
@@ -231,14 +316,38 @@ class PaintWidget(QtWidgets.QWidget):
         self._data[:] = np.nan
         self.setMinimumSize(DD*self._words+2*CBPAD, DD*self._bits+2*CBPAD)
         self.setMaximumSize(DD*self._words+2*CBPAD, DD*self._bits+2*CBPAD)
-        self.background = CachedBackground(self._data, self._bits, self._words, self._mask)
+        self.background = CachedBackground(self._data, self._bits, self._words, \
+            self._mask, self._scale)
         self.repaint()
 
     def setMask(self, mask):
         self._mask = mask
-        self.background = CachedBackground(self._data, self._bits, self._words, self._mask)
+        self.background = CachedBackground(self._data, self._bits, self._words, \
+            self._mask, self._scale)
+        self.repaint()
+
+    def setScale(self, low=None, high=None, log=True):
+        """
+        Set the range of values covered by the colour gradient. Without
+        arguments the default resistance range, ``MIN_RES`` to ``MAX_RES``
+        on a logarithmic scale, is restored.
+
+        :param float low: Value mapped to the start of the gradient
+        :param float high: Value mapped to the end of the gradient
+        :param bool log: Whether values are mapped logarithmically
+        """
+        if low is None or high is None:
+            self._scale = None
+        else:
+            self._scale = (low, high, log)
+        self.background = CachedBackground(self._data, self._bits, self._words, \
+            self._mask, self._scale)
         self.repaint()
 
+    @property
+    def scale(self):
+        return self._scale
+
     @property
     def size(self):
         return self._data.shape
@@ -311,11 +420,13 @@ class PaintWidget(QtWidgets.QWidget):
     def updateData(self, y, x, val):
         if self._data[x][y] != val:
             self._data[x][y] = val
-            self.background.update([x], [y], [val])
-            self.repaint()
+            self._dirty.add((x, y))
+            self.__scheduleFrame()
 
     def setData(self, data):
         self._data[:] = data
+        # a full refresh covers all pending cells
+        self._dirty.clear()
         self.background.refreshPixmap()
         self.repaint()
 
@@ -3,7 +3,7 @@ from PyQt6 import QtCore, QtWidgets
 from functools import partial
 from . import GeneratedElements
 from ..graphics import getPixmap, getIcon
-from ..h5utils import H5DataStore, H5Mode
+from ..h5utils import H5DataStore, H5Mode, STORAGE_PROFILES, SWMR_SUPPORTED
 
 from .. import ArC2ControlSettings
 from .. import constants
@@ -21,6 +21,7 @@ class CrossbarConfigDialog(GeneratedElements.Ui_CrossbarConfigDialog, QtWidgets.
         self.logoLabel.setPixmap(getPixmap('splash'))
         self.__populateMappers()
         self.__populateDatasets()
+        self.__populateStorageProfiles()
         self.nwords = 32
         self.nbits = 32
 
@@ -42,6 +43,7 @@ class CrossbarConfigDialog(GeneratedElements.Ui_CrossbarConfigDialog, QtWidgets.
         self.mapperSelectionComboBox.currentIndexChanged.connect(self.__mapperSelectionChanged)
         self.wordsSpinBox.valueChanged.connect(self.__manualSizeChanged)
         self.bitsSpinBox.valueChanged.connect(self.__manualSizeChanged)
+        self.loadDatasetCheckBox.toggled.connect(self.__updateStorageProfileEnabled)
 
     def result(self):
 
@@ -60,11 +62,17 @@ class CrossbarConfigDialog(GeneratedElements.Ui_CrossbarConfigDialog, QtWidgets.
 
         result['nwords'] = self.nwords
         result['nbits'] = self.nbits
+        result['profile'] = self.storageProfileComboBox.currentData()
+        result['swmr'] = self.swmrCheckBox.isChecked()
 
         return result
 
     def accept(self, *args):
 
+        ArC2ControlSettings.setValue('main/storageprofile', \
+            self.storageProfileComboBox.currentData())
+        ArC2ControlSettings.setValue('main/swmr', self.swmrCheckBox.isChecked())
+
         # if user selected a dataset bring the last selection forward
         if self.datasetRadioButton.isChecked():
 
@@ -137,6 +145,37 @@ class CrossbarConfigDialog(GeneratedElements.Ui_CrossbarConfigDialog, QtWidgets.
             self.datasetSelectionComboBox.setItemData(idx, dset, \
                 QtCore.Qt.ItemDataRole.ToolTipRole)
 
+    def __populateStorageProfiles(self):
+
+        labels = {
+            'default': 'Uncompressed',
+            'fast': 'Fast compression (lzf)',
+            'compact': 'Compact (gzip)'
+        }
+
+        for key in STORAGE_PROFILES.keys():
+            self.storageProfileComboBox.addItem(labels.get(key, key), key)
+
+        last = ArC2ControlSettings.value('main/storageprofile')
+        idx = self.storageProfileComboBox.findData(last)
+        if idx >= 0:
+            self.storageProfileComboBox.setCurrentIndex(idx)
+
+        self.swmrCheckBox.setChecked(SWMR_SUPPORTED and \
+            ArC2ControlSettings.value('main/swmr', False, type=bool))
+        if not SWMR_SUPPORTED:
+            self.swmrCheckBox.setEnabled(False)
+            self.swmrCheckBox.setToolTip(self.swmrCheckBox.toolTip() + \
+                '; requires HDF5 2.0 or newer')
+
+    def __updateStorageProfileEnabled(self, *args):
+        # the profile only applies to newly created datasets
+        existing = self.datasetRadioButton.isChecked() and \
+            self.loadDatasetCheckBox.isChecked()
+        self.storageProfileComboBox.setEnabled(not existing)
+        self.storageProfileLabel.setEnabled(not existing)
+        self.swmrCheckBox.setEnabled(SWMR_SUPPORTED and not existing)
+
     def __sizeSpecificationChanged(self, wdg, status):
         for (k, v) in self.wdgGroup.items():
             if k is wdg:
@@ -147,6 +186,7 @@ class CrossbarConfigDialog(GeneratedElements.Ui_CrossbarConfigDialog, QtWidgets.
             for w in v:
                 w.setEnabled(enable)
 
+        self.__updateStorageProfileEnabled()
         self.__updateSelectedSize(wdg)
 
     def __selectDatasetClicked(self):
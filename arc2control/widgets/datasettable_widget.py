@@ -1,4 +1,6 @@
+from collections import OrderedDict
 from collections.abc import Iterable
+import numpy as np
 from PyQt6.QtCore import Qt, QAbstractTableModel, QVariant, QModelIndex
 from PyQt6.QtWidgets import QTableView, QAbstractItemView
 
@@ -20,8 +22,24 @@ class DatasetTableView(QTableView):
 
 class DatasetTableModel(QAbstractTableModel):
 
-    def __init__(self, dataset, formatter=None, heads=None, parent=None):
+    """
+    Table model for numpy arrays and h5py datasets. Rows are read in
+    aligned blocks of ``blockSize`` rows, which are formatted in one go
+    and kept in a least-recently-used cache of up to ``maxBlocks``
+    blocks, so only the visible part of large datasets is ever read.
+    """
+
+    BLOCK_SIZE = 512
+    MAX_BLOCKS = 16
+
+    def __init__(self, dataset, formatter=None, heads=None, parent=None, \
+        blockSize=BLOCK_SIZE, maxBlocks=MAX_BLOCKS):
         super(DatasetTableModel, self).__init__(parent=parent)
+        if blockSize < 1 or maxBlocks < 1:
+            raise ValueError("Block size and number of blocks must be positive")
+        self._blockSize = blockSize
+        self._maxBlocks = maxBlocks
+        self._blocks = OrderedDict()
         self.setDataset(dataset, formatter, heads)
 
     @property
@@ -30,6 +48,23 @@ class DatasetTableModel(QAbstractTableModel):
         return (d.dtype.names is not None) and (d.dtype.fields is not None)
 
     def setDataset(self, dataset, formatter=None, heads=None):
+        self.beginResetModel()
+        try:
+            self.__setDataset(dataset, formatter, heads)
+        finally:
+            self._blocks.clear()
+            self.endResetModel()
+
+    def invalidateCache(self):
+        """
+        Drop all cached rows. This must be called if the contents of the
+        underlying dataset change.
+        """
+        self.beginResetModel()
+        self._blocks.clear()
+        self.endResetModel()
+
+    def __setDataset(self, dataset, formatter, heads):
         self._dataset = dataset
 
         if self._structured:
@@ -71,16 +106,51 @@ class DatasetTableModel(QAbstractTableModel):
     def columnCount(self, parent=QModelIndex()):
         return len(self._heads)
 
+    def __column(self, data, col):
+        if self._structured:
+            return data[self._dataset.dtype.names[col]]
+        elif len(self._dataset.shape) > 1:
+            return data[:, col]
+        else: # just a vector; shape is "(X, )" or "(X)"
+            return data
+
+    def __formatColumn(self, fmt, values):
+        try:
+            return np.char.mod(fmt, values).tolist()
+        except (TypeError, ValueError):
+            # not a type numpy can format; do it one by one
+            return [fmt % v for v in values]
+
+    def __block(self, idx):
+        try:
+            self._blocks.move_to_end(idx)
+            return self._blocks[idx]
+        except KeyError:
+            pass
+
+        # one read for the whole block, then format every column at once
+        start = idx * self._blockSize
+        data = self._dataset[start:start+self._blockSize]
+        block = [self.__formatColumn(fmt, self.__column(data, col)) \
+            for (col, fmt) in enumerate(self._formatter)]
+
+        self._blocks[idx] = block
+        while len(self._blocks) > self._maxBlocks:
+            self._blocks.popitem(last=False)
+
+        return block
+
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if role == Qt.ItemDataRole.DisplayRole:
             row = index.row()
             col = index.column()
 
-            # either structured or shape is "(X, Y)"
-            if self._structured or len(self._dataset.shape) > 1:
-                return self._formatter[col] % self._dataset[row][col]
-            else: # just a vector; shape is "(X, )" or "(X)"
-                return self._formatter[col] % self._dataset[row]
+            (idx, offset) = divmod(row, self._blockSize)
+            try:
+                return self.__block(idx)[col][offset]
+            except IndexError:
+                # dataset has changed under us
+                return QVariant()
 
         if role == Qt.ItemDataRole.TextAlignmentRole:
             return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
@@ -1,15 +1,14 @@
-from PyQt6 import QtCore, QtWidgets
+from PyQt6 import QtCore, QtGui, QtWidgets
 from pathlib import PurePosixPath
 from functools import partial
+import bisect
+import weakref
 import re
 
-
-_keyMatcher = re.compile(r'W(\d+)B(\d+)')
+from ..h5utils import CatalogKind
 
 
-def _experimentSorter(item):
-    (tag, tstamp) = item.split('_')
-    return int(tstamp)
+_keyMatcher = re.compile(r'W(\d+)B(\d+)')
 
 
 def _wbFromKey(key):
@@ -21,6 +20,267 @@ def _wbFromKey(key):
 
     return (int(match.group(1)), int(match.group(2)))
 
+
+class _DeviceNode:
+
+    __slots__ = ('key', 'word', 'bit', 'row', 'children', 'paths', 'known')
+
+    def __init__(self, key, row):
+        (w, b) = _wbFromKey(key)
+        self.key = key
+        self.word = w
+        self.bit = b
+        self.row = row
+        # experiment nodes that have been loaded so far
+        self.children = []
+        # paths of all known experiments; None until the device is
+        # expanded for the first time
+        self.paths = None
+        # all paths seen so far, in order; used as an ordered set
+        self.known = {}
+
+
+class _ExperimentNode:
+
+    __slots__ = ('parent', 'path', 'modtag')
+
+    def __init__(self, parent, path):
+        self.parent = parent
+        self.path = path
+        (self.modtag, _) = PurePosixPath(path).name.split('_')
+
+
+class DeviceExplorerModel(QtCore.QAbstractItemModel):
+    """
+    Two-level item model of devices and their experiments. Only the list
+    of devices is loaded upfront; experiments are read from the datastore
+    catalog when a device is first expanded and are added to the view in
+    batches of ``FETCH_BATCH`` items.
+    """
+
+    FETCH_BATCH = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._devices = []
+        self._deviceNodes = {}
+        self._store = None
+        self._tagMapper = None
+
+        self._deviceFont = QtGui.QFont()
+        self._deviceFont.setWeight(QtGui.QFont.Weight.Bold)
+        self._deviceFont.setPointSize(11)
+        self._experimentFont = QtGui.QFont()
+        self._experimentFont.setPointSize(9)
+        self._unknownExperimentFont = QtGui.QFont(self._experimentFont)
+        self._unknownExperimentFont.setItalic(True)
+
+    def setTagMapper(self, mapper):
+        self._tagMapper = mapper
+
+    def nodeFromIndex(self, index):
+        if not index.isValid():
+            return None
+        return index.internalPointer()
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        if column != 0 or row < 0:
+            return QtCore.QModelIndex()
+
+        if not parent.isValid():
+            if row >= len(self._devices):
+                return QtCore.QModelIndex()
+            return self.createIndex(row, column, self._devices[row])
+
+        device = parent.internalPointer()
+        if not isinstance(device, _DeviceNode) or row >= len(device.children):
+            return QtCore.QModelIndex()
+
+        return self.createIndex(row, column, device.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+
+        node = index.internalPointer()
+        if isinstance(node, _DeviceNode):
+            return QtCore.QModelIndex()
+
+        return self.createIndex(node.parent.row, 0, node.parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._devices)
+
+        node = parent.internalPointer()
+        if isinstance(node, _DeviceNode):
+            return len(node.children)
+
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._devices) > 0
+
+        # devices are only listed if they have experiments
+        return isinstance(parent.internalPointer(), _DeviceNode)
+
+    def canFetchMore(self, parent):
+        node = self.nodeFromIndex(parent)
+        if not isinstance(node, _DeviceNode):
+            return False
+
+        return node.paths is None or len(node.children) < len(node.paths)
+
+    def fetchMore(self, parent):
+        node = self.nodeFromIndex(parent)
+        if not isinstance(node, _DeviceNode):
+            return
+
+        if node.paths is None:
+            node.paths = self.__loadExperiments(node)
+
+        first = len(node.children)
+        last = min(first + self.FETCH_BATCH, len(node.paths)) - 1
+        if last < first:
+            return
+
+        self.beginInsertRows(parent, first, last)
+        for path in node.paths[first:last+1]:
+            node.children.append(_ExperimentNode(node, path))
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        node = self.nodeFromIndex(index)
+        if node is None:
+            return None
+
+        if isinstance(node, _DeviceNode):
+            if role == QtCore.Qt.ItemDataRole.DisplayRole:
+                return 'W%02dB%02d' % (node.word+1, node.bit+1)
+            elif role == QtCore.Qt.ItemDataRole.FontRole:
+                return self._deviceFont
+            return None
+
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            if self._tagMapper is None:
+                return node.modtag
+            try:
+                return self._tagMapper[node.modtag]
+            except KeyError:
+                # mark unknown modules as such
+                return node.modtag + ' [?]'
+        elif role == QtCore.Qt.ItemDataRole.FontRole:
+            if self._tagMapper is not None and \
+                node.modtag not in self._tagMapper:
+                return self._unknownExperimentFont
+            return self._experimentFont
+
+        return None
+
+    def __loadExperiments(self, node):
+        store = self._store() if self._store is not None else None
+        if store is None:
+            return list(node.known.keys())
+
+        # the catalog lists experiments in order of creation
+        catalog = store.catalog(word=node.word, bit=node.bit, \
+            kind=CatalogKind.EXPERIMENT, rowcounts=False)
+        paths = [p for p in catalog['path'] if self.__isDeviceExperiment(p)]
+        # keep anything that was added but is not in the catalog
+        catalogued = set(paths)
+        added = [p for p in node.known.keys() if p not in catalogued]
+        node.known.update(dict.fromkeys(paths))
+
+        return paths + added
+
+    def __isDeviceExperiment(self, path):
+        # only experiments directly under the crosspoint are listed
+        parts = PurePosixPath(path).parts
+        return len(parts) == 5 and parts[3] == 'experiments'
+
+    def __insertDevice(self, key):
+        keys = [d.key for d in self._devices]
+        row = bisect.bisect(keys, key)
+
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        node = _DeviceNode(key, row)
+        self._devices.insert(row, node)
+        for (i, d) in enumerate(self._devices[row+1:], row+1):
+            d.row = i
+        self._deviceNodes[key] = node
+        self.endInsertRows()
+
+        return node
+
+    def loadFromStore(self, store):
+        """
+        Populate the model with all devices that have experiments in
+        ``store``. Only a weak reference to the datastore is kept.
+        """
+        self.beginResetModel()
+
+        self._store = weakref.ref(store)
+        self._devices = []
+        self._deviceNodes = {}
+
+        # row counts are not shown, so don't let the catalog open any
+        # experiment table to refresh them
+        catalog = store.catalog(kind=CatalogKind.EXPERIMENT, rowcounts=False)
+        keys = set()
+        for (w, b, path) in zip(catalog['word'], catalog['bit'], catalog['path']):
+            if self.__isDeviceExperiment(path):
+                keys.add('W%02dB%02d' % (w, b))
+
+        for (row, key) in enumerate(sorted(keys)):
+            node = _DeviceNode(key, row)
+            self._devices.append(node)
+            self._deviceNodes[key] = node
+
+        self.endResetModel()
+
+    def addExperiment(self, w, b, dsetpath):
+        key = 'W%02dB%02d' % (w, b)
+
+        try:
+            node = self._deviceNodes[key]
+        except KeyError:
+            node = self.__insertDevice(key)
+
+        if dsetpath in node.known:
+            return
+        node.known[dsetpath] = None
+
+        if node.paths is None:
+            # not expanded yet; the experiment will be picked up
+            # from the datastore on expansion
+            if self._store is None:
+                node.paths = []
+            else:
+                return
+
+        node.paths.append(dsetpath)
+
+        # only insert a row if all previous experiments are already
+        # shown, otherwise it will be added by a later fetch
+        if len(node.children) == len(node.paths) - 1:
+            parent = self.createIndex(node.row, 0, node)
+            row = len(node.children)
+            self.beginInsertRows(parent, row, row)
+            node.children.append(_ExperimentNode(node, dsetpath))
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._store = None
+        self._devices = []
+        self._deviceNodes = {}
+        self.endResetModel()
+
+
 class DeviceExplorerWidget(QtWidgets.QWidget):
 
     #                                      tag, path
@@ -35,57 +295,54 @@ class DeviceExplorerWidget(QtWidgets.QWidget):
 
         self.layout = QtWidgets.QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
-        self.tree = QtWidgets.QTreeWidget()
+        self.model = DeviceExplorerModel(self)
+        self.tree = QtWidgets.QTreeView()
         self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setModel(self.model)
         self.tree.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
         self.tree.customContextMenuRequested.connect(self.__itemRightClicked)
-
-        self._root = QtWidgets.QTreeWidgetItem(self.tree, ['Root'])
-        self._deviceNodes = {}
-        self._tagMapper = None
-        self.tree.setRootIndex(self.tree.indexFromItem(self._root))
-        self.tree.itemSelectionChanged.connect(self.__itemSelected)
-        self.tree.itemDoubleClicked.connect(self.__itemDoubleClicked)
+        self.tree.selectionModel().selectionChanged.connect(self.__itemSelected)
+        self.tree.doubleClicked.connect(self.__itemDoubleClicked)
 
         self.layout.addWidget(self.tree)
 
-    def __itemSelected(self):
+    def __itemSelected(self, *args):
         try:
-            item = self.tree.selectedItems()[0]
+            index = self.tree.selectionModel().selectedIndexes()[0]
         except IndexError:
             self.crosspointSelected.emit(-1, -1)
             return
 
-        toplevel = item
-
-        while toplevel.parent() != self._root:
-            toplevel = toplevel.parent()
+        node = self.model.nodeFromIndex(index)
+        if isinstance(node, _ExperimentNode):
+            node = node.parent
 
-        if toplevel != self._root:
-            self.crosspointSelected.emit(toplevel.word, toplevel.bit)
+        self.crosspointSelected.emit(node.word, node.bit)
 
-    def __itemDoubleClicked(self, item, _):
-        if item.parent() == self._root:
+    def __itemDoubleClicked(self, index):
+        node = self.model.nodeFromIndex(index)
+        if not isinstance(node, _ExperimentNode):
             return
 
-        self.experimentSelected.emit(item.modtag, item.path)
+        self.experimentSelected.emit(node.modtag, node.path)
 
     def __itemRightClicked(self, point):
-        item = self.tree.itemAt(point)
-        try:
-            key = item.key
-            menu = QtWidgets.QMenu("Context Menu", self)
-            exportAllAction = menu.addAction('Export complete history')
-            exportAllAction.triggered.connect(\
-                partial(self.__exportTriggered, key, True))
-            exportRangeAction = menu.addAction('Export range')
-            exportRangeAction.triggered.connect(\
-                partial(self.__exportTriggered, key, False))
-            menu.exec(self.tree.viewport().mapToGlobal(point))
-        except AttributeError:
+        node = self.model.nodeFromIndex(self.tree.indexAt(point))
+        if not isinstance(node, _DeviceNode):
             # not a device node
             return
 
+        key = node.key
+        menu = QtWidgets.QMenu("Context Menu", self)
+        exportAllAction = menu.addAction('Export complete history')
+        exportAllAction.triggered.connect(\
+            partial(self.__exportTriggered, key, True))
+        exportRangeAction = menu.addAction('Export range')
+        exportRangeAction.triggered.connect(\
+            partial(self.__exportTriggered, key, False))
+        menu.exec(self.tree.viewport().mapToGlobal(point))
+
     def __exportTriggered(self, key, complete):
         (w, b) = _wbFromKey(key)
 
@@ -94,111 +351,14 @@ class DeviceExplorerWidget(QtWidgets.QWidget):
 
         self.exportDeviceHistoryRequested.emit(w, b, complete)
 
-    def __makeDeviceNodeFont(self, node):
-        font = node.font(0)
-        font.setWeight(700)
-        font.setPointSize(11)
-
-        return font
-
-    def __makeExperimentNodeFont(self, node):
-        font = node.font(0)
-        font.setPointSize(9)
-
-        return font
-
-    def __makeUnknownExperimentNodeFont(self, node):
-        font = self.__makeExperimentNodeFont(node)
-        font.setItalic(True)
-
-        return font
-
-    def __makeDeviceNode(self, key):
-        (w, b) = _wbFromKey(key)
-        deviceNode = QtWidgets.QTreeWidgetItem(self._root, ['W%02dB%02d' % (w+1, b+1)])
-        deviceNode.setFont(0, self.__makeDeviceNodeFont(deviceNode))
-        deviceNode.__setattr__('key', key)
-        deviceNode.__setattr__('word', w)
-        deviceNode.__setattr__('bit', b)
-        self._deviceNodes[key] = deviceNode
-
-        return deviceNode
-
-    def __makeExperimentNode(self, parent, label, expid, path, unknown=False):
-        itemNode = QtWidgets.QTreeWidgetItem(parent, [label])
-        if unknown:
-            itemNode.setFont(0, self.__makeUnknownExperimentNodeFont(itemNode))
-        else:
-            itemNode.setFont(0, self.__makeExperimentNodeFont(itemNode))
-        itemNode.__setattr__('path', path)
-        itemNode.__setattr__('modtag', expid)
-
-        return itemNode
-
     def setTagMapper(self, mapper):
-        self._tagMapper = mapper
+        self.model.setTagMapper(mapper)
 
     def loadFromStore(self, store):
-        crosspoints = store.dataset('/crosspoints')
-        root = self._root
-
-        alldevkeys = sorted(crosspoints.keys())
-
-        for key in alldevkeys:
-            device = crosspoints[key]
-
-            try:
-                experiments = device['experiments']
-            except KeyError:
-                # no experiments done yet, skip it
-                continue
-
-            deviceNode = self.__makeDeviceNode(key)
-
-            expkeys = sorted(experiments.keys(), key=_experimentSorter)
-
-            for (tag, dset) in experiments.items():
-                (expid, _) = tag.split('_')
-                if self._tagMapper is not None:
-                    try:
-                        itemLabel = self._tagMapper[expid]
-                        unknown = False
-                    except KeyError:
-                        # mark unknown modules as such
-                        unknown = True
-                        itemLabel = expid + ' [?]'
-                else:
-                    itemLabel = expid
-
-                itemNode = self.__makeExperimentNode(deviceNode, itemLabel, \
-                    expid, '%s/%s' % (experiments.name, tag), unknown)
-                deviceNode.addChild(itemNode)
-
-            root.addChild(deviceNode)
+        self.model.loadFromStore(store)
 
     def addExperiment(self, w, b, dsetpath):
-        key = 'W%02dB%02d' % (w, b)
-        path = PurePosixPath(dsetpath)
-        (expid, _) = path.parts[-1].split('_')
-
-        if key in self._deviceNodes.keys():
-            deviceNode = self._deviceNodes[key]
-        else:
-            deviceNode = self.__makeDeviceNode(key)
-            self._root.addChild(deviceNode)
-
-        try:
-            itemLabel = self._tagMapper[expid]
-        except KeyError:
-            itemLabel = expid
-
-        itemNode = self.__makeExperimentNode(deviceNode, itemLabel, \
-            expid, dsetpath)
-        deviceNode.addChild(itemNode)
+        self.model.addExperiment(w, b, dsetpath)
 
     def clear(self):
-        self.tree.clear()
-        self._root = QtWidgets.QTreeWidgetItem(self.tree, ['Root'])
-        self.tree.setRootIndex(self.tree.indexFromItem(self._root))
-        self._deviceNodes.clear()
-
+        self.model.clear()
@@ -0,0 +1,157 @@
+from PyQt6 import QtCore, QtWidgets
+
+from ..export import export_delimited, export_store, human_bytes, \
+    ExportCancelled
+
+
+class ExportOperation(QtCore.QThread):
+    """
+    Export tabular data to a delimited text file in the background. All
+    keyword arguments are passed to :func:`~arc2control.export.export_delimited`.
+    ``exportFinished`` is emitted with an empty string on success, ``'abort'``
+    if the export was stopped and an error message otherwise.
+    """
+
+    exportFinished = QtCore.pyqtSignal(str)
+    progressUpdate = QtCore.pyqtSignal(int)
+
+    def __init__(self, source, fname, parent=None, **kwargs):
+        super().__init__(parent=parent)
+        self.source = source
+        self.fname = fname
+        self.kwargs = kwargs
+        self.currentProgress = 0
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def __progress(self, done, total):
+        progress = int(done/total * 100) if total > 0 else 100
+        if progress != self.currentProgress:
+            self.currentProgress = progress
+            self.progressUpdate.emit(progress)
+
+    def run(self):
+        self.running = True
+
+        try:
+            export_delimited(self.source, self.fname, \
+                progress=self.__progress, \
+                cancelled=lambda: not self.running, **self.kwargs)
+            msg = ''
+        except ExportCancelled:
+            msg = 'abort'
+        except Exception as exc:
+            msg = str(exc)
+
+        self.running = False
+        self.exportFinished.emit(msg)
+
+
+class BulkExportOperation(QtCore.QThread):
+    """
+    Export a complete datastore in the background with
+    :func:`~arc2control.export.export_store`. ``exportFinished`` follows
+    the conventions of :class:`~arc2control.widgets.export_dialog.ExportOperation`;
+    on success the export summary is available as ``summary``.
+    """
+
+    exportFinished = QtCore.pyqtSignal(str)
+    progressUpdate = QtCore.pyqtSignal(int)
+
+    def __init__(self, fname, target, fmt, parent=None, **kwargs):
+        super().__init__(parent=parent)
+        self.fname = fname
+        self.target = target
+        self.fmt = fmt
+        self.kwargs = kwargs
+        self.summary = None
+        self.running = False
+
+    def stop(self):
+        self.running = False
+
+    def __progress(self, done, total):
+        self.progressUpdate.emit(int(done/total * 100) if total > 0 else 100)
+
+    def run(self):
+        self.running = True
+
+        try:
+            self.summary = export_store(self.fname, self.target, self.fmt, \
+                progress=self.__progress, cancelled=lambda: not self.running, \
+                **self.kwargs)
+            msg = ''
+        except ExportCancelled:
+            msg = 'abort'
+        except Exception as exc:
+            msg = str(exc)
+
+        self.running = False
+        self.exportFinished.emit(msg)
+
+
+def _runWithProgress(parent, title, operation, label, onSuccess=None):
+    dialog = QtWidgets.QProgressDialog(label, 'Cancel', 0, 100, parent)
+    dialog.setWindowTitle(title)
+    dialog.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    dialog.setMinimumDuration(500)
+    operation.setParent(dialog)
+
+    def onFinished(msg):
+        operation.wait()
+        dialog.close()
+        dialog.deleteLater()
+        if msg == '' and onSuccess is not None:
+            onSuccess(operation)
+        elif msg not in ['', 'abort']:
+            QtWidgets.QMessageBox.critical(parent, title, \
+                'Could not export data: %s' % msg)
+
+    operation.progressUpdate.connect(dialog.setValue)
+    operation.exportFinished.connect(onFinished)
+    dialog.canceled.connect(operation.stop)
+    operation.start()
+
+    return operation
+
+
+def bulkExportWithProgress(parent, title, fname, target, fmt, **kwargs):
+    """
+    Export all crosspoints of datastore ``fname`` on a background thread
+    while showing a cancellable progress dialog. The aggregate throughput
+    is reported when the export finishes. Keyword arguments are the same
+    as for :func:`~arc2control.export.export_store`.
+
+    :return: The running :class:`~arc2control.widgets.export_dialog.BulkExportOperation`
+    """
+    def onSuccess(operation):
+        summary = operation.summary
+        QtWidgets.QMessageBox.information(parent, title, \
+            'Exported %d tables (%d rows) from %d crosspoints.\n'
+            '%s in %.1f s (%s/s)' % \
+            (summary.tables, summary.rows, summary.crosspoints, \
+             human_bytes(summary.nbytes), summary.elapsed, \
+             human_bytes(summary.throughput)))
+
+    operation = BulkExportOperation(fname, target, fmt, **kwargs)
+
+    return _runWithProgress(parent, title, operation, \
+        'Exporting crosspoints…', onSuccess)
+
+
+def exportWithProgress(parent, title, source, fname, **kwargs):
+    """
+    Export ``source`` to ``fname`` on a background thread while showing a
+    cancellable progress dialog. Keyword arguments are the same as for
+    :func:`~arc2control.export.export_delimited`. Errors are reported
+    with a message box.
+
+    :return: The running :class:`~arc2control.widgets.export_dialog.ExportOperation`
+    """
+    operation = ExportOperation(source, fname, **kwargs)
+
+    return _runWithProgress(parent, title, operation, 'Exporting data…')
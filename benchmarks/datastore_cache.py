@@ -0,0 +1,89 @@
+"""
+Microbenchmark of the crosspoint handle cache of H5DataStore. Single row
+updates and timeseries reads are timed round-robin over a number of
+crosspoints, once with the cache in place and once with the cached handles
+dropped before every call. The latter resolves every crosspoint from its
+HDF5 path and reads its row count back from the file, as was done before
+the cache was introduced. Write-behind and the background writer are
+disabled so that every call goes to the file.
+
+.. code-block:: console
+
+   $ python benchmarks/datastore_cache.py --updates 5000 --reads 1000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from arc2control.h5utils import H5DataStore, H5Mode, OpType
+
+
+def _time_per_call(fn, calls, crosspoints, uncached, store):
+    start = time.perf_counter()
+    for i in range(calls):
+        if uncached:
+            # only drop the dataset handles; invalidate_cache() also
+            # writes out the crosspoint statistics which is not what's
+            # being measured here
+            store._handles.clear()
+            store._raster = None
+        fn(i % crosspoints, 0)
+    return (time.perf_counter() - start) / calls
+
+
+def _run(fname, args, uncached):
+    size = max(args.crosspoints, 1)
+    with H5DataStore(fname, mode=H5Mode.WRITE, shape=(size, size)) as store:
+
+        def update(word, bit):
+            store.update_status(word, bit, 1e-6, 0.2, 0.0, 0.2, OpType.READ)
+
+        # create all the timeseries first so that creation is not timed
+        for word in range(args.crosspoints):
+            update(word, 0)
+
+        tupdate = _time_per_call(update, args.updates, args.crosspoints, \
+            uncached, store)
+        tread = _time_per_call(store.timeseries, args.reads, args.crosspoints, \
+            uncached, store)
+
+    return (tupdate, tread)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser( \
+        description='Time H5DataStore updates and reads with and without '
+        'the crosspoint handle cache')
+    parser.add_argument('--updates', type=int, default=5000, \
+        help='Number of update_status calls (default: %(default)s)')
+    parser.add_argument('--reads', type=int, default=1000, \
+        help='Number of timeseries calls (default: %(default)s)')
+    parser.add_argument('--crosspoints', type=int, default=32, \
+        help='Number of crosspoints to cycle through (default: %(default)s)')
+    args = parser.parse_args(args)
+
+    results = {}
+    for (label, uncached) in [('uncached', True), ('cached', False)]:
+        (fd, fname) = tempfile.mkstemp(suffix='.h5')
+        os.close(fd)
+        try:
+            results[label] = _run(fname, args, uncached)
+        finally:
+            os.remove(fname)
+
+    print('%d update_status calls, %d timeseries calls, %d crosspoints' % \
+        (args.updates, args.reads, args.crosspoints))
+    for (idx, name) in enumerate(['update_status', 'timeseries']):
+        before = results['uncached'][idx] * 1e6
+        after = results['cached'][idx] * 1e6
+        print('  %-14s %8.1f us/call -> %8.1f us/call (%.1fx)' % \
+            (name + ':', before, after, before/after if after > 0 else 0.0))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,3 +1,9 @@
-from arc2control.main import main
+import multiprocessing
 
-main()
+if __name__ == "__main__":
+    # worker processes of the bulk export re-run this executable; this
+    # turns them into workers instead of starting another instance
+    multiprocessing.freeze_support()
+
+    from arc2control.main import main
+    main()
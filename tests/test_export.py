@@ -0,0 +1,53 @@
+import os
+import zipfile
+import numpy as np
+from arc2control.h5utils import H5DataStore, H5Mode, OpType
+from arc2control.export import export_store
+
+
+def _update(store, rows):
+    for _ in range(rows):
+        store.update_status(2, 2, 1e-6, 0.2, 0.0, 0.2, OpType.READ)
+
+
+def _exported_rows(target):
+    with zipfile.ZipFile(target) as archive:
+        with archive.open('W02B02/timeseries.npy') as fh:
+            return len(np.lib.format.read_array(fh))
+
+
+def test_export_open_new_store(tmp_path):
+    fname = str(tmp_path / 'store.h5')
+    target = str(tmp_path / 'export.npz')
+
+    store = H5DataStore(fname, mode=H5Mode.WRITE, writebehind=True, \
+        threaded=True)
+    try:
+        _update(store, 100)
+        store.sync()
+        summary = export_store(fname, target, 'npz', workers=1)
+    finally:
+        store.close()
+
+    assert summary.rows == 100
+    assert _exported_rows(target) == 100
+
+
+def test_export_open_appended_store(tmp_path):
+    fname = str(tmp_path / 'store.h5')
+    target = str(tmp_path / 'export.npz')
+
+    with H5DataStore(fname, mode=H5Mode.WRITE) as store:
+        _update(store, 100)
+
+    store = H5DataStore(fname, mode=H5Mode.APPEND, writebehind=True, \
+        threaded=True)
+    try:
+        _update(store, 500)
+        store.sync()
+        summary = export_store(fname, target, 'npz', workers=1)
+    finally:
+        store.close()
+
+    assert summary.rows == 600
+    assert _exported_rows(target) == 600
@@ -0,0 +1,97 @@
+import numpy as np
+from pyarc2 import BiasOrder
+from arc2control.simulator import SimulatedInstrument
+
+
+RON = 1e3
+ROFF = 1e5
+VREAD = 0.2
+
+
+def _instrument():
+    rng = np.random.default_rng(0)
+    resistances = np.exp(rng.uniform(np.log(RON), np.log(ROFF), size=(32, 32)))
+    return SimulatedInstrument(resistances=resistances, ron=RON, roff=ROFF, \
+        threshold=1.0, rate=0.2, seed=0)
+
+
+def _switched(resistance, delta):
+    # resistance after moving the normalised state of a device by delta
+    state = np.log(resistance/ROFF) / np.log(RON/ROFF)
+    return ROFF * np.power(RON/ROFF, np.clip(state + delta, 0.0, 1.0))
+
+
+def test_read_all():
+    arc = _instrument()
+    expected = -VREAD / arc.resistances
+
+    cols = arc.read_all(VREAD, BiasOrder.Cols)
+    rows = arc.read_all(VREAD, BiasOrder.Rows)
+
+    assert cols.shape == (32, 32)
+    assert cols.dtype == np.float32
+    assert np.allclose(cols, expected, rtol=1e-6)
+    assert np.allclose(rows, expected.T, rtol=1e-6)
+
+
+def test_read_slice_masked():
+    arc = _instrument()
+    # bitline channel 1 against three wordlines
+    mask = [16, 17, 48]
+
+    result = arc.read_slice_masked(1, mask, VREAD)
+
+    assert result.shape == (32,)
+    assert np.allclose(result[[0, 1, 16]], \
+        [-VREAD / arc.resistance(1, ch) for ch in mask], rtol=1e-6)
+    assert np.all(np.isnan(np.delete(result, [0, 1, 16])))
+
+
+def test_pulseread_one():
+    arc = _instrument()
+    before = arc.resistance(0, 16)
+
+    # below threshold; device is not disturbed
+    current = arc.pulseread_one(0, 16, 0.5, 100000, VREAD)
+    assert arc.resistance(0, 16) == before
+    assert np.isclose(current, -VREAD / before)
+
+    # 1 V over threshold for 100 µs moves the state by rate towards ron
+    current = arc.pulseread_one(0, 16, 2.0, 100000, VREAD)
+    after = _switched(before, 0.2)
+    assert np.isclose(arc.resistance(0, 16), after)
+    assert np.isclose(current, -VREAD / after)
+
+    # and back again with the opposite polarity
+    arc.pulseread_one(0, 16, -2.0, 100000, VREAD)
+    assert np.isclose(arc.resistance(0, 16), before)
+
+
+def test_pulseread_slice_masked():
+    arc = _instrument()
+    mask = [16, 17, 48]
+    before = np.array([arc.resistance(1, ch) for ch in mask])
+    untouched = arc.resistance(2, 16)
+
+    result = arc.pulseread_slice_masked(1, mask, 2.0, 100000, VREAD)
+    after = _switched(before, 0.2)
+
+    assert result.shape == (32,)
+    assert np.allclose([arc.resistance(1, ch) for ch in mask], after)
+    assert np.allclose(result[[0, 1, 16]], -VREAD / after, rtol=1e-6)
+    assert np.all(np.isnan(np.delete(result, [0, 1, 16])))
+    assert arc.resistance(2, 16) == untouched
+
+
+def test_pulseread_all():
+    arc = _instrument()
+    before = arc.resistances
+
+    result = arc.pulseread_all(2.0, 100000, VREAD, BiasOrder.Cols)
+    after = _switched(before, 0.2)
+
+    assert result.shape == (32, 32)
+    assert np.allclose(arc.resistances, after)
+    assert np.allclose(result, -VREAD / after, rtol=1e-6)
+    assert arc.command_count['pulse_all'] == 1
+    assert arc.command_count['read_all'] == 1